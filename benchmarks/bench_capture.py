@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for grab + convert time at common region sizes
+
+Conversion is timed on synthetic BGRA buffers so it runs headless. When a
+display is available the mss grab itself is timed as well.
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image
+
+from core.frame import CaptureFrame, FrameBufferPool
+from core.screenshot import ScreenCapture
+
+SIZES = [(400, 300), (800, 600), (1920, 1080), (3840, 2160)]
+ROUNDS = 20
+
+
+def timed(func, rounds=ROUNDS):
+    """Get the median time of a function call in milliseconds"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def decode_reused(raw, size, pool):
+    """Decode into a pooled buffer and hand it back, as the capture path does"""
+    frame = CaptureFrame(raw, size, pool=pool)
+    frame.to_pil(reuse_buffer=True)
+    frame.release()
+
+
+def grab_reused(capture, bbox):
+    """Grab and decode into a pooled buffer, handing it back"""
+    frame = capture.grab(bbox)
+    frame.to_pil(reuse_buffer=True)
+    frame.release()
+
+
+def bench_convert():
+    """Compare the previous conversion with frame conversion"""
+    pool = FrameBufferPool()
+    print(f"{'size':<12}{'frombytes':>12}{'frame':>10}{'reused':>10}{'md5 digest':>12}")
+    for width, height in SIZES:
+        raw = bytearray(os.urandom(width * height * 4))
+
+        # Previous path: ScreenShot.bgra copy + Image.frombytes
+        previous = timed(lambda: Image.frombytes("RGB", (width, height), bytes(raw), "raw", "BGRX"))
+        frame = timed(lambda: CaptureFrame(raw, (width, height), pool=pool).to_pil())
+        reused = timed(lambda: decode_reused(raw, (width, height), pool))
+        lazy = timed(lambda: CaptureFrame(raw, (width, height), pool=pool).digest())
+        print(f"{width}x{height:<7}{previous:>10.2f}ms{frame:>8.2f}ms{reused:>8.2f}ms{lazy:>10.2f}ms")
+
+
+def bench_grab():
+    """Time real mss grabs if a display is available"""
+    capture = ScreenCapture()
+    if capture._get_sct() is None:
+        print("\nNo display available, skipping grab timings")
+        return
+
+    print(f"\n{'size':<12}{'grab':>10}{'grab+pil':>12}")
+    for width, height in SIZES:
+        bbox = (0, 0, width, height)
+        try:
+            grab = timed(lambda: capture.grab(bbox), rounds=5)
+            grab_pil = timed(lambda: grab_reused(capture, bbox), rounds=5)
+        except Exception as e:
+            print(f"{width}x{height:<7} grab failed: {e}")
+            continue
+        print(f"{width}x{height:<7}{grab:>8.2f}ms{grab_pil:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    bench_convert()
+    bench_grab()
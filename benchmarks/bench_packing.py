@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Packed composite requests against one request per small region
+
+Translates 2, 4 and 8 small regions (labels, menu items, a status bar, a
+tooltip, a dialog from the routing fixture corpus) once as separate
+concurrent requests and once packed onto labeled composites. Requests
+are answered by a modelled stand-in for the OpenAI API, so no network or
+API key is needed: input tokens are the prompt text plus the image tokens
+of gpt-4.1-mini's resolution profile, output tokens follow the amount of
+dark ink, and each request sleeps for a time to first token plus prefill
+and decode time, so concurrency shows in the wall-clock latency.
+"""
+
+import sys
+import os
+import io
+import re
+import json
+import time
+import base64
+import asyncio
+import argparse
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image
+
+from bench_routing import fixture_corpus, _Response
+from config.settings import Settings
+from core.tiles import image_tokens
+from core.transport import HttpTransport
+from core.translator import Translator
+
+MODEL = 'gpt-4.1-mini'
+REGION_COUNTS = (2, 4, 8)
+
+# Modelled provider latency
+FIRST_TOKEN_SECONDS = 0.55
+PREFILL_SECONDS_PER_1K_TOKENS = 0.04
+SECONDS_PER_OUTPUT_TOKEN = 0.012
+
+# Output tokens: a fixed answer overhead plus one token per this many dark pixels
+ANSWER_TOKENS = 15
+DARK_PIXELS_PER_TOKEN = 40
+DARK_LEVEL = 64  # Text is near black; frames and labels of composites are not
+
+HEADER = "**Erkannte Sprache:** Englisch\n**Übersetzung:**\n"
+
+
+class ModelledSession:
+    """Answers OpenAI chat completions after a modelled delay, labeling packed answers"""
+
+    closed = False
+
+    def __init__(self, llm_config, time_scale):
+        self.profile = llm_config[MODEL]['resolution']
+        self.time_scale = time_scale
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def post(self, url, json=None, **kwargs):
+        return self._answer(json)
+
+    def _answer(self, payload):
+        system, user = payload['messages']
+        prompt = system['content'] + "".join(part['text'] for part in user['content'] if part['type'] == 'text')
+        image_url = user['content'][0]['image_url']['url']
+        with Image.open(io.BytesIO(base64.b64decode(image_url.split(',', 1)[1]))) as image:
+            size = image.size
+            dark_pixels = sum(image.convert('L').histogram()[:DARK_LEVEL])
+
+        labels = re.search(r'bis \[(\d+)\]', prompt)
+        count = int(labels.group(1)) if labels else 1
+        input_tokens = len(prompt) // 4 + image_tokens(size, self.profile)
+        output_tokens = ANSWER_TOKENS * count + dark_pixels // DARK_PIXELS_PER_TOKEN
+        if labels:
+            text = HEADER + "\n".join(f"[{k}]\n..." for k in range(1, count + 1))
+        else:
+            text = HEADER + "..."
+
+        self.requests += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        delay = (FIRST_TOKEN_SECONDS + PREFILL_SECONDS_PER_1K_TOKENS * input_tokens / 1000
+                 + SECONDS_PER_OUTPUT_TOKEN * output_tokens)
+        return _DelayedResponse({
+            'choices': [{'message': {'content': text}}],
+            'usage': {'prompt_tokens': input_tokens, 'completion_tokens': output_tokens}
+        }, delay * self.time_scale)
+
+    async def close(self):
+        self.closed = True
+
+
+class _DelayedResponse(_Response):
+    def __init__(self, body, delay):
+        super().__init__(body)
+        self.delay = delay
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+
+class ModelledTransport(HttpTransport):
+    requires_credentials = False
+
+    def __init__(self, llm_config, time_scale):
+        super().__init__()
+        self.modelled = ModelledSession(llm_config, time_scale)
+
+    @property
+    def session(self):
+        return self.modelled
+
+    async def close(self):
+        pass
+
+
+def small_regions(count):
+    """count small captures, cycling through the small fixtures"""
+    small = [image for _, image in fixture_corpus() if image.width * image.height <= 200000]
+    return [small[i % len(small)] for i in range(count)]
+
+
+async def translate_regions(regions, packed, time_scale, tmp):
+    """Translate the regions once, returning (requests, input tokens, output tokens, seconds)"""
+    settings = Settings(os.path.join(tmp, f'packing-{packed}-{len(regions)}.ini'))
+    settings.set('api', 'default_llm', MODEL)
+    settings.set('translation', 'cache_translations', 'false')
+    transport = ModelledTransport(settings.snapshot.llm_config, time_scale)
+    translator = Translator(settings, transport)
+
+    start = time.perf_counter()
+    if packed:
+        await translator.translate_packed(regions)
+    else:
+        semaphore = asyncio.Semaphore(settings.snapshot.max_parallel_requests)
+
+        async def translate(image):
+            async with semaphore:
+                return await translator.translate_image(image)
+
+        await asyncio.gather(*(translate(image) for image in regions))
+    elapsed = time.perf_counter() - start
+
+    settings.flush()
+    modelled = transport.modelled
+    return modelled.requests, modelled.input_tokens, modelled.output_tokens, elapsed / time_scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help="Multiply the modelled provider delays, e.g. 0.1 for a quick run")
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in REGION_COUNTS:
+            regions = small_regions(count)
+            separate = asyncio.run(translate_regions(regions, False, args.time_scale, tmp))
+            packed = asyncio.run(translate_regions(regions, True, args.time_scale, tmp))
+            results.append({'regions': count, 'separate': separate, 'packed': packed})
+
+    print(f"\n{'regions':>8}{'requests':>12}{'input tokens':>18}{'output tokens':>18}{'latency':>18}")
+    for row in results:
+        separate, packed = row['separate'], row['packed']
+        print(f"{row['regions']:>8}{separate[0]:>6} -> {packed[0]:<3}{separate[1]:>8} -> {packed[1]:<6}"
+              f"{separate[2]:>8} -> {packed[2]:<6}{separate[3]:>7.2f}s -> {packed[3]:.2f}s")
+        print(f"{'':>8}{'':>12}{1 - packed[1] / separate[1]:>17.0%} {'':>17}"
+              f"{1 - packed[3] / separate[3]:>16.0%} fewer/faster")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{'regions': row['regions'],
+                        **{kind: dict(zip(('requests', 'input_tokens', 'output_tokens', 'latency_s'), row[kind]))
+                           for kind in ('separate', 'packed')}} for row in results], f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
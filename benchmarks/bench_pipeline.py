@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the image pipeline hot paths with regression gates
+
+Times hashing, LLM image optimization, size parsing, frame conversion,
+translation cache operations and history insertion on the bundled
+screenshots and synthetic 1080p/4K screens. Runs headless - nothing here
+opens a window or grabs the screen.
+
+Results are compared with benchmarks/baselines.json and the script exits
+with status 1 when a case is slower than its baseline by more than the
+threshold. Baselines are machine specific; record them on the machine
+that runs the gate with --update.
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image, ImageDraw
+
+from config.settings import Settings
+from core.frame import CaptureFrame, FrameBufferPool
+from core.history import HistoryStore
+from core.screenshot import ScreenCapture
+from core.translator import Translator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# Allowed slowdown over the baseline before a case fails
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below this are timer noise, not regressions
+NOISE_FLOOR_MS = 0.05
+
+ROUNDS = 15
+
+
+def timed(func, rounds=ROUNDS):
+    """Get the median time of a function call in milliseconds"""
+    func()  # Warm up caches and lazy imports
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def synthetic_screen(width, height):
+    """Screen-like image: window chrome, text lines and a picture"""
+    image = Image.new('RGB', (width, height), (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 40), fill=(40, 44, 52))
+    line_height = 22
+    for row, y in enumerate(range(60, height - 200, line_height)):
+        x = 20
+        # Words of varying length, like a paragraph
+        for word in range((row * 7) % 13 + 8):
+            word_width = 20 + (row * 31 + word * 17) % 90
+            draw.rectangle((x, y + 4, x + word_width, y + 16), fill=(30, 30, 30))
+            x += word_width + 10
+            if x > width - 300:
+                break
+    for i in range(200):
+        draw.line((width - 260, height - 200 + i, width - 20, height - 200 + (i * 3) % 200),
+                  fill=((i * 5) % 256, (i * 3) % 256, 180))
+    return image
+
+
+def load_images():
+    """Bundled screenshots plus synthetic screens, keyed by case suffix"""
+    images = {}
+    for name in ('screen_scan', 'screen_translate'):
+        with Image.open(os.path.join(ROOT, f'{name}.png')) as image:
+            images[name] = image.convert('RGB')
+    images['1080p'] = synthetic_screen(1920, 1080)
+    images['4k'] = synthetic_screen(3840, 2160)
+    return images
+
+
+def bench_images(results, images):
+    """Hashing and LLM optimization per image"""
+    capture = ScreenCapture()
+    for name, image in images.items():
+        results[f'hash/{name}'] = timed(lambda: capture._get_image_hash(image))
+        results[f'optimize_4mb/{name}'] = timed(lambda: capture.optimize_image_for_llm(image, "4MB"), rounds=5)
+    # A tight limit exercises the quality reduction loop
+    results['optimize_200kb/4k'] = timed(lambda: capture.optimize_image_for_llm(images['4k'], "200KB"), rounds=3)
+
+    sizes = ["4MB", "20MB", "512KB", "1GB", "1000"]
+    results['parse_size/x1000'] = timed(lambda: [capture._parse_size(size) for size in sizes * 200])
+
+
+def decode_reused(raw, size, pool):
+    """Decode into a pooled buffer and hand it back, as the capture path does"""
+    frame = CaptureFrame(raw, size, pool=pool)
+    frame.to_pil(reuse_buffer=True)
+    frame.release()
+
+
+def bench_frames(results):
+    """Conversion of raw mss BGRA buffers to PIL"""
+    pool = FrameBufferPool()
+    for name, (width, height) in (('1080p', (1920, 1080)), ('4k', (3840, 2160))):
+        raw = bytearray(os.urandom(width * height * 4))
+        results[f'frame_to_pil/{name}'] = timed(lambda: CaptureFrame(raw, (width, height), pool=pool).to_pil())
+        results[f'frame_to_pil_reused/{name}'] = timed(
+            lambda: decode_reused(raw, (width, height), pool))
+
+
+def bench_cache(results, images, tmp):
+    """Translation cache lookups and insertions at capacity"""
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    translator = Translator(settings)
+    max_entries = settings.snapshot.max_cache_entries
+    for i in range(max_entries):
+        translator.translation_cache[f"gemini:de:{i:016x}"] = f"Übersetzung {i}"
+
+    keys = list(translator.translation_cache)
+    results['cache_lookup/x1000'] = timed(lambda: [translator.translation_cache.get(key) for key in keys * 10])
+
+    counter = iter(range(10 ** 9))
+
+    def insert():
+        for _ in range(100):
+            translator.translation_cache[f"gemini:de:new{next(counter)}"] = "Übersetzung"
+            translator._cleanup_cache()
+    results['cache_insert/x100'] = timed(insert)
+
+    # Full path of a cache hit: hashing the capture plus the lookup
+    image = images['screen_scan']
+    translator.translation_cache[translator._cache_key(image)] = "Übersetzung"
+    results['cache_hit/screen_scan'] = timed(lambda: translator.cached_translation(image))
+    settings.flush()
+
+
+def bench_history(results, tmp):
+    """History insertion: the non-blocking add and the background write"""
+    store = HistoryStore(os.path.join(tmp, 'history.db'))
+    text = "**Erkannte Sprache:** Chinesisch\n**Übersetzung:**\n" + "Der Akku ist leer. " * 40
+
+    results['history_add/x100'] = timed(lambda: [store.add(text, "Chinesisch") for _ in range(100)])
+    store.flush()
+
+    def add_and_write():
+        for _ in range(100):
+            store.add(text, "Chinesisch")
+        store.flush()
+    results['history_add_flush/x100'] = timed(add_and_write, rounds=5)
+    store.close()
+
+
+def run():
+    results = {}
+    images = load_images()
+    bench_images(results, images)
+    bench_frames(results)
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_cache(results, images, tmp)
+        bench_history(results, tmp)
+    return results
+
+
+def machine():
+    return f"{platform.system()} {platform.machine()} Python {platform.python_version()}"
+
+
+def compare(results, baseline, threshold):
+    """Print results against the baseline and return the names of regressed cases"""
+    regressions = []
+    print(f"{'case':<32}{'median':>12}{'baseline':>12}{'change':>9}")
+    for name, ms in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<32}{ms:>10.3f}ms{'-':>12}{'new':>9}")
+            continue
+        change = ms / base - 1 if base else 0
+        regressed = change > threshold and ms - base > NOISE_FLOOR_MS
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<32}{ms:>10.3f}ms{base:>10.3f}ms{change:>+8.0%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--update', action='store_true', help="Store the results as the new baselines")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown as a fraction (default {DEFAULT_THRESHOLD})")
+    parser.add_argument('--baselines', default=BASELINE_FILE, help="Baseline file")
+    args = parser.parse_args()
+
+    results = run()
+
+    if args.update:
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine(), 'results': results}, f, indent=2)
+            f.write("\n")
+        compare(results, results, args.threshold)
+        print(f"\nBaselines written to {args.baselines}")
+        return 0
+
+    if not os.path.exists(args.baselines):
+        compare(results, {}, args.threshold)
+        print("\nNo baselines yet, run with --update to record them")
+        return 0
+
+    with open(args.baselines, encoding='utf-8') as f:
+        stored = json.load(f)
+    if stored.get('machine') != machine():
+        print(f"Warning: baselines were recorded on {stored.get('machine')}, this is {machine()}\n")
+
+    regressions = compare(results, stored['results'], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    print(f"\nAll cases within {args.threshold:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark UI-thread block time when displaying 10k-character results
+
+Compares one delete+insert call (previous behaviour) with the chunked
+renderer, reporting the longest single block of the Tk thread. Needs a
+display; exits with a message when none is available.
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tkinter as tk
+from tkinter import scrolledtext
+
+from ui.text_renderer import ChunkedTextRenderer
+from utils.constants import MAX_TRANSLATION_LENGTH
+
+LINE = "1. Nach der Bearbeitung habe ich festgestellt, dass 用户位置隐私保护 Mechanismen fehlen.\n"
+
+
+def make_text(length: int) -> str:
+    return (LINE * (length // len(LINE) + 1))[:length]
+
+
+def bench_single(text_area, text):
+    """Longest block of a single delete + insert"""
+    start = time.perf_counter()
+    text_area.config(state=tk.NORMAL)
+    text_area.delete(1.0, tk.END)
+    text_area.insert(1.0, text)
+    text_area.config(state=tk.DISABLED)
+    text_area.update_idletasks()
+    return time.perf_counter() - start
+
+
+def bench_chunked(root, renderer, text):
+    """Longest block of any renderer slice, and total time to completion"""
+    blocks = []
+    original_step = renderer._step
+
+    def timed_step():
+        start = time.perf_counter()
+        original_step()
+        renderer.text_widget.update_idletasks()
+        blocks.append(time.perf_counter() - start)
+
+    renderer._step = timed_step
+    start = time.perf_counter()
+    renderer.render(text)
+    while renderer.busy:
+        root.update()
+    total = time.perf_counter() - start
+    renderer._step = original_step
+    return max(blocks), total, len(blocks)
+
+
+def main():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No display available ({e}), skipping render benchmark")
+        return
+
+    text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=60, height=15, state=tk.DISABLED)
+    text_area.pack()
+    renderer = ChunkedTextRenderer(text_area)
+    root.update()
+
+    for length in (1000, MAX_TRANSLATION_LENGTH):
+        text = make_text(length)
+        single = bench_single(text_area, text)
+        renderer.clear()
+        longest, total, slices = bench_chunked(root, renderer, text)
+        appended, _, _ = bench_chunked(root, renderer, text + "\n" + "=" * 50 + "\nAI Response:\n" + LINE * 5)
+        print(f"{length:>6} chars: single insert blocks {single * 1000:.1f}ms, "
+              f"chunked max block {longest * 1000:.1f}ms ({slices} slices, {total * 1000:.0f}ms total), "
+              f"append max block {appended * 1000:.1f}ms")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Complexity-based model routing against a fixed-model baseline
+
+Translates a fixture corpus - short labels, a status bar, a tooltip, a
+dialog, the bundled screenshots and full 1080p/4K pages - once with every
+capture going to gpt-4.1-mini and once with routing enabled, where simple
+captures go to gpt-4.1-nano. Requests are answered by a modelled stand-in
+for the OpenAI API, so no network or API key is needed: image tokens
+follow each model's resolution profile and latency a per-model time to
+first token plus time per output token. Local work (complexity estimate,
+encoding) is measured, provider time is modelled.
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import base64
+import asyncio
+import argparse
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image, ImageDraw
+
+from config.settings import Settings
+from core.complexity import estimate_complexity
+from core.metrics import metrics
+from core.tiles import image_tokens
+from core.transport import HttpTransport
+from core.translator import Translator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+BASELINE_MODEL = 'gpt-4.1-mini'
+SIMPLE_MODEL = 'gpt-4.1-nano'
+
+# Modelled provider latency: (time to first token, seconds per output token)
+MODEL_LATENCY = {
+    'gpt-4.1-mini': (0.55, 0.012),
+    'gpt-4.1-nano': (0.30, 0.006)
+}
+
+# Characters per text token of the translation prompt
+PROMPT_CHARS_PER_TOKEN = 4
+
+
+def text_image(lines, width, line_height=18, background=(240, 240, 240)):
+    """Image with the given lines of text in the default bitmap font"""
+    image = Image.new('RGB', (width, line_height * len(lines) + 12), background)
+    draw = ImageDraw.Draw(image)
+    for row, line in enumerate(lines):
+        draw.text((8, 6 + row * line_height), line, fill=(20, 20, 20))
+    return image
+
+
+def page_image(width, height):
+    """Full page of text lines"""
+    words = "the battery is empty please connect the charger to continue".split()
+    lines = [" ".join(words[(row + i) % len(words)] for i in range(width // 60)) for row in range(height // 18 - 1)]
+    return text_image(lines, width).resize((width, height))
+
+
+def fixture_corpus():
+    """(name, image) pairs from a one-word button to a 4K page"""
+    corpus = [
+        ('button', text_image(["OK"], 60)),
+        ('label', text_image(["Save changes"], 140)),
+        ('menu item', text_image(["Export as PDF..."], 180)),
+        ('status bar', text_image(["Connected - 3 items selected - battery 45%"], 420)),
+        ('tooltip', text_image(["Drag to resize the capture area.", "Double-click to switch modes."], 260)),
+        ('dialog', text_image(["Unsaved changes", "", "Do you want to save the changes",
+                               "you made to this document?", "Your changes will be lost", "if you don't save them.",
+                               "", "  [Don't save]   [Cancel]   [Save]"], 360))
+    ]
+    for name in ('screen_scan', 'screen_translate'):
+        with Image.open(os.path.join(ROOT, f'{name}.png')) as image:
+            corpus.append((name, image.convert('RGB')))
+    corpus.append(('1080p page', page_image(1920, 1080)))
+    corpus.append(('4k page', page_image(3840, 2160)))
+    return corpus
+
+
+class _Response:
+    status = 200
+    content_type = 'application/json'
+
+    def __init__(self, body):
+        self._body = json.dumps(body).encode('utf-8')
+
+    async def read(self):
+        return self._body
+
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class ModelledSession:
+    """Answers OpenAI chat completions with modelled usage, adding up modelled latency"""
+
+    closed = False
+
+    def __init__(self, llm_config):
+        self.llm_config = llm_config
+        self.provider_seconds = 0.0
+        self.output_tokens = 0  # Set per capture from its line count
+        self.last_model = None
+
+    def post(self, url, json=None, **kwargs):
+        image_url = json['messages'][1]['content'][0]['image_url']['url']
+        with Image.open(io.BytesIO(base64.b64decode(image_url.split(',', 1)[1]))) as image:
+            size = image.size
+        self.last_model = json['model']
+        input_tokens = (len(json['messages'][0]['content']) // PROMPT_CHARS_PER_TOKEN
+                        + image_tokens(size, self.llm_config[self.last_model]['resolution']))
+
+        first_token, per_token = MODEL_LATENCY[self.last_model]
+        self.provider_seconds += first_token + per_token * self.output_tokens
+        return _Response({
+            'choices': [{'message': {'content': "**Übersetzung:**\n..."}}],
+            'usage': {'prompt_tokens': input_tokens, 'completion_tokens': self.output_tokens}
+        })
+
+    async def close(self):
+        self.closed = True
+
+
+class ModelledTransport(HttpTransport):
+    requires_credentials = False
+
+    def __init__(self, llm_config):
+        super().__init__()
+        self.modelled = ModelledSession(llm_config)
+
+    @property
+    def session(self):
+        return self.modelled
+
+    async def close(self):
+        pass
+
+
+async def translate_corpus(corpus, routing, tmp):
+    """Translate each capture once, returning (name, model, seconds, cost) rows"""
+    settings = Settings(os.path.join(tmp, f'routing-{routing}.ini'))
+    settings.set('api', 'default_llm', BASELINE_MODEL)
+    settings.set('translation', 'cache_translations', 'false')
+    settings.set('translation', 'segment_large_captures', 'false')
+    settings.set('routing', 'enabled', str(routing).lower())
+    settings.set('routing', 'simple_model', SIMPLE_MODEL)
+    transport = ModelledTransport(settings.snapshot.llm_config)
+    translator = Translator(settings, transport)
+
+    rows = []
+    for name, image, lines in corpus:
+        transport.modelled.output_tokens = 15 + 12 * lines
+        provider_before = transport.modelled.provider_seconds
+        cost_before = metrics.counter('cost_usd_total')
+
+        start = time.perf_counter()
+        await translator.translate_image(image)
+        local = time.perf_counter() - start
+
+        rows.append((name, transport.modelled.last_model, local + transport.modelled.provider_seconds - provider_before,
+                     metrics.counter('cost_usd_total') - cost_before))
+    settings.flush()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    corpus = [(name, image, estimate_complexity(image).text_lines) for name, image in fixture_corpus()]
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = asyncio.run(translate_corpus(corpus, False, tmp))
+        routed = asyncio.run(translate_corpus(corpus, True, tmp))
+
+    print(f"\n{'capture':<18}{'size':>11}{'lines':>7}{'model':>15}{'latency':>10}{'baseline':>10}"
+          f"{'cost':>10}{'baseline':>10}")
+    for (name, image, lines), base, row in zip(corpus, baseline, routed):
+        size = f"{image.width}x{image.height}"
+        print(f"{name:<18}{size:>11}{lines:>7}{row[1]:>15}{row[2] * 1000:>8.0f}ms{base[2] * 1000:>8.0f}ms"
+              f"{row[3]:>10.5f}{base[3]:>10.5f}")
+
+    totals = {
+        'baseline': {'latency_s': sum(row[2] for row in baseline), 'cost_usd': sum(row[3] for row in baseline)},
+        'routed': {'latency_s': sum(row[2] for row in routed), 'cost_usd': sum(row[3] for row in routed)}
+    }
+    simple = sum(1 for row in routed if row[1] == SIMPLE_MODEL)
+    latency_saved = 1 - totals['routed']['latency_s'] / totals['baseline']['latency_s']
+    cost_saved = 1 - totals['routed']['cost_usd'] / totals['baseline']['cost_usd']
+    print(f"\n{simple}/{len(corpus)} captures routed to {SIMPLE_MODEL}")
+    print(f"Latency: {totals['routed']['latency_s']:.2f}s vs {totals['baseline']['latency_s']:.2f}s fixed "
+          f"{BASELINE_MODEL} ({latency_saved:.0%} saved)")
+    print(f"Cost: ${totals['routed']['cost_usd']:.5f} vs ${totals['baseline']['cost_usd']:.5f} ({cost_saved:.0%} saved)")
+    p50, p95 = metrics.stage_percentiles('complexity')
+    if p50 is not None:
+        print(f"Complexity estimate: p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'captures': [{'name': name, 'model': row[1], 'latency_s': row[2], 'cost_usd': row[3],
+                                     'baseline_latency_s': base[2], 'baseline_cost_usd': base[3]}
+                                    for (name, _, _), base, row in zip(corpus, baseline, routed)],
+                       'totals': totals}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark segmented, parallel translation against single-shot translation
+
+Runs on the bundled screenshots with a stand-in provider, so no API key or
+network is needed. The stand-in models provider latency as a fixed request
+overhead plus time proportional to the input pixels (prefill) and to the
+amount of ink (a proxy for output tokens).
+"""
+
+import sys
+import os
+import time
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image
+import io
+
+from config.settings import Settings
+from core.translator import Translator
+from core.segmentation import ink_mask, find_text_blocks
+
+# Stand-in provider latency model
+REQUEST_OVERHEAD = 0.35  # seconds
+SECONDS_PER_MEGAPIXEL = 0.5
+SECONDS_PER_INK_KILOPIXEL = 0.01
+
+IMAGES = ['screen_scan.png', 'screen_translate.png']
+
+
+class StandInTranslator(Translator):
+    """Translator answering from a simulated provider"""
+
+    async def _request_translation(self, llm_name: str, image_data: bytes, instructions: str = "") -> str:
+        img = Image.open(io.BytesIO(image_data))
+        ink_pixels = ink_mask(img).histogram()[255]
+        latency = (REQUEST_OVERHEAD
+                   + img.width * img.height / 1e6 * SECONDS_PER_MEGAPIXEL
+                   + ink_pixels / 1e3 * SECONDS_PER_INK_KILOPIXEL)
+        await asyncio.sleep(latency)
+        return f"**Erkannte Sprache:** Test\n**Übersetzung:**\n{img.width}x{img.height}"
+
+
+def run(translator, method, image):
+    """Time one translation with an empty cache"""
+    translator.clear_cache()
+    start = time.perf_counter()
+    asyncio.run(getattr(translator, method)(image))
+    return time.perf_counter() - start
+
+
+def main():
+    settings = Settings()
+    settings.set('api', 'default_llm', 'gemini-2.5-flash')
+    settings.set('translation', 'segment_large_captures', 'true')
+    settings.set('translation', 'segment_min_pixels', '0')
+    settings.set('translation', 'pack_small_blocks', 'false')  # See bench_packing
+    translator = StandInTranslator(settings)
+
+    root = os.path.join(os.path.dirname(__file__), '..')
+    print(f"{'image':<24}{'blocks':>8}{'segment':>10}{'single':>10}{'blocks':>10}{'speedup':>9}")
+    for name in IMAGES:
+        image = Image.open(os.path.join(root, name)).convert('RGB')
+
+        start = time.perf_counter()
+        blocks = find_text_blocks(image)
+        segment_time = time.perf_counter() - start
+
+        single = run(translator, 'translate_image', image)
+        segmented = run(translator, 'translate_segmented', image)
+        print(f"{name:<24}{len(blocks):>8}{segment_time * 1000:>8.1f}ms"
+              f"{single:>9.2f}s{segmented:>9.2f}s{single / segmented:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
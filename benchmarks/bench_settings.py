@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark UI-thread time spent saving settings during a font scaling burst
+
+Simulates a fast Ctrl+mouse-wheel scroll (one scale_font call per wheel
+tick) and compares writing config.ini on every tick with the debounced
+background writer.
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import Settings
+
+TICKS = 60
+TICK_INTERVAL = 0.01  # 100 wheel events per second
+
+
+def run_burst(settings, synchronous):
+    """Scale fonts TICKS times, returning UI-thread time in ms and file writes"""
+    writes = []
+    write_config = settings._write_config
+    settings._write_config = lambda: (writes.append(1), write_config())
+    if synchronous:
+        # Previous behaviour: every save rewrote the file on the calling thread
+        settings.save = settings._write_config
+
+    ui_time = 0.0
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        settings.scale_font(1 if tick % 20 < 10 else -1)
+        ui_time += time.perf_counter() - start
+        time.sleep(TICK_INTERVAL)
+
+    settings.flush()
+    return ui_time * 1000, len(writes)
+
+
+def main():
+    print(f"{TICKS} wheel ticks at {1 / TICK_INTERVAL:.0f}/s\n")
+    print(f"{'mode':<14}{'UI thread':>12}{'per tick':>12}{'writes':>8}")
+    for name, synchronous in (("synchronous", True), ("debounced", False)):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(os.path.join(tmp, 'config.ini'))
+            ui_ms, writes = run_burst(settings, synchronous)
+            print(f"{name:<14}{ui_ms:>10.2f}ms{ui_ms / TICKS:>10.3f}ms{writes:>8}")
+
+
+if __name__ == "__main__":
+    main()
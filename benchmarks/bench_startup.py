@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark based on python -X importtime
+
+Reports the import time of the startup path (main.py up to the overlay),
+the modules deferred to the background preload and, when a display is
+available, the wall time to the first visible overlay against a target.
+"""
+
+import sys
+import os
+import re
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Time from process start to the first visible overlay
+TARGET_OVERLAY_MS = 800
+
+# Modules that must not be imported before the overlay is shown
+DEFERRED_MODULES = ['PIL', 'aiohttp', 'mss', 'pyperclip', 'asyncio', 'sqlite3', 'ui.result_window']
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def import_times(statement):
+    """
+    Run a statement under -X importtime
+
+    Returns:
+        Tuple of (cumulative ms per top-level import, ms per direct
+        dependency of each top-level import, stdout)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    times = {}
+    children = {}
+    pending = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name, ms, depth = match.group(4), int(match.group(2)) / 1000, len(match.group(3))
+        if depth == 1:
+            # Children are listed before their parent
+            times[name] = ms
+            children[name] = pending
+            pending = []
+        elif depth == 3:
+            pending.append((ms, name))
+    return times, children, result.stdout
+
+
+def startup_path():
+    """Report the import cost of main.py and check nothing heavy is loaded"""
+    check = "import main, sys; print(' '.join(m for m in %r if m in sys.modules))" % (DEFERRED_MODULES,)
+    times, children, loaded = import_times(check)
+    print(f"Startup path: import main = {times.get('main', 0):.1f} ms")
+    for ms, name in sorted(children.get('main', []), reverse=True)[:8]:
+        print(f"  {name:<40}{ms:>8.1f} ms")
+
+    loaded = loaded.split()
+    if loaded:
+        print(f"Deferred modules imported on the startup path: {', '.join(loaded)}")
+    return not loaded
+
+
+def deferred_cost():
+    """Report the import cost moved to the background preload"""
+    times, _, _ = import_times("import ui.result_window, core.translator, core.screenshot")
+    total = sum(times.get(name, 0) for name in ('ui.result_window', 'core.translator', 'core.screenshot'))
+    print(f"\nPreloaded in the background: {total:.1f} ms "
+          f"(ui.result_window, core.translator, core.screenshot)")
+
+
+def overlay_time():
+    """Measure time to the first visible overlay, None without a display"""
+    result = subprocess.run(
+        [sys.executable, 'main.py', '--measure-startup'],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    match = re.search(r'Overlay visible after (\d+) ms', result.stdout)
+    return int(match.group(1)) if match else None
+
+
+def main():
+    ok = startup_path()
+    deferred_cost()
+
+    visible = overlay_time()
+    if visible is None:
+        print("\nNo display available, skipping time to first visible overlay")
+    else:
+        ok = ok and visible <= TARGET_OVERLAY_MS
+        print(f"\nOverlay visible after {visible} ms (target {TARGET_OVERLAY_MS} ms)")
+
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
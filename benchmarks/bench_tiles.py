@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Estimated image tokens before and after provider-tile-aware resizing
+
+For each capture of the routing fixture corpus, plus 2x HiDPI versions of
+the larger ones, prints the image tokens each configured model would bill
+for the capture as it is and at the size the translator now sends, along
+with the time the size choice and the resize take. Runs headless.
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image
+
+from bench_routing import fixture_corpus
+from config.settings import Settings
+from core.complexity import estimate_complexity
+from core.tiles import image_tokens, token_minimizing_size
+
+
+def hidpi(image):
+    """The same content rendered at 200% scaling"""
+    return image.resize((image.width * 2, image.height * 2), Image.Resampling.LANCZOS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        settings.set('ollama', 'enabled', 'true')
+        snapshot = settings.snapshot
+        settings.flush()
+    profiles = {name: config['resolution'] for name, config in snapshot.llm_config.items() if 'resolution' in config}
+
+    corpus = fixture_corpus()
+    corpus += [(f"{name} @2x", hidpi(image)) for name, image in corpus if image.width >= 300 and image.width < 2000]
+
+    results = []
+    totals = {name: [0, 0] for name in profiles}
+    print(f"{'capture':<22}{'size':>11}{'line':>6}" + "".join(f"{name:>20}" for name in profiles) + f"{'choose+resize':>15}")
+    for name, image in corpus:
+        complexity = estimate_complexity(image)
+        min_scale = snapshot.min_text_height / complexity.line_height if complexity.line_height else 1.0
+        row = {'name': name, 'size': image.size, 'line_height': complexity.line_height, 'models': {}}
+        cells = []
+        elapsed = 0.0
+        for model, profile in profiles.items():
+            start = time.perf_counter()
+            size = token_minimizing_size(image.size, profile, min_scale)
+            if size != image.size:
+                image.resize(size, Image.Resampling.LANCZOS)
+            elapsed += time.perf_counter() - start
+            before, after = image_tokens(image.size, profile), image_tokens(size, profile)
+            totals[model][0] += before
+            totals[model][1] += after
+            row['models'][model] = {'before': before, 'after': after, 'sent_size': size}
+            cells.append(f"{before:>9} -> {after:<7}")
+        results.append(row)
+        size = f"{image.width}x{image.height}"
+        print(f"{name:<22}{size:>11}{complexity.line_height or '-':>6}" + "".join(f"{cell:>20}" for cell in cells)
+              + f"{elapsed / len(profiles) * 1000:>13.1f}ms")
+
+    print("\nTotal estimated image tokens")
+    for model, (before, after) in totals.items():
+        print(f"  {model:<18}{before:>8} -> {after:<8}({1 - after / before:.0%} fewer)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'captures': results, 'totals': totals}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Load generator for concurrent translation traffic
+
+Drives Translator.translate_image with captures arriving at a given rate
+(Poisson arrivals, or back-to-back with --rate 0) and bounded concurrency.
+Captures are drawn from a corpus of synthetic screens and the bundled
+screenshots, repeating earlier captures with the --duplicates ratio the way
+burst clicks and live mode do. Requests go to a stand-in Ollama server on
+its own thread, so no network or API key is needed and the server does not
+add to the measured event-loop lag.
+
+Reports throughput, latency percentiles, cache hit rate, event-loop lag
+and memory growth per interval and for the whole run.
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aiohttp import web
+from PIL import Image, ImageDraw
+
+from config.settings import Settings
+from core.metrics import metrics, percentile
+from core.translator import Translator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Interval of the event-loop lag probe
+LAG_PROBE_INTERVAL = 0.05
+
+
+def corpus_image(index, size=(960, 540)):
+    """Distinct screen-like image for each index"""
+    rng = random.Random(index)
+    image = Image.new('RGB', size, (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    for y in range(20, size[1] - 20, 24):
+        x = 20
+        while x < size[0] - 120:
+            word_width = rng.randint(15, 90)
+            draw.rectangle((x, y + 4, x + word_width, y + 16), fill=(rng.randint(0, 60),) * 3)
+            x += word_width + 10
+    return image
+
+
+def capture_sequence(total, duplicates, seed=0):
+    """
+    Captures to send, with a tunable share of repeats of earlier captures
+
+    Built up front so generating images does not count towards the
+    measured latency and memory growth.
+    """
+    rng = random.Random(seed)
+    unique = []
+    for name in ('screen_scan.png', 'screen_translate.png'):
+        with Image.open(os.path.join(ROOT, name)) as image:
+            unique.append(image.convert('RGB'))
+
+    sequence = []
+    sent = 0
+    for _ in range(total):
+        if sent and rng.random() < duplicates:
+            sequence.append(unique[rng.randrange(sent)])
+            continue
+        if sent == len(unique):
+            unique.append(corpus_image(sent))
+        sequence.append(unique[sent])
+        sent += 1
+    return sequence
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB, None where unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+    except ImportError:
+        return None
+
+
+class StandInProvider:
+    """Ollama-compatible /api/generate with configurable latency, on its own thread"""
+
+    def __init__(self, latency, jitter):
+        self.latency = latency
+        self.jitter = jitter
+        self.url = None
+        self.requests = 0
+        self._ready = threading.Event()
+        self._loop = None
+        self._runner = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _serve(self):
+        async def generate(request):
+            payload = await request.json()
+            self.requests += 1
+            await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+            return web.json_response({
+                "model": payload['model'],
+                "response": "**Erkannte Sprache:** Chinesisch\n**Übersetzung:**\nDer Akku ist leer.",
+                "done": True,
+                "prompt_eval_count": 800,
+                "eval_count": 40
+            })
+
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/api/generate', generate)
+        self._runner = runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class LoadRun:
+    """One load test against a translator"""
+
+    def __init__(self, translator, captures, rate, concurrency, interval):
+        self.translator = translator
+        self.captures = captures
+        self.rate = rate
+        self.concurrency = concurrency
+        self.interval = interval
+
+        self.latencies = []       # (finish time, seconds)
+        self.lags = []            # (probe time, seconds)
+        self.errors = 0
+        self.in_flight = 0
+        self.series = []
+
+    async def translate(self, semaphore, image):
+        async with semaphore:
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                await self.translator.translate_image(image)
+                self.latencies.append((time.perf_counter(), time.perf_counter() - start))
+            except Exception as e:
+                self.errors += 1
+                if self.errors <= 3:
+                    print(f"Request failed: {e}")
+            finally:
+                self.in_flight -= 1
+
+    async def probe_lag(self):
+        """Measure how late the loop wakes up a sleeping task"""
+        while True:
+            expected = time.perf_counter() + LAG_PROBE_INTERVAL
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            now = time.perf_counter()
+            self.lags.append((now, now - expected))
+
+    async def report_intervals(self, start):
+        """Print one line per interval"""
+        print(f"{'time':>6}{'done':>7}{'req/s':>8}{'p50':>9}{'p95':>9}{'hit rate':>10}{'lag max':>10}{'in flight':>11}{'rss':>9}")
+        last = start
+        while True:
+            await asyncio.sleep(self.interval)
+            self.series.append(self.snapshot(start, last))
+            row = self.series[-1]
+            print(f"{row['time']:>5.0f}s{row['done']:>7}{row['throughput']:>8.1f}"
+                  f"{row['p50_ms']:>7.0f}ms{row['p95_ms']:>7.0f}ms{row['hit_rate']:>9.0%}"
+                  f"{row['lag_max_ms']:>8.1f}ms{row['in_flight']:>11}{row['rss_mb'] or 0:>7.0f}MB")
+            last = time.perf_counter()
+
+    def snapshot(self, start, since):
+        """Statistics of the window since the given time"""
+        now = time.perf_counter()
+        window = [seconds for finished, seconds in self.latencies if finished >= since]
+        lags = [lag for probed, lag in self.lags if probed >= since]
+        return {
+            'time': now - start,
+            'done': len(self.latencies),
+            'throughput': len(window) / max(now - since, 1e-9),
+            'p50_ms': (percentile(window, 0.5) or 0) * 1000,
+            'p95_ms': (percentile(window, 0.95) or 0) * 1000,
+            'hit_rate': hit_rate(),
+            'lag_max_ms': max(lags, default=0) * 1000,
+            'in_flight': self.in_flight,
+            'rss_mb': current_rss_mb()
+        }
+
+    async def run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        probe = asyncio.ensure_future(self.probe_lag())
+        reporter = asyncio.ensure_future(self.report_intervals(start))
+
+        tasks = []
+        for image in self.captures:
+            if self.rate > 0:
+                await asyncio.sleep(rng.expovariate(self.rate))
+            else:
+                # Closed loop: wait for a free slot before the next capture
+                while self.in_flight >= self.concurrency:
+                    await asyncio.sleep(0.001)
+            tasks.append(asyncio.ensure_future(self.translate(semaphore, image)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        elapsed = time.perf_counter() - start
+        probe.cancel()
+        reporter.cancel()
+        return elapsed
+
+
+def hit_rate():
+    hits = metrics.counter('cache_lookups_total', result='hit')
+    misses = metrics.counter('cache_lookups_total', result='miss')
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help="Captures to send (default 200)")
+    parser.add_argument('--rate', type=float, default=20.0, help="Arrivals per second, 0 for back-to-back (default 20)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Maximum captures in flight (default 8)")
+    parser.add_argument('--duplicates', type=float, default=0.5, help="Share of repeated captures, 0-1 (default 0.5)")
+    parser.add_argument('--latency', type=float, default=300, help="Stand-in provider latency in ms (default 300)")
+    parser.add_argument('--jitter', type=float, default=50, help="Standard deviation of the latency in ms (default 50)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between report lines (default 2)")
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    provider = StandInProvider(args.latency / 1000, args.jitter / 1000).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        settings.set('api', 'default_llm', 'ollama')
+        settings.set('ollama', 'enabled', 'true')
+        settings.set('ollama', 'base_url', provider.url)
+        settings.set('ollama', 'timeout', '120')
+        settings.set('translation', 'max_cache_entries', str(args.requests))
+        translator = Translator(settings)
+
+        print(f"{args.requests} captures, rate {args.rate or 'unlimited'}/s, concurrency {args.concurrency}, "
+              f"{args.duplicates:.0%} duplicates, provider {args.latency:.0f}±{args.jitter:.0f} ms\n")
+
+        captures = capture_sequence(args.requests, args.duplicates)
+        metrics.reset()
+        rss_start = current_rss_mb()
+        load = LoadRun(translator, captures, args.rate, args.concurrency, args.interval)
+
+        async def run():
+            try:
+                return await load.run()
+            finally:
+                await translator.close()
+
+        elapsed = asyncio.run(run())
+        rss_end = current_rss_mb()
+        provider.stop()
+        settings.flush()
+
+    latencies = [seconds for _, seconds in load.latencies]
+    lags = [lag for _, lag in load.lags]
+    summary = {
+        'requests': args.requests,
+        'completed': len(latencies),
+        'errors': load.errors,
+        'elapsed_s': elapsed,
+        'throughput': len(latencies) / elapsed,
+        'latency_ms': {f"p{int(q * 100)}": (percentile(latencies, q) or 0) * 1000 for q in (0.5, 0.95, 0.99)},
+        'cache_hit_rate': hit_rate(),
+        'provider_requests': provider.requests,
+        'loop_lag_ms': {'p99': (percentile(lags, 0.99) or 0) * 1000, 'max': max(lags, default=0) * 1000},
+        'rss_mb': {'start': rss_start, 'end': rss_end},
+        'series': load.series
+    }
+
+    print(f"\nCompleted {summary['completed']}/{args.requests} in {elapsed:.1f}s "
+          f"({summary['throughput']:.1f} captures/s, {load.errors} errors)")
+    print("Latency: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in summary['latency_ms'].items()))
+    print(f"Cache hit rate: {summary['cache_hit_rate']:.0%} "
+          f"({provider.requests} provider requests for {args.requests} captures)")
+    print(f"Event-loop lag: p99 {summary['loop_lag_ms']['p99']:.1f} ms, max {summary['loop_lag_ms']['max']:.1f} ms")
+    if rss_start is not None and rss_end is not None:
+        print(f"Memory: {rss_start:.0f} MB -> {rss_end:.0f} MB ({rss_end - rss_start:+.0f} MB)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
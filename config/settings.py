@@ -3,17 +3,173 @@ Configuration management for VisoLingua
 """
 
 import configparser
+import io
 import os
 import sys
-from typing import Dict, Any
+import tempfile
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
+
+
+# Saves within this many seconds are written to disk once
+SAVE_DELAY = 0.5
+
+
+def parse_region(value: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parse a region from its config value
+
+    Args:
+        value: "left, top, right, bottom" in screen pixels
+
+    Returns:
+        Bounding box, None if the value is not a non-empty box
+    """
+    try:
+        left, top, right, bottom = (int(part) for part in value.split(','))
+    except ValueError:
+        return None
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right, bottom
+
+
+def format_region(bbox: Tuple[int, int, int, int]) -> str:
+    """Get the config value of a region"""
+    return ", ".join(str(value) for value in bbox)
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """
+    Immutable, typed view of the settings
+    
+    Built once per change so hot paths read plain attributes instead of
+    going through configparser on every capture.
+    """
+    default_llm: str
+    gemini_api_key: str
+    openai_api_key: str
+    ollama_enabled: bool
+    ollama_base_url: str
+    ollama_model: str
+    ollama_timeout: int
+    ollama_preload: bool
+    ollama_keep_alive_min: int
+    ollama_keep_alive_max: int
+    overlay_transparency: float
+    overlay_border_color: str
+    overlay_border_width: int
+    always_on_top: bool
+    font_family: str
+    font_size: int
+    source_language: str
+    target_language: str
+    cache_translations: bool
+    max_cache_entries: int
+    scroll_detection: bool
+    segment_large_captures: bool
+    segment_min_pixels: int
+    max_parallel_requests: int
+    tile_aware_resize: bool
+    min_text_height: int
+    pack_small_blocks: bool
+    pack_max_block_pixels: int
+    prompt_variant: str
+    script_detection: bool
+    skip_target_language: bool
+    history_max_entries: int
+    prewarm_connections: bool
+    keep_warm_interval: int
+    prewarm_idle_minutes: int
+    metrics_export_file: str
+    profile: bool
+    provider_slots: int
+    task_limits: Tuple[int, int, int, int]
+    speculation_enabled: bool
+    speculation_idle_seconds: float
+    speculation_interval_seconds: float
+    speculation_budget_usd: float
+    routing_enabled: bool
+    routing_simple_model: str
+    routing_allow_local: bool
+    routing_dense_model: str
+    routing_max_lines: int
+    routing_max_edge_density: float
+    routing_max_megapixels: float
+    regions: Tuple[Tuple[str, Tuple[int, int, int, int]], ...]
+    llm_config: Mapping[str, Dict]
+    
+    @classmethod
+    def from_settings(cls, settings: 'Settings') -> 'SettingsSnapshot':
+        """Read all values from a Settings instance"""
+        return cls(
+            default_llm=settings.get('api', 'default_llm', 'gemini-2.5-flash'),
+            gemini_api_key=settings.get('api', 'gemini_api_key', ''),
+            openai_api_key=settings.get('api', 'openai_api_key', ''),
+            ollama_enabled=settings.getboolean('ollama', 'enabled', False),
+            ollama_base_url=settings.get('ollama', 'base_url', 'http://localhost:11434'),
+            ollama_model=settings.get('ollama', 'model', 'llava:7b'),
+            ollama_timeout=settings.getint('ollama', 'timeout', 30),
+            ollama_preload=settings.getboolean('ollama', 'preload', True),
+            ollama_keep_alive_min=max(1, settings.getint('ollama', 'keep_alive_min_minutes', 5)),
+            ollama_keep_alive_max=settings.getint('ollama', 'keep_alive_max_minutes', 60),
+            overlay_transparency=settings.getfloat('ui', 'overlay_transparency', 0.05),
+            overlay_border_color=settings.get('ui', 'overlay_border_color', '#FF0000'),
+            overlay_border_width=settings.getint('ui', 'overlay_border_width', 2),
+            always_on_top=settings.getboolean('ui', 'always_on_top', True),
+            font_family=settings.get('ui', 'font_family', 'TkDefaultFont'),
+            font_size=settings.getint('ui', 'font_size', 10),
+            source_language=settings.get('translation', 'source_language', 'auto'),
+            target_language=settings.get('translation', 'target_language', 'de'),
+            cache_translations=settings.getboolean('translation', 'cache_translations', True),
+            max_cache_entries=settings.getint('translation', 'max_cache_entries', 100),
+            scroll_detection=settings.getboolean('translation', 'scroll_detection', True),
+            segment_large_captures=settings.getboolean('translation', 'segment_large_captures', True),
+            segment_min_pixels=settings.getint('translation', 'segment_min_pixels', 1000000),
+            max_parallel_requests=max(1, settings.getint('translation', 'max_parallel_requests', 3)),
+            tile_aware_resize=settings.getboolean('translation', 'tile_aware_resize', True),
+            min_text_height=max(6, settings.getint('translation', 'min_text_height', 14)),
+            pack_small_blocks=settings.getboolean('translation', 'pack_small_blocks', True),
+            pack_max_block_pixels=settings.getint('translation', 'pack_max_block_pixels', 200000),
+            prompt_variant=settings.get('translation', 'prompt_variant', 'auto'),
+            script_detection=settings.getboolean('translation', 'script_detection', True),
+            skip_target_language=settings.getboolean('translation', 'skip_target_language', False),
+            history_max_entries=settings.getint('history', 'max_entries', 50000),
+            prewarm_connections=settings.getboolean('network', 'prewarm_connections', True),
+            keep_warm_interval=max(5, settings.getint('network', 'keep_warm_interval', 30)),
+            prewarm_idle_minutes=settings.getint('network', 'prewarm_idle_minutes', 10),
+            metrics_export_file=settings.get('metrics', 'export_file', ''),
+            profile=settings.getboolean('debug', 'profile', False),
+            provider_slots=max(1, settings.getint('scheduler', 'provider_slots', 4)),
+            task_limits=tuple(max(1, settings.getint('scheduler', name, default))
+                              for name, default in (('interactive', 4), ('ask', 2), ('prefetch', 2), ('bulk', 1))),
+            speculation_enabled=settings.getboolean('speculation', 'enabled', False),
+            speculation_idle_seconds=max(0.5, settings.getfloat('speculation', 'idle_seconds', 3.0)),
+            speculation_interval_seconds=max(1.0, settings.getfloat('speculation', 'interval_seconds', 5.0)),
+            speculation_budget_usd=max(0.0, settings.getfloat('speculation', 'budget_usd', 0.05)),
+            routing_enabled=settings.getboolean('routing', 'enabled', False),
+            routing_simple_model=settings.get('routing', 'simple_model', ''),
+            routing_allow_local=settings.getboolean('routing', 'allow_local_simple_model', False),
+            routing_dense_model=settings.get('routing', 'dense_model', ''),
+            routing_max_lines=settings.getint('routing', 'max_simple_lines', 3),
+            routing_max_edge_density=settings.getfloat('routing', 'max_simple_edge_density', 0.25),
+            routing_max_megapixels=settings.getfloat('routing', 'max_simple_megapixels', 0.5),
+            regions=settings._build_regions(),
+            llm_config=MappingProxyType(settings._build_llm_config())
+        )
 
 
 class Settings:
     """Manages application settings and configuration"""
     
-    def __init__(self):
+    def __init__(self, config_file: Optional[str] = None, save_delay: float = SAVE_DELAY):
         # For PyInstaller compatibility - config.ini next to EXE
-        if getattr(sys, 'frozen', False):
+        if config_file:
+            self.config_file = config_file
+        elif getattr(sys, 'frozen', False):
             # Running as PyInstaller executable
             exe_dir = os.path.dirname(sys.executable)
             self.config_file = os.path.join(exe_dir, 'config.ini')
@@ -22,15 +178,105 @@ class Settings:
             self.config_file = os.path.join(os.path.dirname(__file__), 'config.ini')
             
         self.config = configparser.ConfigParser()
+        self._subscribers: List[Callable[[SettingsSnapshot], None]] = []
+        self._file_mtime = None  # mtime of our own last read or write
+        self._watcher = None
+        self._watching = threading.Event()
+        
+        # Debounced persistence: save() schedules one background write
+        self.save_delay = save_delay
+        self._save_lock = threading.RLock()
+        self._save_timer = None
+        
         self._load_config()
+        self.snapshot = SettingsSnapshot.from_settings(self)
         
     def _load_config(self):
         """Load configuration from file or create defaults"""
         if os.path.exists(self.config_file):
             self.config.read(self.config_file)
+            self._file_mtime = self._read_mtime()
         else:
             self._create_default_config()
             
+    def _read_mtime(self) -> Optional[int]:
+        """Get the config file's modification time, None if it is missing"""
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+            
+    def subscribe(self, callback: Callable[[SettingsSnapshot], None]):
+        """
+        Get notified with the new snapshot whenever settings change
+        
+        Callbacks run on the thread that changed the settings; reloads from
+        the file watcher run wherever its schedule function puts them.
+        """
+        self._subscribers.append(callback)
+        
+    def unsubscribe(self, callback: Callable[[SettingsSnapshot], None]):
+        """Stop notifications to a subscriber"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+            
+    def _refresh_snapshot(self):
+        """Rebuild the snapshot and notify subscribers if anything changed"""
+        snapshot = SettingsSnapshot.from_settings(self)
+        if snapshot == getattr(self, 'snapshot', None):
+            return
+        self.snapshot = snapshot
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in settings subscriber: {e}")
+                
+    def reload(self):
+        """Re-read config.ini, e.g. after it was edited outside the app"""
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config_file)
+        except configparser.Error as e:
+            print(f"Error reloading config, keeping current settings: {e}")
+            return
+        self.config = config
+        self._file_mtime = self._read_mtime()
+        self._refresh_snapshot()
+        print("Configuration reloaded")
+        
+    def start_watching(self, schedule: Optional[Callable[[Callable[[], None]], None]] = None,
+                       interval: float = 1.0):
+        """
+        Reload config.ini when it changes on disk
+        
+        Args:
+            schedule: Runs the reload on the right thread, e.g. via Tk's
+                after(); the reload runs on the watcher thread if omitted
+            interval: Seconds between modification time checks
+        """
+        if self._watcher is not None:
+            return
+            
+        def watch():
+            while not self._watching.wait(interval):
+                # Not while our own write is replacing the file
+                with self._save_lock:
+                    mtime = self._read_mtime()
+                    changed = mtime is not None and mtime != self._file_mtime
+                    if changed:
+                        self._file_mtime = mtime  # Report each change once
+                if changed:
+                    (schedule or (lambda reload: reload()))(self.reload)
+                    
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+        
+    def stop_watching(self):
+        """Stop the config file watcher"""
+        self._watching.set()
+        self._watcher = None
+            
     def _create_default_config(self):
         """Create default configuration file"""
         self.config['api'] = {
@@ -43,7 +289,10 @@ class Settings:
             'enabled': 'false',
             'base_url': 'http://localhost:11434',
             'model': 'llava:7b',
-            'timeout': '30'
+            'timeout': '30',
+            'preload': 'true',
+            'keep_alive_min_minutes': '5',
+            'keep_alive_max_minutes': '60'
         }
         
         self.config['ui'] = {
@@ -60,22 +309,130 @@ class Settings:
             'source_language': 'auto',
             'target_language': 'de',
             'cache_translations': 'true',
-            'max_cache_entries': '100'
+            'max_cache_entries': '100',
+            'scroll_detection': 'true',
+            'segment_large_captures': 'true',
+            'segment_min_pixels': '1000000',
+            'max_parallel_requests': '3',
+            'tile_aware_resize': 'true',
+            'min_text_height': '14',
+            'pack_small_blocks': 'true',
+            'pack_max_block_pixels': '200000',
+            'prompt_variant': 'auto',
+            'script_detection': 'true',
+            'skip_target_language': 'false'
         }
         
+        self.config['history'] = {
+            'max_entries': '50000'
+        }
+        
+        self.config['network'] = {
+            'prewarm_connections': 'true',
+            'keep_warm_interval': '30',
+            'prewarm_idle_minutes': '10'
+        }
+        
+        # Written after every translation: *.json for a JSON snapshot,
+        # anything else in the Prometheus text format
+        self.config['metrics'] = {
+            'export_file': ''
+        }
+        
+        # Concurrent provider requests, and concurrent tasks per priority class
+        self.config['scheduler'] = {
+            'provider_slots': '4',
+            'interactive': '4',
+            'ask': '2',
+            'prefetch': '2',
+            'bulk': '1'
+        }
+        
+        # Translate the area under an idle overlay before it is clicked;
+        # budget_usd caps the estimated spend per session
+        self.config['speculation'] = {
+            'enabled': 'false',
+            'idle_seconds': '3',
+            'interval_seconds': '5',
+            'budget_usd': '0.05'
+        }
+        
+        # Send simple captures to a cheaper model; empty models pick the
+        # cheapest configured model and the default LLM
+        self.config['routing'] = {
+            'enabled': 'false',
+            'simple_model': '',
+            'allow_local_simple_model': 'false',
+            'dense_model': '',
+            'max_simple_lines': '3',
+            'max_simple_edge_density': '0.25',
+            'max_simple_megapixels': '0.5'
+        }
+        
+        self.config['debug'] = {
+            'profile': 'false'
+        }
+        
+        # Named capture regions, "name = left, top, right, bottom"
+        self.config['regions'] = {}
+        
         self.config['hotkeys'] = {
             'toggle_tabs': 'ctrl+tab',
             'take_screenshot': 'click',
             'copy_result': 'ctrl+c'
         }
         
-        self.save()
+        self._write_config()
         
     def save(self):
-        """Save current configuration to file"""
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
+        """
+        Save current configuration to file
+        
+        The write happens on a background thread after save_delay seconds,
+        so repeated saves (e.g. while scaling fonts) are coalesced into one.
+        Call flush() to write pending changes immediately.
+        """
+        with self._save_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self._write_config)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+                
+    def flush(self):
+        """Write a pending save now"""
+        with self._save_lock:
+            timer = self._save_timer
+            if timer is None:
+                return
+            timer.cancel()
+            self._write_config()
             
+    def _write_config(self):
+        """Write config.ini atomically through a temporary file"""
+        with self._save_lock:
+            self._save_timer = None
+            buffer = io.StringIO()
+            self.config.write(buffer)
+            
+            directory = os.path.dirname(os.path.abspath(self.config_file))
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        f.write(buffer.getvalue())
+                    os.replace(temp_path, self.config_file)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except OSError as e:
+                print(f"Error saving configuration: {e}")
+                return
+            self._file_mtime = self._read_mtime()  # Not a change for the watcher
+            
+    def data_path(self, filename: str) -> str:
+        """Get path of a data file stored next to config.ini"""
+        return os.path.join(os.path.dirname(self.config_file), filename)
+        
     def get(self, section: str, key: str, fallback: Any = None) -> str:
         """Get configuration value"""
         return self.config.get(section, key, fallback=fallback)
@@ -94,28 +451,73 @@ class Settings:
         
     def set(self, section: str, key: str, value: str):
         """Set configuration value"""
-        if not self.config.has_section(section):
-            self.config.add_section(section)
-        self.config.set(section, key, str(value))
+        with self._save_lock:
+            if not self.config.has_section(section):
+                self.config.add_section(section)
+            self.config.set(section, key, str(value))
+        self._refresh_snapshot()
+        
+    def save_region(self, name: str, bbox: Tuple[int, int, int, int]):
+        """Save a named capture region"""
+        self.set('regions', name, format_region(bbox))
+        self.save()
+        
+    def remove_region(self, name: str):
+        """Remove a named capture region"""
+        with self._save_lock:
+            removed = self.config.remove_option('regions', name) if self.config.has_section('regions') else False
+        if removed:
+            self._refresh_snapshot()
+            self.save()
+            
+    def _build_regions(self) -> Tuple[Tuple[str, Tuple[int, int, int, int]], ...]:
+        """Read the named capture regions, skipping malformed ones"""
+        if not self.config.has_section('regions'):
+            return ()
+        regions = []
+        for name, value in self.config.items('regions'):
+            bbox = parse_region(value)
+            if bbox is None:
+                print(f"Ignoring region {name}: expected left, top, right, bottom, got {value!r}")
+                continue
+            regions.append((name, bbox))
+        return tuple(regions)
         
     @property
-    def llm_config(self) -> Dict[str, Dict]:
-        """Get LLM configuration"""
+    def llm_config(self) -> Mapping[str, Dict]:
+        """Get LLM configuration (cached in the snapshot)"""
+        return self.snapshot.llm_config
+        
+    def _build_llm_config(self) -> Dict[str, Dict]:
+        """Build the LLM configuration from the current values"""
         config = {
+            # model_name is the provider's model, shared by translations and Ask AI
             'gemini-2.5-flash': {
                 'endpoint': 'https://generativelanguage.googleapis.com/v1beta/',
+                'model_name': 'gemini-2.0-flash-exp',
                 'max_image_size': '4MB',
-                'cost_per_1m_tokens': {'input': 0.10, 'output': 0.40}
+                'cost_per_1m_tokens': {'input': 0.10, 'cached_input': 0.025, 'output': 0.40},
+                # Prompt prefixes from this length on are cached implicitly
+                'prompt_cache_min_tokens': 1024,
+                # 258 tokens per 768 px tile, one tile for images up to 384 px
+                'resolution': {'mode': 'tiles', 'tile': 768, 'tile_tokens': 258, 'small_size': 384}
             },
             'gpt-4.1-mini': {
                 'endpoint': 'https://api.openai.com/v1/',
+                'model_name': 'gpt-4.1-mini',
                 'max_image_size': '20MB', 
-                'cost_per_1m_tokens': {'input': 0.40, 'output': 1.60}
+                'cost_per_1m_tokens': {'input': 0.40, 'cached_input': 0.10, 'output': 1.60},
+                'prompt_cache_min_tokens': 1024,
+                # 32 px patches, at most 1536, times a per-model multiplier
+                'resolution': {'mode': 'patches', 'patch': 32, 'max_patches': 1536, 'multiplier': 1.62}
             },
             'gpt-4.1-nano': {
                 'endpoint': 'https://api.openai.com/v1/',
+                'model_name': 'gpt-4.1-nano',
                 'max_image_size': '20MB',
-                'cost_per_1m_tokens': {'input': 0.15, 'output': 0.60}
+                'cost_per_1m_tokens': {'input': 0.15, 'cached_input': 0.0375, 'output': 0.60},
+                'prompt_cache_min_tokens': 1024,
+                'resolution': {'mode': 'patches', 'patch': 32, 'max_patches': 1536, 'multiplier': 2.46}
             }
         }
         
@@ -131,16 +533,21 @@ class Settings:
                 'type': 'ollama',
                 'max_image_size': '20MB',
                 'cost_per_1m_tokens': {'input': 0.0, 'output': 0.0},  # Local = free
-                'timeout': timeout
+                'timeout': timeout,
+                # The loaded model reuses the evaluated prefix of the previous request
+                'prompt_cache_min_tokens': 0
             }
+            if selected_model.startswith('llava'):
+                # LLaVA 1.6 takes up to 672x672 pixels as 5 x 576 tokens
+                config['ollama']['resolution'] = {'mode': 'native', 'max_pixels': 672 * 672, 'tokens': 2880}
             
         return config
     
     def get_font_config(self) -> Dict[str, Any]:
         """Get font configuration for UI"""
         return {
-            'family': self.get('ui', 'font_family', 'TkDefaultFont'),
-            'size': self.getint('ui', 'font_size', 10)
+            'family': self.snapshot.font_family,
+            'size': self.snapshot.font_size
         }
     
     def scale_font(self, delta: int):
@@ -163,6 +570,8 @@ class Settings:
                 'type': 'ollama',
                 'max_image_size': '20MB',
                 'cost_per_1m_tokens': {'input': 0.0, 'output': 0.0},  # Local = free
+                # LLaVA 1.6 takes up to 672x672 pixels as 5 x 576 tokens
+                'resolution': {'mode': 'native', 'max_pixels': 672 * 672, 'tokens': 2880},
                 'timeout': timeout
             },
             'ollama-internvl-2b': {
@@ -208,6 +617,20 @@ Ausgabeformat:
 [übersetzter Text]
 """
 
+    @property
+    def compact_translation_prompt(self) -> str:
+        """Get the shortest prompt asking for the same translation and output format"""
+        return """Übersetze allen Text im Bild ins Deutsche, Formatierung beibehalten, Textblöcke nummerieren. Antworte so:
+**Erkannte Sprache:** [Sprache]
+**Übersetzung:**
+[übersetzter Text]
+"""
+
+    @property
+    def compact_chinese_prompt(self) -> str:
+        """Get the shortest form of the Chinese-optimized prompt"""
+        return "Chinesisch: Kurz- und Langzeichen, Mehrdeutiges aus dem Kontext, Redewendungen sinngemäß, Fachbegriffe auch englisch.\n"
+
     @property
     def chinese_optimized_prompt(self) -> str:
         """Get Chinese-optimized prompt"""
@@ -0,0 +1,308 @@
+"""
+Conversational Ask AI sessions about a translation result
+"""
+
+import json
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+
+from core.transport import HttpTransport
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+
+# How long Gemini keeps the cached document
+GEMINI_CACHE_TTL = "600s"
+
+# Same limit aiohttp applies by default, passed explicitly to streamed requests
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=300)
+
+SYSTEM_PROMPT = (
+    "You answer questions about the following translation result. "
+    "Keep answers helpful and concise."
+)
+
+
+class AskSession:
+    """
+    Follow-up questions about one translation result
+
+    The translation is sent once and then referenced through the provider's
+    context mechanism: Gemini cached content, the OpenAI conversation (whose
+    stable prefix is cached automatically) or Ollama's returned context.
+    Answers are streamed chunk by chunk.
+
+    Requests go through the translator's transport when one is given, so
+    they share its pooled connections, tracing and cassette recording.
+    """
+
+    def __init__(self, settings, document: str, transport: Optional[HttpTransport] = None, provider_slots=None):
+        self.settings = settings
+        self.document = document
+        self.transport = transport or HttpTransport()
+        self.provider_slots = provider_slots  # Shared with translations, see core.scheduler
+        self.llm_name = settings.snapshot.default_llm
+        self.turns: List[Dict[str, Any]] = []  # question, answer, input_tokens, cached_tokens
+
+        self._owns_transport = transport is None
+        self._gemini_cache: Optional[str] = None   # cachedContents/... name
+        self._gemini_cache_tried = False
+        self._messages: List[Dict[str, Any]] = []  # Gemini contents / OpenAI messages
+        self._ollama_context: Optional[List[int]] = None
+
+    async def ask(self, question: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Ask a question about the document
+
+        Args:
+            question: User question
+            on_chunk: Called with each streamed piece of the answer
+
+        Returns:
+            Full answer text
+        """
+        self.transport.touch()
+        if self.provider_slots is not None:
+            async with self.provider_slots.slot():
+                answer, usage = await self._ask_provider(question, on_chunk)
+        else:
+            answer, usage = await self._ask_provider(question, on_chunk)
+
+        self.turns.append({
+            'question': question,
+            'answer': answer,
+            'input_tokens': usage.get('input_tokens'),
+            'cached_tokens': usage.get('cached_tokens', 0)
+        })
+        return answer
+
+    async def _ask_provider(self, question: str, on_chunk: Optional[Callable[[str], None]]):
+        """Dispatch a question to the default LLM's provider"""
+        if self.llm_name.startswith('gemini'):
+            return await self._ask_gemini(question, on_chunk)
+        elif self.llm_name.startswith('gpt'):
+            return await self._ask_openai(question, on_chunk)
+        elif self.llm_name == 'ollama':
+            return await self._ask_ollama(question, on_chunk)
+        raise ValueError(f"Unsupported LLM: {self.llm_name}")
+
+    async def close(self):
+        """Release the cached document, and the transport if the session created it"""
+        try:
+            if self._gemini_cache:
+                api_key = self.settings.snapshot.gemini_api_key
+                async with self.transport.session.delete(f"{GEMINI_BASE_URL}/{self._gemini_cache}?key={api_key}"):
+                    pass
+        except aiohttp.ClientError:
+            pass  # Expires on its own after GEMINI_CACHE_TTL
+        finally:
+            self._gemini_cache = None
+            if self._owns_transport:
+                await self.transport.close()
+
+    async def _stream_lines(self, response: aiohttp.ClientResponse):
+        """Yield non-empty lines of a streamed response body"""
+        buffer = b""
+        async for data in response.content.iter_any():
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                line = line.strip()
+                if line:
+                    yield line.decode('utf-8')
+        if buffer.strip():
+            yield buffer.strip().decode('utf-8')
+
+    def _post_stream(self, url: str, payload: Dict, headers: Optional[Dict] = None,
+                     timeout: aiohttp.ClientTimeout = REQUEST_TIMEOUT):
+        """POST a streamed request on the shared transport"""
+        return self.transport.session.post(url, json=payload, headers=headers, timeout=timeout)
+
+    async def _raise_for_status(self, response):
+        """Raise on HTTP errors, with the provider's error text"""
+        if response.status != 200:
+            error_text = await response.text()
+            raise Exception(f"{self.llm_name} API error ({response.status}): {error_text}")
+
+    # === Gemini ===
+
+    def _api_model(self) -> str:
+        """Provider model of the default LLM, the same one translations use"""
+        return self.settings.snapshot.llm_config[self.llm_name]['model_name']
+
+    async def _create_gemini_cache(self, api_key: str):
+        """Cache the document server-side; small documents are rejected by the API"""
+        self._gemini_cache_tried = True
+        payload = {
+            "model": f"models/{self._api_model()}",
+            "systemInstruction": {"parts": [{"text": SYSTEM_PROMPT}]},
+            "contents": [{"role": "user", "parts": [{"text": self.document}]}],
+            "ttl": GEMINI_CACHE_TTL
+        }
+        try:
+            async with self.transport.session.post(f"{GEMINI_BASE_URL}/cachedContents?key={api_key}",
+                                                   json=payload) as response:
+                if response.status == 200:
+                    self._gemini_cache = (await response.json()).get('name')
+        except aiohttp.ClientError:
+            pass
+
+    async def _ask_gemini(self, question: str, on_chunk):
+        api_key = self.settings.snapshot.gemini_api_key
+        if not api_key and self.transport.requires_credentials:
+            raise ValueError("Gemini API key not configured")
+
+        if not self._gemini_cache_tried:
+            await self._create_gemini_cache(api_key)
+
+        self._messages.append({"role": "user", "parts": [{"text": question}]})
+        payload = {
+            "contents": self._messages,
+            "generationConfig": {
+                "temperature": 0.3,
+                "topK": 1,
+                "topP": 1,
+                "maxOutputTokens": 1024,
+            }
+        }
+        if self._gemini_cache:
+            payload["cachedContent"] = self._gemini_cache
+        else:
+            # Fallback: document travels as system instruction with every turn
+            payload["systemInstruction"] = {"parts": [{"text": f"{SYSTEM_PROMPT}\n\n{self.document}"}]}
+
+        url = f"{GEMINI_BASE_URL}/models/{self._api_model()}:streamGenerateContent?alt=sse&key={api_key}"
+        parts = []
+        usage = {}
+        try:
+            async with self._post_stream(url, payload) as response:
+                await self._raise_for_status(response)
+                async for line in self._stream_lines(response):
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = json.loads(line[5:])
+                    for candidate in chunk.get('candidates', [])[:1]:
+                        for part in candidate.get('content', {}).get('parts', []):
+                            text = part.get('text', '')
+                            if text:
+                                parts.append(text)
+                                if on_chunk:
+                                    on_chunk(text)
+                    metadata = chunk.get('usageMetadata')
+                    if metadata:
+                        usage = {
+                            'input_tokens': metadata.get('promptTokenCount'),
+                            'cached_tokens': metadata.get('cachedContentTokenCount', 0)
+                        }
+        except Exception:
+            self._messages.pop()
+            raise
+
+        answer = "".join(parts)
+        if not answer:
+            self._messages.pop()
+            raise Exception("No response from Gemini")
+        self._messages.append({"role": "model", "parts": [{"text": answer}]})
+        return answer, usage
+
+    # === OpenAI ===
+
+    async def _ask_openai(self, question: str, on_chunk):
+        api_key = self.settings.snapshot.openai_api_key
+        if not api_key and self.transport.requires_credentials:
+            raise ValueError("OpenAI API key not configured")
+
+        if not self._messages:
+            # Stable prefix (system + document) is served from OpenAI's prompt cache
+            self._messages = [{"role": "system", "content": f"{SYSTEM_PROMPT}\n\n{self.document}"}]
+        self._messages.append({"role": "user", "content": question})
+
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self._api_model(),
+            "messages": self._messages,
+            "max_tokens": 1024,
+            "temperature": 0.3,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+
+        parts = []
+        usage = {}
+        try:
+            async with self._post_stream(OPENAI_URL, payload, headers) as response:
+                await self._raise_for_status(response)
+                async for line in self._stream_lines(response):
+                    if not line.startswith("data:") or line[5:].strip() == "[DONE]":
+                        continue
+                    chunk = json.loads(line[5:])
+                    for choice in chunk.get('choices', [])[:1]:
+                        text = choice.get('delta', {}).get('content') or ''
+                        if text:
+                            parts.append(text)
+                            if on_chunk:
+                                on_chunk(text)
+                    if chunk.get('usage'):
+                        details = chunk['usage'].get('prompt_tokens_details') or {}
+                        usage = {
+                            'input_tokens': chunk['usage'].get('prompt_tokens'),
+                            'cached_tokens': details.get('cached_tokens', 0)
+                        }
+        except Exception:
+            self._messages.pop()
+            raise
+
+        answer = "".join(parts)
+        if not answer:
+            self._messages.pop()
+            raise Exception("No response from OpenAI")
+        self._messages.append({"role": "assistant", "content": answer})
+        return answer, usage
+
+    # === Ollama ===
+
+    async def _ask_ollama(self, question: str, on_chunk):
+        snapshot = self.settings.snapshot
+        if not snapshot.ollama_enabled:
+            raise ValueError("Ollama not enabled in configuration")
+
+        payload = {
+            "model": self._api_model(),
+            "stream": True,
+            "options": {
+                "temperature": 0.3,
+                "top_p": 0.9,
+                "num_predict": 1000
+            }
+        }
+        if self._ollama_context is None:
+            payload["system"] = SYSTEM_PROMPT
+            payload["prompt"] = f"{self.document}\n\nQuestion: {question}"
+        else:
+            # The returned context already encodes the document and earlier turns
+            payload["context"] = self._ollama_context
+            payload["prompt"] = f"Question: {question}"
+
+        parts = []
+        usage = {}
+        timeout = aiohttp.ClientTimeout(total=snapshot.ollama_timeout)
+        async with self._post_stream(f"{snapshot.ollama_base_url}/api/generate", payload, timeout=timeout) as response:
+            await self._raise_for_status(response)
+            async for line in self._stream_lines(response):
+                chunk = json.loads(line)
+                text = chunk.get('response', '')
+                if text:
+                    parts.append(text)
+                    if on_chunk:
+                        on_chunk(text)
+                if chunk.get('done'):
+                    self._ollama_context = chunk.get('context', self._ollama_context)
+                    usage = {'input_tokens': chunk.get('prompt_eval_count')}
+
+        answer = "".join(parts).strip()
+        if not answer:
+            raise Exception("Empty response from Ollama")
+        return answer, usage
@@ -0,0 +1,351 @@
+"""
+Record/replay of provider exchanges for offline performance tests
+"""
+
+import asyncio
+import json
+import os
+import time
+import aiohttp
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from core.metrics import metrics
+from core.transport import HttpTransport
+
+CASSETTE_VERSION = 1
+
+# Query parameters that carry credentials (Gemini passes its key as ?key=)
+SECRET_PARAMETERS = {'key', 'api_key', 'apikey', 'access_token', 'token'}
+
+REDACTED = 'REDACTED'
+
+
+class CassetteError(aiohttp.ClientError):
+    """Raised when a replayed request has no recorded exchange"""
+
+
+def redact_url(url: str) -> str:
+    """Replace credential query parameters of a URL"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(name, REDACTED if name.lower() in SECRET_PARAMETERS else value)
+             for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query, safe=REDACTED)))
+
+
+def request_size(kwargs: Dict[str, Any]) -> int:
+    """Get the size of a request body passed as json= or data="""
+    if kwargs.get('json') is not None:
+        return len(json.dumps(kwargs['json']).encode('utf-8'))
+    data = kwargs.get('data')
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return 0
+
+
+class Cassette:
+    """
+    Recorded exchanges in a JSON file
+
+    Each exchange keeps the method, the URL with credentials redacted, the
+    request size, the response status, content type and body, and the
+    timing split into time to first byte and transfer. Request headers are
+    not stored, so API keys sent as headers never reach the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.exchanges: List[Dict[str, Any]] = []
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        cassette = cls(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}: {data.get('version')}")
+        cassette.exchanges = data['exchanges']
+        return cassette
+
+    def save(self):
+        """Write the recorded exchanges"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        data = {'version': CASSETTE_VERSION, 'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'exchanges': self.exchanges}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+
+    def record(self, exchange: Dict[str, Any]):
+        self.exchanges.append(exchange)
+
+    def next_exchange(self, method: str, url: str, repeat: bool) -> Dict[str, Any]:
+        """
+        Get the next recorded exchange for a request
+
+        Exchanges for the same method and URL are replayed in recording
+        order. With repeat, they start over once all were used.
+        """
+        key = (method, redact_url(url))
+        queue = self._queues.get(key)
+        if not queue:
+            recorded = [exchange for exchange in self.exchanges
+                        if (exchange['method'], exchange['url']) == key]
+            if not recorded or (queue is not None and not repeat):
+                raise CassetteError(f"No recorded exchange left for {method} {key[1]}")
+            queue = self._queues[key] = deque(recorded)
+        return queue.popleft()
+
+
+class _RecordingResponse:
+    """Proxy of an aiohttp response that keeps the body it returns"""
+
+    def __init__(self, response: aiohttp.ClientResponse):
+        self._response = response
+        self.status = response.status
+        self.headers = response.headers
+        self.content_type = response.content_type
+        self.body: Optional[bytes] = None
+        self.transfer_time = 0.0
+
+    async def read(self) -> bytes:
+        if self.body is None:
+            start = time.perf_counter()
+            self.body = await self._response.read()
+            self.transfer_time = time.perf_counter() - start
+        return self.body
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return (await self.read()).decode(encoding, errors='replace')
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(await self.read())
+
+    @property
+    def content(self):
+        """Streamed body, for readers of response.content.iter_any()"""
+        return self
+
+    async def iter_any(self):
+        """Pass streamed chunks through, keeping the body as read() does"""
+        start = time.perf_counter()
+        chunks = []
+        async for data in self._response.content.iter_any():
+            chunks.append(data)
+            yield data
+        self.body = b"".join(chunks)
+        self.transfer_time = time.perf_counter() - start
+
+
+class _ReplayResponse:
+    """Response rebuilt from a recorded exchange"""
+
+    def __init__(self, exchange: Dict[str, Any], time_scale: float):
+        self.status = exchange['status']
+        self.content_type = exchange['content_type']
+        self.headers = {'Content-Type': self.content_type}
+        self._body = exchange['body'].encode('utf-8')
+        self._transfer = exchange['transfer'] * time_scale
+        self._read = False
+
+    async def read(self) -> bytes:
+        if not self._read:
+            self._read = True
+            if self._transfer:
+                await asyncio.sleep(self._transfer)
+        return self._body
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return (await self.read()).decode(encoding)
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(await self.read())
+
+    @property
+    def content(self):
+        """Streamed body, replayed as one chunk"""
+        return self
+
+    async def iter_any(self):
+        yield await self.read()
+
+
+class _Exchange:
+    """Async context manager returned by the cassette sessions' request methods"""
+
+    def __init__(self, session, method: str, url: str, kwargs: Dict[str, Any]):
+        self._session = session
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.response = None
+        self._context = None
+        self._start = 0.0
+        self._ttfb = 0.0
+
+    async def __aenter__(self):
+        self._start = time.perf_counter()
+        self.response = await self._session._open(self)
+        self._ttfb = time.perf_counter() - self._start
+        return self.response
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self._session._close(self, exc_type)
+
+
+class RecordingSession:
+    """Passes requests to a real session and records each exchange"""
+
+    def __init__(self, session: aiohttp.ClientSession, cassette: Cassette, secrets: List[str]):
+        self._session = session
+        self.cassette = cassette
+        self.secrets = [secret for secret in secrets if secret]
+
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
+    def request(self, method: str, url: str, **kwargs) -> _Exchange:
+        return _Exchange(self, method.upper(), url, kwargs)
+
+    def get(self, url: str, **kwargs) -> _Exchange:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _Exchange:
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> _Exchange:
+        return self.request('HEAD', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> _Exchange:
+        return self.request('DELETE', url, **kwargs)
+
+    async def _open(self, exchange: _Exchange) -> _RecordingResponse:
+        exchange._context = self._session.request(exchange.method, exchange.url, **exchange.kwargs)
+        return _RecordingResponse(await exchange._context.__aenter__())
+
+    async def _close(self, exchange: _Exchange, exc_type):
+        response = exchange.response
+        try:
+            # Prewarm requests are not provider exchanges
+            if exc_type is None and exchange.method != 'HEAD':
+                await response.read()
+                body = response.body.decode('utf-8', errors='replace')
+                for secret in self.secrets:
+                    body = body.replace(secret, REDACTED)
+                self.cassette.record({
+                    'method': exchange.method,
+                    'url': redact_url(exchange.url),
+                    'request_bytes': request_size(exchange.kwargs),
+                    'status': response.status,
+                    'content_type': response.content_type,
+                    'body': body,
+                    'ttfb': exchange._ttfb,
+                    'transfer': response.transfer_time
+                })
+        finally:
+            await exchange._context.__aexit__(exc_type, None, None)
+
+    async def close(self):
+        await self._session.close()
+
+
+class ReplaySession:
+    """Answers requests from a cassette without touching the network"""
+
+    def __init__(self, cassette: Cassette, time_scale: float = 1.0, repeat: bool = False):
+        self.cassette = cassette
+        self.time_scale = time_scale
+        self.repeat = repeat
+        self.closed = False
+
+    def request(self, method: str, url: str, **kwargs) -> _Exchange:
+        return _Exchange(self, method.upper(), url, kwargs)
+
+    def get(self, url: str, **kwargs) -> _Exchange:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _Exchange:
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> _Exchange:
+        return self.request('HEAD', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> _Exchange:
+        return self.request('DELETE', url, **kwargs)
+
+    async def _open(self, exchange: _Exchange) -> _ReplayResponse:
+        recorded = self.cassette.next_exchange(exchange.method, exchange.url, self.repeat)
+        metrics.increment('uploaded_bytes_total', request_size(exchange.kwargs))
+        if recorded['ttfb'] and self.time_scale:
+            await asyncio.sleep(recorded['ttfb'] * self.time_scale)
+        metrics.record_span('network.ttfb', time.perf_counter() - exchange._start)
+        return _ReplayResponse(recorded, self.time_scale)
+
+    async def _close(self, exchange: _Exchange, exc_type):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class CassetteTransport(HttpTransport):
+    """
+    Transport that records provider exchanges to a cassette or replays them
+
+    Args:
+        path: Cassette file
+        mode: 'record' to pass requests through and save them on close(),
+              'replay' to answer requests from the file offline
+        time_scale: Replay delay factor, 1.0 for the recorded timing, 0 for maximum speed
+        repeat: Start over when the recorded exchanges for a URL are used up
+        secrets: Strings to redact from recorded response bodies (API keys)
+    """
+
+    def __init__(self, path: str, mode: str, time_scale: float = 1.0, repeat: bool = False,
+                 secrets: Optional[List[str]] = None):
+        super().__init__()
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.mode = mode
+        self.requires_credentials = mode == 'record'
+        self.cassette = Cassette(path) if mode == 'record' else Cassette.load(path)
+        self.time_scale = time_scale
+        self.repeat = repeat
+        self.secrets = secrets or []
+        self._cassette_session = None
+
+    @property
+    def session(self):
+        """Recording wrapper around the shared session, or the replay session"""
+        if self.mode == 'replay':
+            if self._cassette_session is None:
+                self._cassette_session = ReplaySession(self.cassette, self.time_scale, self.repeat)
+            return self._cassette_session
+        real_session = super().session
+        if self._cassette_session is None or self._cassette_session._session is not real_session:
+            self._cassette_session = RecordingSession(real_session, self.cassette, self.secrets)
+        return self._cassette_session
+
+    async def prewarm(self, url: str) -> bool:
+        """Connections are only prewarmed against real endpoints"""
+        if self.mode == 'replay':
+            return False
+        return await super().prewarm(url)
+
+    def keep_warm(self, endpoint, interval: float, idle_timeout: float):
+        if self.mode == 'record':
+            super().keep_warm(endpoint, interval, idle_timeout)
+
+    async def close(self):
+        """Close connections and save a recording"""
+        await super().close()
+        if self.mode == 'record':
+            self.cassette.save()
+            print(f"Recorded {len(self.cassette.exchanges)} exchanges to {self.cassette.path}")
@@ -0,0 +1,107 @@
+"""
+Local complexity estimate of captures for model routing
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Mapping, Optional
+from PIL import Image, ImageFilter
+
+from core.segmentation import ink_mask, projection
+
+
+# Captures are measured at this width at most; rows are kept so that
+# text lines stay apart
+ANALYSIS_WIDTH = 640
+
+# Gray level difference that counts as an edge
+EDGE_THRESHOLD = 48
+
+# Ink rows shorter than this are noise (underlines, separators), taller
+# ones are pictures or panels rather than text
+MIN_LINE_HEIGHT = 3
+MAX_LINE_HEIGHT = 64
+
+# Lines are found in vertical strips, so box borders and panels that run
+# through every row only affect the strips they are in
+STRIPS = 8
+MIN_STRIP_WIDTH = 32
+
+
+@dataclass(frozen=True)
+class Complexity:
+    """How much there is to read in a capture"""
+    edge_density: float  # Fraction of edge pixels
+    text_lines: int
+    megapixels: float
+    line_height: Optional[int] = None  # Median ink height of the text lines in pixels
+
+
+def estimate_complexity(img: Image.Image) -> Complexity:
+    """
+    Estimate the complexity of a capture from its pixels
+
+    Args:
+        img: PIL Image
+
+    Returns:
+        Complexity of the capture
+    """
+    gray = img.convert('L')
+    if gray.width > ANALYSIS_WIDTH:
+        gray = gray.resize((ANALYSIS_WIDTH, gray.height), Image.Resampling.BOX)
+
+    # The filter's one pixel border is not part of the image's edges
+    edges = gray.filter(ImageFilter.FIND_EDGES).crop((1, 1, gray.width - 1, gray.height - 1))
+    edge_density = sum(edges.histogram()[EDGE_THRESHOLD:]) / max(1, edges.width * edges.height)
+
+    mask = ink_mask(gray)
+    strips = max(1, min(STRIPS, mask.width // MIN_STRIP_WIDTH))
+    strip_width = mask.width // strips
+    heights = []
+    text_lines = 0
+    for left in range(0, strips * strip_width, strip_width):
+        strip_heights = _line_heights(projection(mask.crop((left, 0, left + strip_width, mask.height)), 0))
+        heights.extend(strip_heights)
+        text_lines = max(text_lines, len(strip_heights))
+
+    line_height = sorted(heights)[len(heights) // 2] if heights else None
+    return Complexity(edge_density, text_lines, img.width * img.height / 1000000, line_height)
+
+
+def _line_heights(profile: List[float]) -> List[int]:
+    """Get the heights of the text line sized ink runs of a row profile"""
+    heights = []
+    height = 0
+    for value in profile + [0]:
+        if value > 0:
+            height += 1
+            continue
+        if MIN_LINE_HEIGHT <= height <= MAX_LINE_HEIGHT:
+            heights.append(height)
+        height = 0
+    return heights
+
+
+def is_simple(complexity: Complexity, max_lines: int, max_edge_density: float, max_megapixels: float) -> bool:
+    """Check whether a capture is within all limits of a simple capture"""
+    return (complexity.text_lines <= max_lines and complexity.edge_density <= max_edge_density
+            and complexity.megapixels <= max_megapixels)
+
+
+def cheapest_model(llm_config: Mapping[str, dict], available: Callable[[str], bool]) -> Optional[str]:
+    """
+    Get the available model with the lowest token price
+
+    Args:
+        llm_config: LLM configuration from the settings
+        available: Check whether a model can be used (credentials configured)
+
+    Returns:
+        Model name, None if no model is available
+    """
+    def price(name):
+        rates = llm_config[name].get('cost_per_1m_tokens', {})
+        return rates.get('input', 0) + rates.get('output', 0)
+
+    models = [name for name in llm_config if available(name)]
+    return min(models, key=price) if models else None
@@ -0,0 +1,128 @@
+"""
+Lightweight capture frames wrapping raw BGRA screen buffers
+"""
+
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+
+
+class FrameBufferPool:
+    """
+    Preallocated RGB images reused for repeated same-size conversions
+
+    A buffer is checked out exclusively by get() until it is handed back
+    with put(), so concurrent conversions of one size never share an image.
+    """
+
+    def __init__(self, max_sizes: int = 4, max_idle: int = 2):
+        self.max_sizes = max_sizes
+        self.max_idle = max_idle  # Idle buffers kept per size
+        self._buffers: Dict[Tuple[int, int], List[Image.Image]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, size: Tuple[int, int]) -> Image.Image:
+        """Check out an RGB image of a size, allocating one if none is idle"""
+        with self._lock:
+            idle = self._buffers.get(size)
+            if idle:
+                return idle.pop()
+        return Image.new('RGB', size)
+
+    def put(self, image: Image.Image):
+        """Hand a checked out image back for reuse"""
+        with self._lock:
+            idle = self._buffers.pop(image.size, [])
+            if len(idle) < self.max_idle:
+                idle.append(image)
+            self._buffers[image.size] = idle
+            if len(self._buffers) > self.max_sizes:
+                # Drop the least recently used size
+                del self._buffers[next(iter(self._buffers))]
+
+    def clear(self):
+        """Release all buffers"""
+        with self._lock:
+            self._buffers.clear()
+
+
+class CaptureFrame:
+    """
+    Captured screen area kept as the raw BGRA buffer returned by mss
+
+    Conversion to PIL happens only when a consumer asks for it and is done
+    at most once per frame.
+    """
+
+    def __init__(self, raw: Optional[bytearray], size: Tuple[int, int], image: Optional[Image.Image] = None,
+                 pool: Optional[FrameBufferPool] = None):
+        self.raw = raw
+        self.size = tuple(size)
+        self._image = image
+        self._pool = pool
+        self._pooled = False  # _image is checked out of the pool
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> 'CaptureFrame':
+        """Wrap an already decoded PIL image (fallback capture paths)"""
+        return cls(None, image.size, image=image)
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def to_pil(self, reuse_buffer: bool = False) -> Image.Image:
+        """
+        Convert the frame to a PIL RGB image
+
+        Args:
+            reuse_buffer: Decode into an image checked out of the pool
+                instead of allocating a new one. It belongs to this frame
+                until release(), after which callers must not use it, so
+                they copy or crop what they keep.
+
+        Returns:
+            PIL Image
+        """
+        if self._image is None:
+            if reuse_buffer and self._pool is not None:
+                image = self._pool.get(self.size)
+                image.frombytes(self.raw, 'raw', 'BGRX')
+                self._pooled = True
+            else:
+                image = Image.frombuffer('RGB', self.size, self.raw, 'raw', 'BGRX', 0, 1)
+            self._image = image
+        return self._image
+
+    def release(self):
+        """Hand a pooled image from to_pil(reuse_buffer=True) back to the pool"""
+        if self._pooled:
+            self._pooled = False
+            self._pool.put(self._image)
+            self._image = None
+
+    def as_array(self):
+        """
+        Get the frame as a NumPy array without copying
+
+        Returns:
+            uint8 array of shape (height, width, 4) in BGRA order, or
+            (height, width, 3) RGB for frames wrapping a PIL image
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import numpy as np
+
+        if self.raw is None:
+            return np.asarray(self._image)
+        return np.frombuffer(self.raw, dtype=np.uint8).reshape(self.height, self.width, 4)
+
+    def digest(self) -> str:
+        """Hash of the RGB pixel data, the same for raw and decoded frames of one capture"""
+        return hashlib.md5(self.to_pil().tobytes()).hexdigest()[:16]
@@ -0,0 +1,267 @@
+"""
+Persistent translation history backed by SQLite with full-text search
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.helpers import split_translation_header
+
+
+PREVIEW_LENGTH = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    source_language TEXT,
+    source_text TEXT NOT NULL DEFAULT '',
+    translation TEXT NOT NULL,
+    preview TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_created ON history(created);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    source_text, translation, content='history', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts(rowid, source_text, translation)
+    VALUES (new.id, new.source_text, new.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, source_text, translation)
+    VALUES ('delete', old.id, old.source_text, old.translation);
+END;
+"""
+
+
+def make_preview(translation: str, length: int = PREVIEW_LENGTH) -> str:
+    """Single-line preview of a translation, without the language header"""
+    body = split_translation_header(translation)[1].strip() or translation.strip()
+    preview = body[:length] + "..." if len(body) > length else body
+    return preview.replace('\n', ' ')
+
+
+def _fts_query(text: str) -> str:
+    """Turn user input into a safe FTS5 prefix query"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class HistoryStore:
+    """
+    Translation history in a local SQLite database
+
+    Writes go through a queue to a background thread so the Tk thread never
+    waits on disk. Entries not yet written are served from memory.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.fts_enabled = False
+
+        self._queue: 'queue.Queue[Optional[Dict[str, Any]]]' = queue.Queue()
+        self._pending: List[Dict[str, Any]] = []  # Newest first, not yet written
+        self._pending_lock = threading.Lock()
+        self._local = threading.local()
+        self._ready = threading.Event()
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's connection"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=5)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self, connection: sqlite3.Connection):
+        """Create tables, using FTS5 when SQLite was built with it"""
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        try:
+            connection.executescript(_FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 not available, history search falls back to LIKE: {e}")
+        connection.commit()
+
+    def _write_loop(self):
+        """Background writer thread"""
+        try:
+            connection = self._connect()
+            self._create_schema(connection)
+        except sqlite3.Error as e:
+            print(f"Error opening history database: {e}")
+            connection = None
+        finally:
+            self._ready.set()
+
+        while True:
+            # Write everything queued so far in one transaction
+            batch = [self._queue.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if connection is not None and entries:
+                    self._write(connection, entries)
+            except sqlite3.Error as e:
+                print(f"Error saving history entries: {e}")
+            finally:
+                written = {id(entry) for entry in entries}
+                with self._pending_lock:
+                    self._pending = [pending for pending in self._pending if id(pending) not in written]
+                for _ in batch:
+                    self._queue.task_done()
+
+            if len(entries) < len(batch):
+                return
+
+    def _write(self, connection: sqlite3.Connection, entries: List[Dict[str, Any]]):
+        """Insert entries and prune the oldest beyond max_entries"""
+        with connection:
+            connection.executemany(
+                "INSERT INTO history (created, source_language, source_text, translation, preview) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(entry['created'], entry['source_language'], entry['source_text'],
+                  entry['full_text'], entry['preview']) for entry in entries]
+            )
+            connection.execute(
+                "DELETE FROM history WHERE id <= "
+                "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def add(self, translation: str, source_language: Optional[str] = None, source_text: str = ""):
+        """
+        Add a translation without blocking
+
+        Args:
+            translation: Translated text
+            source_language: Detected source language, if known
+            source_text: Recognized source text, if known
+        """
+        entry = {
+            'id': None,
+            'created': time.time(),
+            'source_language': source_language,
+            'source_text': source_text,
+            'full_text': translation,
+            'preview': make_preview(translation)
+        }
+        with self._pending_lock:
+            self._pending.insert(0, entry)
+        self._queue.put(entry)
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get a page of history previews, newest first
+
+        Args:
+            offset: Number of entries to skip
+            limit: Maximum number of entries
+
+        Returns:
+            Entries with 'id', 'created', 'source_language' and 'preview'
+        """
+        # The writer drops entries from pending only after committing them and
+        # under this lock, so pending and the table stay consistent meanwhile
+        with self._pending_lock:
+            pending = list(self._pending)
+            entries = pending[offset:offset + limit]
+            offset = max(0, offset - len(pending))
+            limit -= len(entries)
+            if limit > 0:
+                if pending:
+                    # Committed pending entries are the newest rows, skip them
+                    created = {entry['created'] for entry in pending}
+                    head = self._query(
+                        "SELECT created FROM history ORDER BY id DESC LIMIT ?",
+                        (len(pending),)
+                    )
+                    offset += sum(1 for row in head if row['created'] in created)
+                entries.extend(self._query(
+                    "SELECT id, created, source_language, preview FROM history "
+                    "ORDER BY id DESC LIMIT ? OFFSET ?",
+                    (limit, offset)
+                ))
+        return entries
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Get a full history entry by id"""
+        rows = self._query(
+            "SELECT id, created, source_language, source_text, translation AS full_text, preview "
+            "FROM history WHERE id = ?",
+            (entry_id,)
+        )
+        return rows[0] if rows else None
+
+    def search(self, text: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search source and translated text
+
+        Args:
+            text: Search terms (prefix match on every term)
+            limit: Maximum number of results
+
+        Returns:
+            Matching entries, newest first
+        """
+        if not text.strip():
+            return []
+
+        if self.fts_enabled:
+            return self._query(
+                "SELECT h.id, h.created, h.source_language, h.preview FROM history_fts "
+                "JOIN history h ON h.id = history_fts.rowid "
+                "WHERE history_fts MATCH ? ORDER BY h.id DESC LIMIT ?",
+                (_fts_query(text), limit)
+            )
+
+        pattern = f"%{text.strip()}%"
+        return self._query(
+            "SELECT id, created, source_language, preview FROM history "
+            "WHERE translation LIKE ? OR source_text LIKE ? ORDER BY id DESC LIMIT ?",
+            (pattern, pattern, limit)
+        )
+
+    def count(self) -> int:
+        """Get the number of stored entries"""
+        rows = self._query("SELECT COUNT(*) AS n FROM history", ())
+        with self._pending_lock:
+            pending = len(self._pending)
+        return (rows[0]['n'] if rows else 0) + pending
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        """Run a read query on the calling thread's connection"""
+        self._ready.wait()
+        try:
+            return [dict(row) for row in self._connect().execute(sql, params)]
+        except sqlite3.Error as e:
+            print(f"Error reading history: {e}")
+            return []
+
+    def flush(self):
+        """Wait until all queued entries are written"""
+        self._queue.join()
+
+    def close(self):
+        """Write remaining entries and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5)
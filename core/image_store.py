@@ -0,0 +1,101 @@
+"""
+Memory-budgeted store for captured images
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image
+
+
+class CompressedImageStore:
+    """
+    LRU image cache bounded by compressed size
+
+    Images are kept zlib-compressed (lossless, fast level) and decoded on
+    access, so a handful of 4K captures costs a few MB instead of hundreds.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, compress_level: int = 1):
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._entries: 'OrderedDict[str, Tuple[bytes, str, Tuple[int, int]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, key: str, img: Image.Image):
+        """
+        Store an image
+
+        Args:
+            key: Cache key
+            img: PIL Image to store (a compressed copy is kept)
+        """
+        data = zlib.compress(img.tobytes(), self.compress_level)
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (data, img.mode, img.size)
+            self.current_bytes += len(data)
+
+            # Evict least recently used entries until within budget
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """
+        Get a stored image
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded PIL Image or None if not stored
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        data, mode, size = entry
+        return Image.frombytes(mode, size, zlib.decompress(data))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Remove all images"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memory use and hit/miss statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
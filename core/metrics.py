@@ -0,0 +1,204 @@
+"""
+Lightweight latency and usage metrics
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+
+# Recent samples kept per histogram for percentiles
+MAX_SAMPLES = 1000
+
+# Quantiles exported for each histogram
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Prefix of exported metric names
+NAMESPACE = "visolingua"
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Get the q-quantile (0..1) of samples by nearest rank"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Histogram:
+    """Recent samples plus all-time count and sum"""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for the translation pipeline
+
+    Stage durations are kept in the stage_seconds histogram with a stage
+    label (capture, hash, cache, preprocess, encode, network.connect,
+    network.ttfb, network.transfer, parse, render, total). Recording is
+    thread-safe, the Tk thread records render times while the asyncio
+    thread records everything else.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, LabelSet], float] = {}
+        self.histograms: Dict[Tuple[str, LabelSet], Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, LabelSet]:
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name: str, amount: float = 1, **labels: str):
+        """Add to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Add a sample to a histogram"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def record_span(self, stage: str, seconds: float):
+        """Record the duration of a pipeline stage measured elsewhere"""
+        self.observe('stage_seconds', seconds, stage=stage)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(stage, time.perf_counter() - start)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Get the value of a counter"""
+        with self._lock:
+            return self.counters.get(self._key(name, labels), 0)
+
+    def stage_percentiles(self, stage: str) -> Tuple[Optional[float], Optional[float]]:
+        """Get p50 and p95 of a stage in seconds"""
+        with self._lock:
+            histogram = self.histograms.get(self._key('stage_seconds', {'stage': stage}))
+            samples = list(histogram.samples) if histogram else []
+        return percentile(samples, 0.5), percentile(samples, 0.95)
+
+    def readout(self, stages: Tuple[str, ...] = ('total', 'network.ttfb', 'render')) -> str:
+        """
+        Compact p50/p95 summary for the status bar
+
+        Returns:
+            e.g. "p50/p95 total 1.21/2.40s · network.ttfb 0.82/1.10s", empty without samples
+        """
+        parts = []
+        for stage in stages:
+            p50, p95 = self.stage_percentiles(stage)
+            if p50 is not None:
+                parts.append(f"{stage} {p50:.2f}/{p95:.2f}s")
+        return "p50/p95 " + " · ".join(parts) if parts else ""
+
+    def snapshot(self) -> Dict:
+        """Get all metrics as JSON-serializable data"""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = []
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                samples = list(histogram.samples)
+                histograms.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': histogram.total,
+                    'quantiles': {str(q): percentile(samples, q) for q in QUANTILES}
+                })
+        return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self) -> str:
+        """Get all metrics in the Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = []
+        typed = set()
+
+        def label_text(labels: Dict[str, str]) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+        for counter in data['counters']:
+            name = f"{NAMESPACE}_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{label_text(counter['labels'])} {counter['value']}")
+
+        for histogram in data['histograms']:
+            name = f"{NAMESPACE}_{histogram['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q, value in histogram['quantiles'].items():
+                if value is not None:
+                    labels = dict(histogram['labels'], quantile=q)
+                    lines.append(f"{name}{label_text(labels)} {value}")
+            lines.append(f"{name}_sum{label_text(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{name}_count{label_text(histogram['labels'])} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """
+        Write all metrics to a file, replacing it atomically
+
+        Args:
+            path: Target file, JSON for .json, Prometheus text format otherwise
+        """
+        if path.endswith('.json'):
+            content = json.dumps(self.snapshot(), indent=2)
+        else:
+            content = self.to_prometheus()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def reset(self):
+        """Remove all recorded metrics"""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+# Registry shared by the whole application
+metrics = MetricsRegistry()
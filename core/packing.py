@@ -0,0 +1,158 @@
+"""
+Packing of several small captures into one labeled composite image
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.helpers import split_translation_header
+
+# Canvas size limits; captures that do not fit together go on further canvases
+MAX_CANVAS_WIDTH = 1536
+MAX_CANVAS_HEIGHT = 1536
+
+# Space around each capture and the separator lines between them
+MARGIN = 12
+SEPARATOR_WIDTH = 3
+
+# Height of the label band above each capture
+LABEL_HEIGHT = 28
+LABEL_FONT_SIZE = 20
+
+BACKGROUND = (255, 255, 255)
+SEPARATOR_COLOR = (255, 0, 255)  # Unlikely in UI text, reads as a frame
+LABEL_COLOR = (200, 0, 200)
+
+# "[2]" on a line of its own, optionally as a Markdown heading or bold
+MARKER_PATTERN = re.compile(r'^[ \t]*(?:#+[ \t]*)?\**\[(\d+)\]\**:?[ \t]*', re.MULTILINE)
+
+Box = Tuple[int, int, int, int]
+
+
+def pack_instructions(count: int) -> str:
+    """Prompt addition for a composite of count labeled captures"""
+    return (f"Das Bild zeigt {count} magenta gerahmte Bereiche, markiert [1] bis [{count}]. "
+            f"Übersetze jeden für sich, jeden Abschnitt mit seiner Markierung in eigener Zeile beginnend.")
+
+
+def pack_layout(sizes: Sequence[Tuple[int, int]], max_width: int = MAX_CANVAS_WIDTH,
+                max_height: int = MAX_CANVAS_HEIGHT) -> List[Dict]:
+    """
+    Lay out captures on canvases with shelf packing, tallest first
+
+    Each capture takes a cell of its size plus the label band and margins.
+    A cell goes on the first shelf with room left, else on a new shelf, else
+    on a new canvas (first-fit decreasing height).
+
+    Args:
+        sizes: (width, height) of each capture
+        max_width: Canvas width limit
+        max_height: Canvas height limit
+
+    Returns:
+        Canvases as dicts with 'size' and 'cells', a list of
+        (capture index, box of the capture on the canvas)
+    """
+    canvases = []
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index][1], reverse=True)
+    for index in order:
+        width, height = sizes[index]
+        cell_width = width + 2 * MARGIN
+        cell_height = height + LABEL_HEIGHT + 2 * MARGIN
+
+        placed = False
+        for canvas in canvases:
+            for shelf in canvas['shelves']:
+                if shelf['x'] + cell_width <= max_width and cell_height <= shelf['height']:
+                    _place(canvas, shelf, index, width, height, cell_width)
+                    placed = True
+                    break
+            if placed:
+                break
+            top = sum(shelf['height'] for shelf in canvas['shelves'])
+            if top + cell_height <= max_height and cell_width <= max_width:
+                shelf = {'y': top, 'x': 0, 'height': cell_height}
+                canvas['shelves'].append(shelf)
+                _place(canvas, shelf, index, width, height, cell_width)
+                placed = True
+                break
+
+        if not placed:
+            # Oversized captures get a canvas of their own
+            shelf = {'y': 0, 'x': 0, 'height': cell_height}
+            canvas = {'shelves': [shelf], 'cells': []}
+            canvases.append(canvas)
+            _place(canvas, shelf, index, width, height, cell_width)
+
+    for canvas in canvases:
+        canvas['size'] = (max(box[2] for _, box in canvas['cells']) + MARGIN,
+                          max(box[3] for _, box in canvas['cells']) + MARGIN)
+        canvas['cells'].sort()
+        del canvas['shelves']
+    return canvases
+
+
+def _place(canvas: Dict, shelf: Dict, index: int, width: int, height: int, cell_width: int):
+    left = shelf['x'] + MARGIN
+    top = shelf['y'] + MARGIN + LABEL_HEIGHT
+    canvas['cells'].append((index, (left, top, left + width, top + height)))
+    shelf['x'] += cell_width
+
+
+def _label_font():
+    try:
+        return ImageFont.load_default(size=LABEL_FONT_SIZE)
+    except TypeError:
+        # Pillow before 10.1 only has the small bitmap font
+        return ImageFont.load_default()
+
+
+def compose(images: Sequence[Image.Image], cells: Sequence[Tuple[int, Box]], size: Tuple[int, int],
+            labels: Sequence[int]) -> Image.Image:
+    """
+    Draw captures onto one canvas, each framed and labeled
+
+    Args:
+        images: All captures
+        cells: (capture index, box) pairs from pack_layout
+        size: Canvas size from pack_layout
+        labels: Label number of each cell
+
+    Returns:
+        RGB composite image
+    """
+    canvas = Image.new('RGB', size, BACKGROUND)
+    draw = ImageDraw.Draw(canvas)
+    font = _label_font()
+    half = SEPARATOR_WIDTH // 2 + 1
+    for (index, box), label in zip(cells, labels):
+        left, top, right, bottom = box
+        canvas.paste(images[index].convert('RGB'), (left, top))
+        draw.rectangle((left - half - 1, top - half - 1, right + half, bottom + half),
+                       outline=SEPARATOR_COLOR, width=SEPARATOR_WIDTH)
+        draw.text((left, top - LABEL_HEIGHT), f"[{label}]", fill=LABEL_COLOR, font=font)
+    return canvas
+
+
+def split_response(response: str, count: int) -> Optional[List[str]]:
+    """
+    Split the translation of a composite into one translation per label
+
+    The language header of the response is repeated for each part so the
+    parts can be joined like separately translated blocks.
+
+    Returns:
+        Translations for labels 1 to count, None unless every label was found once
+    """
+    header, body = split_translation_header(response.strip())
+    matches = list(MARKER_PATTERN.finditer(body))
+    labels = [int(match.group(1)) for match in matches]
+    if sorted(labels) != list(range(1, count + 1)):
+        return None
+
+    parts: List[str] = [''] * count
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(body)
+        parts[int(match.group(1)) - 1] = header + body[match.end():end].strip()
+    return parts
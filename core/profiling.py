@@ -0,0 +1,244 @@
+"""
+Session profiling of the capture -> translate pipeline
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Frames kept per allocation traceback
+TRACEBACK_FRAMES = 8
+
+# Entries listed per report section
+REPORT_TOP = 25
+
+# Innermost frames of a thread that is waiting for work: Tk's mainloop and
+# the asyncio selector
+IDLE_FRAMES = {('mainloop', 'tkinter'), ('select', 'selectors.py')}
+
+Site = Tuple[str, int, str]
+
+
+def _site(frame) -> Site:
+    """Get (file, line, function) of a frame"""
+    code = frame.f_code
+    return code.co_filename, frame.f_lineno, code.co_name
+
+
+def _is_idle(frame) -> bool:
+    """Check whether a thread is blocked waiting for events"""
+    code = frame.f_code
+    return any(code.co_name == name and where in code.co_filename for name, where in IDLE_FRAMES)
+
+
+def _short_path(filename: str) -> str:
+    """Get a path relative to the working directory where possible"""
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        # Other drive on Windows
+        return filename
+
+
+def _format_site(site: Site) -> str:
+    filename, lineno, function = site
+    return f"{function} ({_short_path(filename)}:{lineno})"
+
+
+class SessionProfiler:
+    """
+    Sampling profiler with allocation tracking for one app session
+
+    A background thread samples the stacks of the watched threads every
+    SAMPLE_INTERVAL. Samples of the Tk thread are kept whenever it is
+    handling an event, samples of the asyncio thread only while a wrapped
+    capture is running. Wrapped capture and encode steps are bracketed by
+    tracemalloc snapshots. Nothing is installed unless profiling is
+    enabled, so a normal session runs unchanged code.
+    """
+
+    def __init__(self, report_dir: str, interval: float = SAMPLE_INTERVAL):
+        self.report_dir = report_dir
+        self.interval = interval
+        self.started = time.time()
+
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._active: Dict[int, int] = {}  # Running wrapped calls per thread
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+        self.samples = 0
+        self.self_samples: Dict[str, Counter] = {}
+        self.total_samples: Dict[str, Counter] = {}
+        self.calls: Dict[str, List[float]] = {}
+        self.allocations: Dict[str, Counter] = {}
+        self.allocation_peaks: Dict[str, int] = {}
+
+    def start(self):
+        """Start sampling and allocation tracing"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        """Stop sampling and allocation tracing"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+        tracemalloc.stop()
+
+    def watch_thread(self, name: str, thread_id: Optional[int] = None, always: bool = False):
+        """
+        Sample a thread
+
+        Args:
+            name: Name in the report
+            thread_id: Thread ident, the calling thread by default
+            always: Keep all non-idle samples instead of only those inside wrapped calls
+        """
+        thread_id = threading.get_ident() if thread_id is None else thread_id
+        with self._lock:
+            self._threads[thread_id] = name
+            if always:
+                self._active[thread_id] = 1
+
+    def wrap_coroutine(self, name: str, func: Callable) -> Callable:
+        """Sample the calling thread while a coroutine function runs"""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            self._enter()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._record_call(name, time.perf_counter() - start)
+                self._leave()
+        return wrapper
+
+    def trace_allocations(self, label: str, func: Callable) -> Callable:
+        """Record the allocation sites and peak memory of each call"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            before = tracemalloc.take_snapshot()
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                after = tracemalloc.take_snapshot()
+                self._record_allocations(label, before, after, peak)
+                self._record_call(label, elapsed)
+        return wrapper
+
+    def _enter(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] = self._active.get(thread_id, 0) + 1
+
+    def _leave(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] -= 1
+
+    def _record_call(self, name: str, seconds: float):
+        with self._lock:
+            self.calls.setdefault(name, []).append(seconds)
+
+    def _record_allocations(self, label: str, before, after, peak: int):
+        """Add the growth per allocation site between two snapshots"""
+        statistics = after.compare_to(before, 'lineno')
+        with self._lock:
+            sites = self.allocations.setdefault(label, Counter())
+            for stat in statistics:
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    sites[f"{_short_path(frame.filename)}:{frame.lineno}"] += stat.size_diff
+            self.allocation_peaks[label] = max(self.allocation_peaks.get(label, 0), peak)
+
+    def _sample_loop(self):
+        """Sample the watched threads until stopped"""
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                watched = [(thread_id, name) for thread_id, name in self._threads.items()
+                           if self._active.get(thread_id)]
+            for thread_id, name in watched:
+                frame = frames.get(thread_id)
+                if frame is not None and not _is_idle(frame):
+                    self._record_stack(name, frame)
+
+    def _record_stack(self, name: str, frame):
+        """Count a sampled stack: the innermost function as self time, each function once as total"""
+        innermost = _site(frame)
+        functions = set()
+        while frame is not None:
+            code = frame.f_code
+            functions.add((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        with self._lock:
+            self.samples += 1
+            self.self_samples.setdefault(name, Counter())[innermost] += 1
+            self.total_samples.setdefault(name, Counter()).update(functions)
+
+    def report(self) -> str:
+        """Get the session report as text"""
+        with self._lock:
+            lines = [
+                "VisoLingua profile",
+                f"Session: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))}, "
+                f"{time.time() - self.started:.0f}s, {self.samples} samples every {self.interval * 1000:.0f} ms",
+                ""
+            ]
+
+            lines.append("Calls (count, mean, max)")
+            for name, durations in sorted(self.calls.items()):
+                mean = sum(durations) / len(durations)
+                lines.append(f"  {name:<24} {len(durations):>6} {mean * 1000:>10.1f} ms {max(durations) * 1000:>10.1f} ms")
+            lines.append("")
+
+            for name in sorted(self.self_samples):
+                milliseconds = self.interval * 1000
+                lines.append(f"Top functions on the {name} thread by self time")
+                for site, count in self.self_samples[name].most_common(REPORT_TOP):
+                    lines.append(f"  {count * milliseconds:>9.0f} ms  {_format_site(site)}")
+                lines.append(f"Top functions on the {name} thread by total time")
+                for site, count in self.total_samples[name].most_common(REPORT_TOP):
+                    lines.append(f"  {count * milliseconds:>9.0f} ms  {_format_site(site)}")
+                lines.append("")
+
+            for label in sorted(self.allocations):
+                peak = self.allocation_peaks.get(label, 0)
+                lines.append(f"Allocation sites during {label} (peak {peak / 1024:.0f} KiB)")
+                for site, size in self.allocations[label].most_common(REPORT_TOP):
+                    lines.append(f"  {size / 1024:>9.0f} KiB  {site}")
+                lines.append("")
+
+        return "\n".join(lines)
+
+    def write_report(self) -> str:
+        """
+        Write the session report
+
+        Returns:
+            Path of the report file
+        """
+        os.makedirs(self.report_dir, exist_ok=True)
+        name = time.strftime('profile-%Y%m%d-%H%M%S.txt', time.localtime(self.started))
+        path = os.path.join(self.report_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        return path
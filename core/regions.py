@@ -0,0 +1,52 @@
+"""
+Grouping of the screen grabs of named capture regions
+"""
+
+from typing import List, Sequence, Tuple
+
+BBox = Tuple[int, int, int, int]
+
+# Fixed cost of a screen grab, in the pixels that could be copied in the
+# same time; regions are grabbed together while the union of their boxes
+# costs less than grabbing them apart
+GRAB_OVERHEAD_PIXELS = 200000
+
+
+def _area(bbox: BBox) -> int:
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+
+
+def _union(bboxes: Sequence[BBox]) -> BBox:
+    return (min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+            max(b[2] for b in bboxes), max(b[3] for b in bboxes))
+
+
+def grab_groups(bboxes: Sequence[BBox], overhead_pixels: int = GRAB_OVERHEAD_PIXELS) -> List[Tuple[BBox, List[int]]]:
+    """
+    Group regions so that each group is captured with one grab of its union
+
+    The two groups whose merged grab saves the most are merged until no
+    merge saves anything: one grab of the union must copy fewer pixels
+    than two grabs plus the overhead of the second.
+
+    Args:
+        bboxes: Region bounding boxes
+        overhead_pixels: Fixed cost of a grab in pixels
+
+    Returns:
+        (union bbox, region indices) of each group
+    """
+    groups = [(tuple(bbox), [index]) for index, bbox in enumerate(bboxes)]
+    while len(groups) > 1:
+        savings, i, j = max((_area(a[0]) + _area(b[0]) + overhead_pixels - _area(_union([a[0], b[0]])), i, j)
+                            for i, a in enumerate(groups) for j, b in enumerate(groups) if i < j)
+        if savings <= 0:
+            break
+        (union_a, members_a), (union_b, members_b) = groups[i], groups.pop(j)
+        groups[i] = (_union([union_a, union_b]), sorted(members_a + members_b))
+    return groups
+
+
+def format_region_results(results: Sequence[Tuple[str, str]]) -> str:
+    """Join translations of named regions under a heading per region"""
+    return "\n\n".join(f"=== {name} ===\n{translation.strip()}" for name, translation in results)
@@ -0,0 +1,146 @@
+"""
+Ollama model residency management
+"""
+
+import asyncio
+import time
+import aiohttp
+from typing import Any, Dict, List, Optional
+
+from core.transport import HttpTransport
+
+
+# Seconds between residency checks while the app is in use
+RESIDENCY_CHECK_INTERVAL = 60
+
+# Keep the model loaded this many times the longest recent gap between captures
+KEEP_ALIVE_FACTOR = 2
+
+# Number of recent captures the keep_alive estimate is based on
+USAGE_WINDOW = 10
+
+# Ollama reports durations in nanoseconds
+NANOSECONDS = 1e9
+
+
+def ollama_timings(result: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Get load and inference times from an Ollama /api/generate response
+
+    Args:
+        result: Parsed response JSON
+
+    Returns:
+        Seconds spent loading the model, evaluating the prompt, generating and in total
+    """
+    return {
+        'load': result.get('load_duration', 0) / NANOSECONDS,
+        'prompt_eval': result.get('prompt_eval_duration', 0) / NANOSECONDS,
+        'eval': result.get('eval_duration', 0) / NANOSECONDS,
+        'total': result.get('total_duration', 0) / NANOSECONDS
+    }
+
+
+class OllamaResidency:
+    """
+    Keeps the selected Ollama model loaded while VisoLingua is used
+
+    Ollama unloads a model after keep_alive (5 minutes by default), after which
+    the next capture waits for it to load again. The model is preloaded at
+    startup, every request asks Ollama to keep it for twice the longest recent
+    gap between captures, and a background check reloads it if it was evicted
+    before that time was up.
+    """
+
+    def __init__(self, transport: HttpTransport, min_keep_alive: float = 300, max_keep_alive: float = 3600):
+        self.transport = transport
+        self.min_keep_alive = min_keep_alive
+        self.max_keep_alive = max_keep_alive
+        self.uses: List[float] = []
+        self.last_timings: Optional[Dict[str, float]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def record_use(self, now: Optional[float] = None):
+        """Record a translation request"""
+        self.uses.append(time.monotonic() if now is None else now)
+        del self.uses[:-(USAGE_WINDOW + 1)]
+
+    def keep_alive(self) -> int:
+        """
+        Get how long Ollama should keep the model loaded
+
+        Returns:
+            Seconds, between min_keep_alive and max_keep_alive
+        """
+        gaps = [later - earlier for earlier, later in zip(self.uses, self.uses[1:])]
+        wanted = KEEP_ALIVE_FACTOR * max(gaps) if gaps else 0
+        return int(min(self.max_keep_alive, max(self.min_keep_alive, wanted)))
+
+    def should_be_resident(self, now: Optional[float] = None) -> bool:
+        """Check whether the current keep_alive still covers the last use"""
+        if not self.uses:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.uses[-1] < self.keep_alive()
+
+    async def preload(self, base_url: str, model: str) -> Optional[float]:
+        """
+        Load a model without generating anything
+
+        Args:
+            base_url: Ollama server URL
+            model: Model name
+
+        Returns:
+            Seconds Ollama spent loading the model (0 if it was loaded), None on failure
+        """
+        payload = {"model": model, "keep_alive": self.keep_alive()}
+        timeout = aiohttp.ClientTimeout(total=300)
+        try:
+            async with self.transport.session.post(f"{base_url}/api/generate", json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    print(f"Preloading Ollama model {model} failed: {response.status}")
+                    return None
+                result = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Preloading Ollama model {model} failed: {e}")
+            return None
+        load_time = ollama_timings(result)['load']
+        print(f"Ollama model {model} resident (loaded in {load_time:.2f}s, keep_alive {self.keep_alive()}s)")
+        return load_time
+
+    async def is_loaded(self, base_url: str, model: str) -> bool:
+        """Check /api/ps for the model"""
+        timeout = aiohttp.ClientTimeout(total=5)
+        try:
+            async with self.transport.session.get(f"{base_url}/api/ps", timeout=timeout) as response:
+                if response.status != 200:
+                    return False
+                result = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+        return any(entry.get('name') == model or entry.get('model') == model
+                   for entry in result.get('models', []))
+
+    def start_refresh(self, base_url: str, model: str, interval: float = RESIDENCY_CHECK_INTERVAL):
+        """Reload the model in the background if it is evicted while it should be resident"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.ensure_future(self._refresh(base_url, model, interval))
+
+    async def _refresh(self, base_url: str, model: str, interval: float):
+        """Refresh loop run by start_refresh()"""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.should_be_resident():
+                break
+            if not await self.is_loaded(base_url, model):
+                print(f"Ollama model {model} was unloaded, reloading")
+                await self.preload(base_url, model)
+        print("Ollama residency refresh stopped after idle period")
+
+    def stop(self):
+        """Stop the background refresh"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
@@ -0,0 +1,187 @@
+"""
+Priority scheduling of work on the application's asyncio loop
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import heapq
+import itertools
+import time
+from typing import Awaitable, Dict, List, Optional, Sequence, Tuple
+
+from core.metrics import metrics
+
+# Priority classes, most urgent first
+INTERACTIVE = 0   # A capture the user just clicked
+ASK = 1           # Ask AI follow-up questions
+PREFETCH = 2      # Speculative work the user may never see
+BULK = 3          # Batch jobs
+
+PRIORITY_NAMES = ('interactive', 'ask', 'prefetch', 'bulk')
+
+# Concurrent tasks per class
+DEFAULT_TASK_LIMITS = (4, 2, 2, 1)
+
+# Priority of the running task; work outside the scheduler counts as interactive
+current_priority: contextvars.ContextVar = contextvars.ContextVar('current_priority', default=INTERACTIVE)
+
+
+class ProviderSlots:
+    """
+    Provider request slots handed out by priority
+
+    A class may only take a slot while fewer than total - priority slots are
+    in use, so each class leaves at least one slot for every class above it:
+    an interactive capture never waits for a slot held by prefetch or bulk
+    work. Waiters are served most urgent first, then in arrival order.
+    """
+
+    def __init__(self, total: int):
+        self.total = max(1, total)
+        self.in_use = [0] * len(PRIORITY_NAMES)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    def limit(self, priority: int) -> int:
+        """Get how many slots may be in use when a class takes one"""
+        return max(1, self.total - priority)
+
+    def _available(self, priority: int) -> bool:
+        return sum(self.in_use) < self.limit(priority)
+
+    def resize(self, total: int):
+        """Change the number of slots from any thread, waking waiters that now fit"""
+        self.total = max(1, total)
+        waiters = list(self._waiters)
+        if waiters:
+            waiters[0][2].get_loop().call_soon_threadsafe(self._wake)
+
+    async def acquire(self, priority: Optional[int] = None) -> int:
+        """
+        Wait for a slot
+
+        Args:
+            priority: Priority class, the running task's class by default
+
+        Returns:
+            The class the slot was taken for, to pass to release()
+        """
+        priority = current_priority.get() if priority is None else priority
+        # Only equally or more urgent waiters go first
+        if (not self._waiters or self._waiters[0][0] > priority) and self._available(priority):
+            self.in_use[priority] += 1
+            return priority
+
+        start = time.perf_counter()
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Woken and cancelled in the same step: hand the slot on
+                self.release(priority)
+            else:
+                self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+                heapq.heapify(self._waiters)
+            raise
+        metrics.observe('provider_slot_wait_seconds', time.perf_counter() - start,
+                        priority=PRIORITY_NAMES[priority])
+        return priority
+
+    def release(self, priority: int):
+        """Return a slot taken by acquire()"""
+        self.in_use[priority] -= 1
+        self._wake()
+
+    def _wake(self):
+        """Give free slots to the most urgent waiters"""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._available(priority):
+                # Less urgent waiters have lower limits and cannot fit either
+                break
+            heapq.heappop(self._waiters)
+            self.in_use[priority] += 1
+            future.set_result(None)
+
+    def slot(self, priority: Optional[int] = None) -> '_Slot':
+        """Hold a slot for the duration of an async with block"""
+        return _Slot(self, priority)
+
+
+class _Slot:
+    """Async context manager returned by ProviderSlots.slot()"""
+
+    def __init__(self, slots: ProviderSlots, priority: Optional[int]):
+        self.slots = slots
+        self.priority = priority
+
+    async def __aenter__(self):
+        self.priority = await self.slots.acquire(self.priority)
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.slots.release(self.priority)
+
+
+class TaskScheduler:
+    """
+    Front door of the asyncio loop for work submitted from other threads
+
+    Each priority class runs at most its limit of tasks at once, queued
+    work waits without occupying the loop. The class is visible to the
+    task through current_priority, which ProviderSlots uses when the task
+    reaches a provider request.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, limits: Sequence[int] = DEFAULT_TASK_LIMITS):
+        self.loop = loop
+        self.limits = [max(1, limit) for limit in limits]
+        self.running = [0] * len(PRIORITY_NAMES)
+        self.waiting = [0] * len(PRIORITY_NAMES)
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def submit(self, coro: Awaitable, priority: int = INTERACTIVE) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine from any thread
+
+        Args:
+            coro: Coroutine to run on the loop
+            priority: INTERACTIVE, ASK, PREFETCH or BULK
+
+        Returns:
+            Future with the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(coro, priority), self.loop)
+
+    async def _run(self, coro: Awaitable, priority: int):
+        semaphore = self._semaphores.get(priority)
+        if semaphore is None:
+            # Created on the loop thread, as Python 3.8 semaphores bind the current loop
+            semaphore = self._semaphores[priority] = asyncio.Semaphore(self.limits[priority])
+
+        self.waiting[priority] += 1
+        try:
+            await semaphore.acquire()
+        except asyncio.CancelledError:
+            coro.close()
+            raise
+        finally:
+            self.waiting[priority] -= 1
+
+        self.running[priority] += 1
+        current_priority.set(priority)  # Local to this task and tasks it creates
+        try:
+            return await coro
+        finally:
+            self.running[priority] -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get running and waiting tasks per class"""
+        return {name: {'running': self.running[priority], 'waiting': self.waiting[priority]}
+                for priority, name in enumerate(PRIORITY_NAMES)}
@@ -7,16 +7,32 @@ from PIL import Image, ImageTk
 import io
 import hashlib
 import threading
-from typing import Tuple, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Any, List, Sequence
+
+from core.frame import CaptureFrame, FrameBufferPool
+from core.image_store import CompressedImageStore
+from core.metrics import metrics
+from core.regions import grab_groups
+from core.scroll import row_signatures, find_scroll_offset
+from utils.constants import SCREENSHOT_CACHE_BYTES
 
 
 class ScreenCapture:
     """Handles screen capture operations"""
     
-    def __init__(self):
+    def __init__(self, cache_bytes: int = SCREENSHOT_CACHE_BYTES):
         # Use thread-local storage for MSS instances to avoid threading issues
         self._local = threading.local()
-        self.cache = {}  # Simple cache for identical screenshots
+        self.cache = CompressedImageStore(cache_bytes)  # Recent captures, compressed
+        self._last_frame = None  # (bbox, row signatures) for scroll detection
+        self.buffer_pool = FrameBufferPool()  # Reused RGB buffers for repeated captures
+        
+        # Captures kept for re-translation are compressed off the capture path
+        self._store_executor = ThreadPoolExecutor(max_workers=1)
+        self._store_future = None
+        self._capture_count = 0
         
     def _get_sct(self):
         """Get thread-local MSS instance"""
@@ -39,6 +55,18 @@ class ScreenCapture:
         Returns:
             PIL Image of captured area
         """
+        return self.grab(bbox).to_pil()
+        
+    def grab(self, bbox: Tuple[int, int, int, int]) -> CaptureFrame:
+        """
+        Capture specified area without converting it
+        
+        Args:
+            bbox: Bounding box (left, top, right, bottom)
+            
+        Returns:
+            CaptureFrame wrapping the raw BGRA buffer
+        """
         left, top, right, bottom = bbox
         
         # Get thread-local MSS instance
@@ -46,7 +74,7 @@ class ScreenCapture:
         
         if sct is None:
             # Fallback to alternative method
-            return self._capture_area_fallback(bbox)
+            return CaptureFrame.from_image(self._capture_area_fallback(bbox))
         
         try:
             # MSS uses different bbox format
@@ -57,19 +85,38 @@ class ScreenCapture:
                 "height": bottom - top
             }
             
-            # Capture screenshot
+            # Capture screenshot, keeping mss' buffer (ScreenShot.bgra would copy it)
             screenshot = sct.grab(monitor)
-            
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-            
-            return img
+            return CaptureFrame(screenshot.raw, screenshot.size, pool=self.buffer_pool)
             
         except Exception as e:
             print(f"MSS capture failed: {e}")
             # Try fallback method
-            return self._capture_area_fallback(bbox)
+            return CaptureFrame.from_image(self._capture_area_fallback(bbox))
+            
+    def grab_regions(self, bboxes: Sequence[Tuple[int, int, int, int]]) -> List[Image.Image]:
+        """
+        Capture several areas, with one grab for areas close together
+        
+        Args:
+            bboxes: Bounding boxes (left, top, right, bottom)
             
+        Returns:
+            PIL Image of each area, in the order given
+        """
+        images: List[Optional[Image.Image]] = [None] * len(bboxes)
+        groups = grab_groups(bboxes)
+        for union, members in groups:
+            # Crops copy out of the pooled buffer, which is then handed back
+            frame = self.grab(union)
+            image = frame.to_pil(reuse_buffer=True)
+            for index in members:
+                left, top, right, bottom = bboxes[index]
+                images[index] = image.crop((left - union[0], top - union[1], right - union[0], bottom - union[1]))
+            frame.release()
+        metrics.increment('region_grabs_total', len(groups))
+        return images
+        
     def _capture_area_fallback(self, bbox: Tuple[int, int, int, int]) -> Image.Image:
         """Fallback screenshot method using PIL"""
         try:
@@ -93,32 +140,88 @@ class ScreenCapture:
         Returns:
             Tuple of (PIL Image, was_cached)
         """
-        # Generate cache key from bbox
-        cache_key = f"{bbox[0]}_{bbox[1]}_{bbox[2]}_{bbox[3]}"
-        
-        # Capture image
-        img = self.capture_area(bbox)
+        frame = self.grab(bbox)
         
-        # Generate hash of image data
-        img_hash = self._get_image_hash(img)
-        full_cache_key = f"{cache_key}_{img_hash}"
+        # Key on bbox and pixel data; the converted image is kept for a miss
+        full_cache_key = f"{bbox[0]}_{bbox[1]}_{bbox[2]}_{bbox[3]}_{frame.digest()}"
         
         # Check cache
-        if full_cache_key in self.cache:
-            return self.cache[full_cache_key], True
+        img = self.cache.get(full_cache_key)
+        if img is not None:
+            return img, True
             
         # Store in cache
-        self.cache[full_cache_key] = img
-        
-        # Limit cache size
-        if len(self.cache) > 50:
-            # Remove oldest entries
-            oldest_keys = list(self.cache.keys())[:10]
-            for key in oldest_keys:
-                del self.cache[key]
-                
+        img = frame.to_pil()
+        self.cache.put(full_cache_key, img)
         return img, False
         
+    def remember(self, bbox: Tuple[int, int, int, int], frame: CaptureFrame) -> str:
+        """
+        Keep a capture in the cache for later re-translation
+        
+        Conversion and compression run in the background on the frame's own
+        raw buffer, so the capture path does not wait for them.
+        
+        Args:
+            bbox: Bounding box the frame was captured from
+            frame: Captured frame
+            
+        Returns:
+            Key to retrieve the image with recall()
+        """
+        self._capture_count += 1
+        key = f"{bbox[0]}_{bbox[1]}_{bbox[2]}_{bbox[3]}_capture{self._capture_count}"
+        self._store_future = self._store_executor.submit(self._store_frame, key, frame)
+        return key
+        
+    def _store_frame(self, key: str, frame: CaptureFrame):
+        """Convert a frame into its own image and store it compressed"""
+        if frame.raw is not None:
+            # Not the pooled buffer, which the next capture overwrites
+            img = Image.frombuffer('RGB', frame.size, frame.raw, 'raw', 'BGRX', 0, 1)
+        else:
+            img = frame.to_pil()
+        self.cache.put(key, img)
+        
+    def recall(self, key: str) -> Optional[Image.Image]:
+        """Get a capture stored with remember(), None if it was evicted"""
+        if self._store_future is not None:
+            self._store_future.result()
+        return self.cache.get(key)
+        
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get capture cache memory use and hit/miss statistics"""
+        return self.cache.stats()
+        
+    def detect_scroll(self, bbox: Tuple[int, int, int, int], img: Image.Image) -> Dict[str, Any]:
+        """
+        Detect a vertical scroll against the previous capture of the same area
+        
+        Args:
+            bbox: Bounding box the image was captured from
+            img: Newly captured PIL Image
+            
+        Returns:
+            Dict with 'offset' (None if the capture is not a scrolled previous
+            frame, 0 if unchanged) and the capture's row 'signatures'
+        """
+        signatures = row_signatures(img)
+        previous = self._last_frame
+        self._last_frame = (bbox, signatures)
+        
+        offset = None
+        if previous is not None and previous[0] == bbox:
+            offset = find_scroll_offset(previous[1], signatures)
+            
+        return {
+            'offset': offset,
+            'signatures': signatures
+        }
+        
+    def reset_scroll(self):
+        """Forget the previous frame used for scroll detection"""
+        self._last_frame = None
+        
     def _get_image_hash(self, img: Image.Image) -> str:
         """Generate hash of image for caching"""
         # Convert image to bytes
@@ -129,7 +232,8 @@ class ScreenCapture:
         # Generate MD5 hash
         return hashlib.md5(img_bytes).hexdigest()[:16]
         
-    def optimize_image_for_llm(self, img: Image.Image, max_size: str = "4MB", quality: int = 85) -> bytes:
+    def optimize_image_for_llm(self, img: Image.Image, max_size: str = "4MB", quality: int = 85,
+                               resize_to: Optional[Tuple[int, int]] = None) -> bytes:
         """
         Optimize image for LLM API submission
         
@@ -137,16 +241,22 @@ class ScreenCapture:
             img: PIL Image to optimize
             max_size: Maximum size (e.g., "4MB", "20MB")
             quality: JPEG quality (1-100)
+            resize_to: (width, height) to scale to before encoding, e.g. from core.tiles
             
         Returns:
             Optimized image as bytes
         """
         # Parse max size
         max_bytes = self._parse_size(max_size)
+        start = time.perf_counter()
         
-        # Start with original size
+        # Start with original size unless a smaller one was chosen
         current_quality = quality
-        current_img = img.copy()
+        if resize_to and resize_to != img.size:
+            current_img = img.resize(resize_to, Image.Resampling.LANCZOS)
+        else:
+            current_img = img.copy()
+        encode_time = 0.0
         
         while True:
             # Convert to bytes
@@ -159,11 +269,15 @@ class ScreenCapture:
                 rgb_img.paste(current_img, mask=current_img.split()[-1] if current_img.mode in ('RGBA', 'LA') else None)
                 current_img = rgb_img
                 
+            encode_start = time.perf_counter()
             current_img.save(img_bytes, format='JPEG', quality=current_quality, optimize=True)
+            encode_time += time.perf_counter() - encode_start
             img_data = img_bytes.getvalue()
             
             # Check size
             if len(img_data) <= max_bytes or current_quality <= 20:
+                metrics.record_span('encode', encode_time)
+                metrics.record_span('preprocess', time.perf_counter() - start - encode_time)
                 return img_data
                 
             # Reduce quality or resize
@@ -237,34 +351,36 @@ class ScreenCapture:
         
     def capture_full_screen(self, monitor_index: int = 1) -> Image.Image:
         """Capture full screen of specified monitor"""
+        return self.grab_full_screen(monitor_index).to_pil()
+        
+    def grab_full_screen(self, monitor_index: int = 1) -> CaptureFrame:
+        """Capture full screen of specified monitor without converting it"""
         sct = self._get_sct()
         
         if sct is None:
             # Fallback to PIL ImageGrab
-            try:
-                import PIL.ImageGrab as ImageGrab
-                return ImageGrab.grab()
-            except:
-                return Image.new('RGB', (1920, 1080), color='blue')
+            return CaptureFrame.from_image(self._capture_full_screen_fallback())
         
         try:
             monitor = sct.monitors[monitor_index]
             screenshot = sct.grab(monitor)
-            
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-            return img
+            return CaptureFrame(screenshot.raw, screenshot.size, pool=self.buffer_pool)
         except Exception as e:
             print(f"Full screen capture failed: {e}")
-            try:
-                import PIL.ImageGrab as ImageGrab
-                return ImageGrab.grab()
-            except:
-                return Image.new('RGB', (1920, 1080), color='blue')
+            return CaptureFrame.from_image(self._capture_full_screen_fallback())
+            
+    def _capture_full_screen_fallback(self) -> Image.Image:
+        """Fallback full screen capture using PIL"""
+        try:
+            import PIL.ImageGrab as ImageGrab
+            return ImageGrab.grab()
+        except:
+            return Image.new('RGB', (1920, 1080), color='blue')
         
     def clear_cache(self):
         """Clear screenshot cache"""
         self.cache.clear()
+        self.buffer_pool.clear()
         
     def __del__(self):
         """Cleanup"""
@@ -0,0 +1,215 @@
+"""
+Local script and language detection of captures
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageChops, ImageFilter
+
+from core.segmentation import ink_mask, projection
+
+
+# Larger captures are sampled in tiles of this size, spread over the capture
+ANALYSIS_PIXELS = 1000000
+TILE_SIZE = (640, 320)
+MAX_TILES = 6
+
+# Lines are measured in vertical strips of at least this width, so panel
+# borders only affect their own strip
+STRIPS = 4
+MIN_STRIP_WIDTH = 64
+
+# Ink rows of text line height
+MIN_LINE_HEIGHT = 5
+MAX_LINE_HEIGHT = 64
+
+# Line segments with fewer ink columns are too short to judge
+MIN_SEGMENT_COLUMNS = 8
+
+# Strokes a vertical scan crosses per inked column: Han, kana and hangul
+# glyphs stack many horizontal strokes (2.4-2.9 on UI text), Latin letters
+# few (1.5-1.9)
+CJK_CROSSINGS = 2.15
+
+# Share of judged columns that makes a capture CJK, and below which it is Latin
+CJK_SHARE = 0.3
+LATIN_MAX_CJK_SHARE = 0.05
+
+# Pixels with no ink neighbour are scan noise, not strokes
+_NEIGHBOURS = ImageFilter.Kernel((3, 3), [1, 1, 1, 1, 0, 1, 1, 1, 1], scale=8)
+
+# Frequent short words per language, for telling languages of the same script apart
+STOPWORDS: Dict[str, frozenset] = {
+    'de': frozenset("der die das und ist nicht ein eine zu den mit sich des auf für im dem von sie es auch "
+                    "wird werden oder bei wurde sind als wie aus nach kann diese".split()),
+    'en': frozenset("the and is not a an to of in with for on it this that are be was by or as at from "
+                    "you your can will have has which".split()),
+    'fr': frozenset("le la les et est ne pas un une des du de pour dans avec sur il elle ce qui que sont "
+                    "vous au aux par plus".split()),
+    'es': frozenset("el la los las y es no un una de del para en con por que se su al lo como más pero "
+                    "este esta son".split()),
+    'it': frozenset("il lo la gli le e è non un una di del della per in con su che si sono al come più "
+                    "questo questa".split()),
+    'nl': frozenset("de het een en is niet van te in met voor op dat die zijn wordt als aan bij ook of "
+                    "naar deze kan".split()),
+    'pt': frozenset("o a os as e é não um uma de do da para em com por que se no na ao como mais este "
+                    "esta são".split())
+}
+
+# Language names as the translation header gives them
+LANGUAGE_NAMES = {
+    'de': 'Deutsch', 'en': 'Englisch', 'fr': 'Französisch', 'es': 'Spanisch',
+    'it': 'Italienisch', 'nl': 'Niederländisch', 'pt': 'Portugiesisch'
+}
+
+# Tesseract language packs of the stopword languages
+TESSERACT_LANGUAGES = {
+    'de': 'deu', 'en': 'eng', 'fr': 'fra', 'es': 'spa', 'it': 'ita', 'nl': 'nld', 'pt': 'por'
+}
+
+# Words needed before a language is named, and the lead over the runner-up
+MIN_WORDS = 5
+MIN_STOPWORD_SHARE = 0.15
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+# Tesseract languages to read with, '' once OCR turned out to be unavailable
+_ocr_languages: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ScriptEstimate:
+    """Writing system of the text in a capture"""
+    script: Optional[str]  # 'cjk', 'latin', 'mixed', None without text
+    cjk_share: float  # Share of judged ink columns in CJK-like line segments
+    columns: int  # Ink columns judged
+
+
+def detect_script(img: Image.Image) -> ScriptEstimate:
+    """
+    Tell CJK from Latin text by glyph stroke density
+
+    Each text line segment is judged by how many strokes a vertical scan
+    crosses per inked column; segments are weighted by their ink columns.
+
+    Args:
+        img: PIL Image
+
+    Returns:
+        Script estimate of the capture
+    """
+    gray = img.convert('L')
+    tallies = [_tally(gray.crop(box)) for box in _sample_boxes(gray.size)]
+    cjk = sum(tally[0] for tally in tallies)
+    columns = sum(tally[1] for tally in tallies)
+    if not columns:
+        return ScriptEstimate(None, 0.0, 0)
+
+    share = cjk / columns
+    if share >= CJK_SHARE:
+        script = 'cjk'
+    elif share <= LATIN_MAX_CJK_SHARE:
+        script = 'latin'
+    else:
+        script = 'mixed'
+    return ScriptEstimate(script, share, columns)
+
+
+def _sample_boxes(size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+    """Get the whole capture, or up to MAX_TILES tiles spread over a large one"""
+    width, height = size
+    if width * height <= ANALYSIS_PIXELS:
+        return [(0, 0, width, height)]
+    tile_width, tile_height = TILE_SIZE
+    columns, rows = -(-width // tile_width), -(-height // tile_height)
+    tiles = columns * rows
+    boxes = []
+    for index in sorted({i * tiles // MAX_TILES for i in range(MAX_TILES)}):
+        left, top = index % columns * tile_width, index // columns * tile_height
+        boxes.append((left, top, min(width, left + tile_width), min(height, top + tile_height)))
+    return boxes
+
+
+def _tally(gray: Image.Image) -> Tuple[int, int]:
+    """Get the ink columns in CJK-like line segments and all judged ink columns"""
+    mask = ink_mask(gray)
+    mask = ImageChops.multiply(mask, mask.filter(_NEIGHBOURS).point(lambda value: 255 if value > 0 else 0))
+
+    # Pixels where a stroke starts, scanning down
+    above = Image.new('L', mask.size, 0)
+    above.paste(mask.crop((0, 0, mask.width, mask.height - 1)), (0, 1))
+    starts = ImageChops.subtract(mask, above)
+
+    strips = max(1, min(STRIPS, mask.width // MIN_STRIP_WIDTH))
+    strip_width = mask.width // strips
+    cjk = columns = 0
+    for left in range(0, strips * strip_width, strip_width):
+        strip = mask.crop((left, 0, left + strip_width, mask.height))
+        for top, bottom in _line_runs(projection(strip, 0)):
+            box = (left, top, left + strip_width, bottom)
+            ink_columns = sum(1 for value in projection(mask.crop(box), 1) if value > 0)
+            if ink_columns < MIN_SEGMENT_COLUMNS:
+                continue
+            columns += ink_columns
+            if starts.crop(box).histogram()[255] / ink_columns >= CJK_CROSSINGS:
+                cjk += ink_columns
+    return cjk, columns
+
+
+def _line_runs(profile: List[float]) -> List[Tuple[int, int]]:
+    """Get the (top, bottom) of the text line sized ink runs of a row profile"""
+    runs = []
+    start = None
+    for index, value in enumerate(profile + [0]):
+        if value > 0 and start is None:
+            start = index
+        elif value <= 0 and start is not None:
+            if MIN_LINE_HEIGHT <= index - start <= MAX_LINE_HEIGHT:
+                runs.append((start, index))
+            start = None
+    return runs
+
+
+def classify_language(text: str) -> Optional[str]:
+    """
+    Name the language of a text by its most frequent short words
+
+    Returns:
+        Language code from STOPWORDS, None if too short or unclear
+    """
+    words = [word.lower() for word in _WORD.findall(text)]
+    if len(words) < MIN_WORDS:
+        return None
+    scores = sorted(((sum(word in stopwords for word in words) / len(words), language)
+                     for language, stopwords in STOPWORDS.items()), reverse=True)
+    (best, language), (second, _) = scores[0], scores[1]
+    if best < MIN_STOPWORD_SHARE or best < 2 * second:
+        return None
+    return language
+
+
+def ocr_text(img: Image.Image) -> Optional[str]:
+    """
+    Read Latin text with Tesseract if it is installed
+
+    Returns:
+        Recognized text, None without pytesseract or the tesseract binary
+    """
+    global _ocr_languages
+    if _ocr_languages == '':
+        return None
+    try:
+        import pytesseract
+    except ImportError:
+        _ocr_languages = ''
+        return None
+    try:
+        if _ocr_languages is None:
+            installed = set(pytesseract.get_languages(config=''))
+            _ocr_languages = '+'.join(code for code in TESSERACT_LANGUAGES.values() if code in installed) or 'eng'
+        return pytesseract.image_to_string(img, lang=_ocr_languages)
+    except (pytesseract.TesseractError, OSError) as e:
+        print(f"OCR not available: {e}")
+        _ocr_languages = ''
+        return None
@@ -0,0 +1,242 @@
+"""
+Vertical scroll detection between consecutive captures of the same area
+"""
+
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from PIL import Image
+
+from utils.helpers import join_translations
+
+
+# Rows whose signature occurs more often than this are too ambiguous to vote
+MAX_SIGNATURE_REPEATS = 3
+
+# Fraction of non-blank overlapping rows that must agree for a scroll match
+MIN_MATCH_RATIO = 0.9
+
+# Minimum number of overlapping rows required to trust a match
+MIN_OVERLAP_ROWS = 24
+
+# Edge lines shorter than this fraction of the median line height are cut
+CUT_LINE_RATIO = 0.8
+
+# Translated segments kept per document, farthest from the viewport dropped first
+MAX_SEGMENTS = 64
+
+
+def row_signatures(img: Image.Image) -> List[Optional[int]]:
+    """
+    Compute one signature per pixel row of an image
+
+    Args:
+        img: PIL Image
+
+    Returns:
+        List of row hashes, None for uniform (blank) rows
+    """
+    gray = img.convert('L')
+    width, height = gray.size
+    data = gray.tobytes()
+
+    signatures = []
+    for y in range(height):
+        row = data[y * width:(y + 1) * width]
+        if row.count(row[:1]) == width:
+            # Blank rows carry no alignment information
+            signatures.append(None)
+        else:
+            signatures.append(hash(row))
+    return signatures
+
+
+def find_scroll_offset(previous: List[Optional[int]], current: List[Optional[int]]) -> Optional[int]:
+    """
+    Find the vertical scroll offset between two frames by row-hash alignment
+
+    Args:
+        previous: Row signatures of the previous frame
+        current: Row signatures of the current frame
+
+    Returns:
+        Offset in pixels (positive = scrolled down, negative = scrolled up),
+        0 for identical frames or None if no reliable match was found
+    """
+    height = len(current)
+    if height == 0 or len(previous) != height:
+        return None
+
+    # Index the first row of every run of identical rows in the current frame;
+    # rows inside a run (e.g. vertical strokes) would all vote for many offsets
+    positions = defaultdict(list)
+    for y in _run_starts(current):
+        positions[current[y]].append(y)
+
+    # Every matching row pair votes for an offset
+    votes = defaultdict(int)
+    for y in _run_starts(previous):
+        matches = positions.get(previous[y])
+        if not matches or len(matches) > MAX_SIGNATURE_REPEATS:
+            continue
+        for match in matches:
+            votes[y - match] += 1
+
+    if not votes:
+        return None
+
+    # Check candidates from most to least voted
+    for offset, _ in sorted(votes.items(), key=lambda item: -item[1])[:5]:
+        if _verify_offset(previous, current, offset):
+            return offset
+
+    return None
+
+
+def _run_starts(signatures: List[Optional[int]]) -> List[int]:
+    """Get rows that start a run of identical non-blank rows"""
+    return [
+        y for y, signature in enumerate(signatures)
+        if signature is not None and (y == 0 or signatures[y - 1] != signature)
+    ]
+
+
+def _verify_offset(previous: List[Optional[int]], current: List[Optional[int]], offset: int) -> bool:
+    """Check that the overlapping region agrees for the given offset"""
+    height = len(current)
+    overlap = height - abs(offset)
+    if overlap < MIN_OVERLAP_ROWS:
+        return False
+
+    compared = 0
+    matched = 0
+    for y in range(max(0, -offset), min(height, height - offset)):
+        before = previous[y + offset]
+        after = current[y]
+        if before is None and after is None:
+            continue
+        compared += 1
+        if before == after:
+            matched += 1
+
+    return compared > 0 and matched / compared >= MIN_MATCH_RATIO
+
+
+def line_runs(signatures: List[Optional[int]]) -> List[Tuple[int, int]]:
+    """Get the (start, end) row ranges of consecutive non-blank rows"""
+    runs = []
+    start = None
+    for y, signature in enumerate(signatures):
+        if signature is not None and start is None:
+            start = y
+        elif signature is None and start is not None:
+            runs.append((start, y))
+            start = None
+    if start is not None:
+        runs.append((start, len(signatures)))
+    return runs
+
+
+class ScrollDocument:
+    """
+    Translations of a scrolled area, keyed by the content rows they cover
+
+    Rows are counted in content coordinates, so a strip revealed by a
+    scroll is translated once and scrolling back reuses what is already
+    covered. Text lines cut by the frame edge are left out of the covered
+    range until a later frame shows them in full, so no line is sent twice.
+    """
+
+    def __init__(self, bbox: Tuple[int, int, int, int], signatures: List[Optional[int]]):
+        self.bbox = bbox
+        self.signatures = signatures
+        self.viewport = 0  # Content row shown at the top of the frame
+        self.segments: List[Tuple[int, int, str]] = []  # (top, bottom, translation), content rows
+
+    @property
+    def height(self) -> int:
+        return len(self.signatures)
+
+    def scroll(self, offset: int, signatures: List[Optional[int]]):
+        """Move the viewport by a detected scroll offset"""
+        self.viewport += offset
+        self.signatures = signatures
+
+    def reset(self):
+        """Forget all translated segments"""
+        self.viewport = 0
+        self.segments = []
+
+    def frame_rows(self) -> Optional[Tuple[int, int]]:
+        """Get the rows of the current frame holding complete text lines"""
+        return self._complete_lines(0, self.height)
+
+    def missing_rows(self) -> List[Tuple[int, int]]:
+        """
+        Get the row ranges of the current frame that still need translating
+
+        Returns:
+            List of (top, bottom) frame rows, each ending on complete lines
+        """
+        covered = sorted(
+            (max(0, top - self.viewport), min(self.height, bottom - self.viewport))
+            for top, bottom, _ in self.segments
+            if bottom > self.viewport and top < self.viewport + self.height
+        )
+
+        gaps = []
+        y = 0
+        for top, bottom in covered + [(self.height, self.height)]:
+            if top > y:
+                gaps.append((y, top))
+            y = max(y, bottom)
+
+        missing = []
+        for top, bottom in gaps:
+            rows = self._complete_lines(top, bottom)
+            if rows:
+                missing.append(rows)
+        return missing
+
+    def add(self, top: int, bottom: int, translation: str):
+        """
+        Record the translation of a range of frame rows
+
+        Args:
+            top: First frame row
+            bottom: Frame row after the last one
+            translation: Translation of the rows
+        """
+        self.segments.append((top + self.viewport, bottom + self.viewport, translation))
+        self.segments.sort(key=lambda segment: segment[0])
+
+        if len(self.segments) > MAX_SEGMENTS:
+            # Drop the segments farthest from the viewport
+            center = self.viewport + self.height // 2
+            self.segments.sort(key=lambda segment: abs((segment[0] + segment[1]) // 2 - center))
+            self.segments = sorted(self.segments[:MAX_SEGMENTS], key=lambda segment: segment[0])
+
+    def translation(self) -> str:
+        """Get the translation of the segments visible in the current frame"""
+        return join_translations([
+            text for top, bottom, text in self.segments
+            if bottom > self.viewport and top < self.viewport + self.height and text.strip()
+        ])
+
+    def _complete_lines(self, top: int, bottom: int) -> Optional[Tuple[int, int]]:
+        """Trim lines cut by the frame edge off a row range, None if nothing is left"""
+        runs = line_runs(self.signatures)
+        if not any(start < bottom and end > top for start, end in runs):
+            return None
+
+        # A cut line is noticeably shorter than the frame's typical line
+        heights = sorted(end - start for start, end in runs)
+        cut_height = heights[len(heights) // 2] * CUT_LINE_RATIO if len(runs) >= 3 else 0
+
+        if top == 0 and runs[0][0] == 0 and runs[0][1] < cut_height:
+            top = runs[0][1]
+        if bottom == self.height and runs[-1][1] == self.height and self.height - runs[-1][0] < cut_height:
+            bottom = runs[-1][0]
+
+        if not any(start < bottom and end > top for start, end in runs):
+            return None
+        return top, bottom
@@ -0,0 +1,178 @@
+"""
+Text block segmentation of large captures using projection profiles
+"""
+
+from array import array
+from typing import List, Tuple
+from PIL import Image, ImageChops
+
+
+# Brightness difference from the background that counts as ink, as a
+# fraction of the capture's contrast and clamped to an absolute range
+INK_CONTRAST_FACTOR = 0.35
+MIN_INK_THRESHOLD = 12
+MAX_INK_THRESHOLD = 48
+
+# Blank rows/columns needed to split blocks (between paragraphs / columns)
+MIN_ROW_GAP = 14
+MIN_COLUMN_GAP = 40
+
+# Paragraph gaps must exceed the median text line height by this factor
+LINE_GAP_FACTOR = 1.2
+
+# Blocks smaller than this in either dimension are treated as noise
+MIN_BLOCK_SIZE = 8
+
+# Upper bound on blocks per capture, adjacent blocks are merged beyond this
+MAX_BLOCKS = 8
+
+
+def ink_mask(img: Image.Image) -> Image.Image:
+    """
+    Build a binary mask of foreground (text) pixels
+
+    The background is taken to be the most common gray level and the ink
+    threshold follows the capture's contrast, so the mask works for dark,
+    light and dimmed themes alike.
+
+    Args:
+        img: PIL Image
+
+    Returns:
+        Mode 'L' image with 255 for ink and 0 for background
+    """
+    gray = img.convert('L')
+    histogram = gray.histogram()
+    background = histogram.index(max(histogram))
+
+    difference = ImageChops.difference(gray, Image.new('L', gray.size, background))
+
+    # Contrast is the difference reached by the brightest 0.5% of pixels
+    counts = difference.histogram()
+    remaining = gray.width * gray.height // 200
+    contrast = 255
+    while contrast > 0 and counts[contrast] < remaining:
+        remaining -= counts[contrast]
+        contrast -= 1
+
+    threshold = min(MAX_INK_THRESHOLD, max(MIN_INK_THRESHOLD, int(contrast * INK_CONTRAST_FACTOR)))
+    return difference.point(lambda value: 255 if value > threshold else 0)
+
+
+def projection(mask: Image.Image, axis: int) -> List[float]:
+    """
+    Compute the ink projection profile of a mask
+
+    Args:
+        mask: Binary mask from ink_mask
+        axis: 0 for one value per row, 1 for one value per column
+
+    Returns:
+        Mean ink value per row or column
+    """
+    width, height = mask.size
+    size = (1, height) if axis == 0 else (width, 1)
+    # Box-filtered resize of a float image is an exact per-row/column mean;
+    # mode F pixels are native 32-bit floats
+    return array('f', mask.convert('F').resize(size, Image.Resampling.BOX).tobytes()).tolist()
+
+
+def _runs(profile: List[float], min_gap: int) -> List[Tuple[int, int]]:
+    """Split a profile into ink runs separated by at least min_gap blank entries"""
+    runs = []
+    start = None
+    gap = 0
+    for index, value in enumerate(profile):
+        if value > 0:
+            if start is None:
+                start = index
+            gap = 0
+            end = index + 1
+        elif start is not None:
+            gap += 1
+            if gap >= min_gap:
+                runs.append((start, end))
+                start = None
+    if start is not None:
+        runs.append((start, end))
+    return runs
+
+
+def _row_gap(mask: Image.Image) -> int:
+    """Get the blank row count separating paragraphs, scaled to the text size"""
+    lines = _runs(projection(mask, 0), 1)
+    if not lines:
+        return MIN_ROW_GAP
+    heights = sorted(end - start for start, end in lines)
+    return max(MIN_ROW_GAP, int(heights[len(heights) // 2] * LINE_GAP_FACTOR))
+
+
+def _xy_cut(mask: Image.Image, box: Tuple[int, int, int, int], row_gap: int,
+            depth: int) -> List[Tuple[int, int, int, int]]:
+    """Recursively split a region at horizontal and vertical whitespace"""
+    left, top, right, bottom = box
+    region = mask.crop(box)
+
+    rows = _runs(projection(region, 0), row_gap)
+    blocks = []
+    for row_start, row_end in rows:
+        band = region.crop((0, row_start, region.width, row_end))
+        columns = _runs(projection(band, 1), MIN_COLUMN_GAP)
+        for column_start, column_end in columns:
+            sub_box = (left + column_start, top + row_start, left + column_end, top + row_end)
+            if len(rows) == 1 and len(columns) == 1 or depth == 0:
+                blocks.append(sub_box)
+            else:
+                blocks.extend(_xy_cut(mask, sub_box, row_gap, depth - 1))
+    return blocks
+
+
+def _merge_boxes(boxes: List[Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
+    """Get the union of bounding boxes"""
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes)
+    )
+
+
+def find_text_blocks(img: Image.Image, max_blocks: int = MAX_BLOCKS, padding: int = 4) -> List[Tuple[int, int, int, int]]:
+    """
+    Find text blocks in an image in reading order
+
+    Args:
+        img: PIL Image to segment
+        max_blocks: Maximum number of blocks to return
+        padding: Margin added around each block in pixels
+
+    Returns:
+        List of bounding boxes (left, top, right, bottom), top-to-bottom and
+        left-to-right
+    """
+    mask = ink_mask(img)
+    blocks = _xy_cut(mask, (0, 0, img.width, img.height), _row_gap(mask), depth=2)
+
+    blocks = [
+        box for box in blocks
+        if box[2] - box[0] >= MIN_BLOCK_SIZE and box[3] - box[1] >= MIN_BLOCK_SIZE
+    ]
+
+    # Merge neighbours in reading order until the block budget is met
+    while len(blocks) > max_blocks:
+        heights = [
+            _merge_boxes(blocks[i:i + 2])[3] - _merge_boxes(blocks[i:i + 2])[1]
+            for i in range(len(blocks) - 1)
+        ]
+        i = heights.index(min(heights))
+        blocks[i:i + 2] = [_merge_boxes(blocks[i:i + 2])]
+
+    return [
+        (
+            max(0, box[0] - padding),
+            max(0, box[1] - padding),
+            min(img.width, box[2] + padding),
+            min(img.height, box[3] + padding)
+        )
+        for box in blocks
+    ]
@@ -0,0 +1,119 @@
+"""
+Speculative translation of the area under an idle overlay
+"""
+
+from typing import Dict, Tuple
+from PIL import Image
+
+from core.metrics import metrics
+from core.scroll import ScrollDocument, row_signatures
+from core.translator import request_costs
+
+
+class Speculator:
+    """
+    Translates what the overlay covers before the user clicks
+
+    The capture is translated exactly as the click path would translate it -
+    the rows holding complete text lines when scroll detection is on, else
+    the whole capture - so a following click is a plain translation cache
+    hit. Speculation stops once the session's speculative spend reaches the
+    budget. Spend is estimated from the token usage the provider reports and
+    the model's cost_per_1m_tokens; local models cost nothing.
+
+    Args:
+        translator: Translator whose cache the speculative results go to
+        budget: Session budget for speculative requests in USD
+    """
+
+    def __init__(self, translator, budget: float):
+        self.translator = translator
+        self.budget = budget
+
+        self.speculations = 0
+        self.hits = 0
+        self.spent = 0.0
+        self.useful = 0.0  # Spend on speculations a click was served from
+
+        self._pending: Dict[str, float] = {}  # Cache key -> cost, until a click uses it
+        translator.cache_hit_callback = self._on_cache_hit
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of speculations a click was served from"""
+        return self.hits / self.speculations if self.speculations else 0.0
+
+    @property
+    def wasted(self) -> float:
+        """Spend on speculations no click has used (yet)"""
+        return self.spent - self.useful
+
+    def cache_image(self, bbox: Tuple[int, int, int, int], image: Image.Image) -> Image.Image:
+        """Get the part of a capture the click path looks up in the cache"""
+        if self.translator.settings.snapshot.scroll_detection:
+            rows = ScrollDocument(bbox, row_signatures(image)).frame_rows()
+            if rows is not None:
+                return image.crop((0, rows[0], image.width, rows[1]))
+        return image
+
+    async def speculate(self, bbox: Tuple[int, int, int, int], image: Image.Image) -> str:
+        """
+        Translate a capture into the cache unless it is cached or the budget is spent
+
+        Args:
+            bbox: Bounding box the image was captured from
+            image: Capture of the overlay area, not a reused buffer
+
+        Returns:
+            'translated', 'cached' or 'budget'
+        """
+        if self.spent >= self.budget:
+            metrics.increment('speculations_total', outcome='budget')
+            return 'budget'
+
+        image = self.cache_image(bbox, image)
+        key = self.translator._cache_key(image)
+        if key in self.translator.translation_cache:
+            metrics.increment('speculations_total', outcome='cached')
+            return 'cached'
+
+        costs = []
+        token = request_costs.set(costs)
+        try:
+            await self.translator.translate_segmented(image)
+        finally:
+            request_costs.reset(token)
+
+        cost = sum(costs)
+        self.speculations += 1
+        self.spent += cost
+        self._pending[key] = cost
+        metrics.increment('speculations_total', outcome='translated')
+        metrics.increment('speculation_cost_usd_total', cost)
+        print(f"Speculatively translated the overlay area (${cost:.5f}, "
+              f"${self.spent:.4f} of ${self.budget:.4f} budget)")
+        return 'translated'
+
+    def _on_cache_hit(self, key: str):
+        """Count a click served from a speculative translation"""
+        cost = self._pending.pop(key, None)
+        if cost is None:
+            return
+        self.hits += 1
+        self.useful += cost
+        metrics.increment('speculations_total', outcome='hit')
+        print(f"Capture served from speculative translation ({self.hit_rate:.0%} hit rate)")
+
+    def stats(self) -> Dict[str, float]:
+        """Get the speculation counts and spend of this session"""
+        return {
+            'speculations': self.speculations,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate,
+            'spent_usd': self.spent,
+            'wasted_usd': self.wasted
+        }
+
+    def summary(self) -> str:
+        return (f"Speculation: {self.hits}/{self.speculations} used ({self.hit_rate:.0%}), "
+                f"${self.spent:.4f} spent, ${self.wasted:.4f} wasted")
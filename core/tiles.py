@@ -0,0 +1,111 @@
+"""
+Image token estimates and token-minimizing sizes per provider resolution profile
+"""
+
+import math
+from typing import Mapping, Tuple
+
+Size = Tuple[int, int]
+
+# Scales tried between the legibility limit and the original size, on top
+# of the tile and patch boundaries
+SCALE_STEPS = 48
+
+
+def provider_size(size: Size, profile: Mapping) -> Size:
+    """
+    Get the size a provider processes an image at
+
+    Providers scale large images down before tiling; sending more pixels
+    than that only costs encoding and upload time.
+
+    Args:
+        size: (width, height) of the image sent
+        profile: 'resolution' entry of the model's LLM configuration
+
+    Returns:
+        (width, height) after the provider's own downscaling
+    """
+    width, height = size
+    mode = profile['mode']
+    if mode == 'tiles':
+        scale = 1.0
+        if profile.get('max_long'):
+            scale = min(scale, profile['max_long'] / max(width, height))
+        if profile.get('max_short'):
+            scale = min(scale, profile['max_short'] / min(width, height))
+    elif mode == 'patches':
+        patch = profile['patch']
+        patches = math.ceil(width / patch) * math.ceil(height / patch)
+        scale = min(1.0, math.sqrt(profile['max_patches'] * patch * patch / (width * height)))
+        # Shrink further until whole patches fit
+        while patches > profile['max_patches']:
+            patches = math.ceil(width * scale / patch) * math.ceil(height * scale / patch)
+            if patches > profile['max_patches']:
+                scale *= 0.99
+    else:
+        scale = min(1.0, math.sqrt(profile['max_pixels'] / (width * height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def image_tokens(size: Size, profile: Mapping) -> int:
+    """
+    Estimate the tokens a provider bills for an image
+
+    Args:
+        size: (width, height) of the image sent
+        profile: 'resolution' entry of the model's LLM configuration
+
+    Returns:
+        Estimated image tokens
+    """
+    width, height = provider_size(size, profile)
+    mode = profile['mode']
+    if mode == 'tiles':
+        small = profile.get('small_size')
+        if small and width <= small and height <= small:
+            return profile['tile_tokens']
+        tiles = math.ceil(width / profile['tile']) * math.ceil(height / profile['tile'])
+        return profile.get('base_tokens', 0) + profile['tile_tokens'] * tiles
+    if mode == 'patches':
+        patches = math.ceil(width / profile['patch']) * math.ceil(height / profile['patch'])
+        return int(min(patches, profile['max_patches']) * profile.get('multiplier', 1.0))
+    return profile['tokens']
+
+
+def token_minimizing_size(size: Size, profile: Mapping, min_scale: float = 1.0) -> Size:
+    """
+    Choose the size to send an image at
+
+    Tries the scales between min_scale and 1 where the image's sides fall
+    on tile or patch boundaries, plus an even grid of scales, and returns the
+    size with the fewest tokens. Among equally cheap sizes the largest wins,
+    so text is not shrunk further than the tokens require.
+
+    Args:
+        size: (width, height) of the capture
+        profile: 'resolution' entry of the model's LLM configuration
+        min_scale: Smallest scale that keeps the text legible
+
+    Returns:
+        (width, height) to resize to, never larger than the capture
+    """
+    width, height = size
+    min_scale = min(1.0, max(min_scale, 1 / min(width, height)))
+
+    scales = {1.0, min_scale}
+    step = profile.get('tile') or profile.get('patch')
+    if step:
+        for side in (width, height):
+            scales.update(k * step / side for k in range(1, math.ceil(side / step) + 1))
+    scales.update(min_scale + (1 - min_scale) * i / SCALE_STEPS for i in range(SCALE_STEPS))
+
+    best = None
+    for scale in scales:
+        if not min_scale <= scale <= 1.0:
+            continue
+        candidate = provider_size((max(1, int(width * scale)), max(1, int(height * scale))), profile)
+        key = (image_tokens(candidate, profile), -candidate[0] * candidate[1])
+        if best is None or key < best[0]:
+            best = (key, candidate)
+    return best[1]
@@ -5,22 +5,55 @@ LLM translation integration
 import asyncio
 import aiohttp
 import base64
+import contextvars
 import json
 import time
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 from PIL import Image
 import io
 
+from core.complexity import Complexity, cheapest_model, estimate_complexity, is_simple
+from core.packing import compose, pack_instructions, pack_layout, split_response
+from core.script import LANGUAGE_NAMES, classify_language, detect_script, ocr_text
 from core.screenshot import ScreenCapture
+from core.tiles import image_tokens, token_minimizing_size
+from core.segmentation import find_text_blocks
+from core.transport import HttpTransport
+from core.residency import OllamaResidency, ollama_timings
+from core.metrics import metrics
+from core.scheduler import ProviderSlots
+from utils.helpers import join_translations
+
+# Estimated cost in USD of each provider request is appended to this list
+# when the running task sets one (see core.speculation)
+request_costs: contextvars.ContextVar = contextvars.ContextVar('request_costs', default=None)
+
+# Script of the capture being translated ('cjk', 'latin', 'mixed'), None if
+# not detected; decides whether the prompt carries the Chinese instructions
+capture_script: contextvars.ContextVar = contextvars.ContextVar('capture_script', default=None)
+
+# Rough characters per text token, to compare prompts with cache minimums
+TEXT_CHARS_PER_TOKEN = 4
+
+# User prompt of Ollama requests without further instructions
+OLLAMA_USER_PROMPT = "Übersetze das Bild."
 
 
 class Translator:
     """Handles LLM-based translation"""
     
-    def __init__(self, settings):
+    def __init__(self, settings, transport: Optional[HttpTransport] = None):
         self.settings = settings
         self.screen_capture = ScreenCapture()
         self.translation_cache = {}
+        self.transport = transport or HttpTransport()  # Shared connections for all requests
+        self.residency = OllamaResidency(self.transport)
+        self.provider_slots = ProviderSlots(settings.snapshot.provider_slots)  # Shared by all priority classes
+        self.cache_hit_callback: Optional[Callable[[str], None]] = None  # Called with the key of each cache hit
+        self.language_checks = 0  # Latin captures whose language was read
+        self.skipped_translations = 0  # Of those, captures already in the target language
+        self._apply_keep_alive_limits(settings.snapshot)
+        self.settings.subscribe(self._on_settings_changed)
         
     async def translate_image(self, image: Image.Image) -> str:
         """
@@ -32,77 +65,463 @@ class Translator:
         Returns:
             Translation result as string
         """
-        start_time = time.time()
-        
         try:
             # Get current LLM configuration
-            llm_name = self.settings.get('api', 'default_llm', 'gemini-2.5-flash')
-            llm_config = self.settings.llm_config.get(llm_name)
+            snapshot = self.settings.snapshot
+            llm_name = snapshot.default_llm
+            llm_config = snapshot.llm_config.get(llm_name)
             
             if not llm_config:
                 raise ValueError(f"Unknown LLM: {llm_name}")
                 
             # Check cache
-            image_hash = self.screen_capture._get_image_hash(image)
-            if image_hash in self.translation_cache:
-                return self.translation_cache[image_hash]
+            cache_key = self._cache_key(image)
+            with metrics.span('cache'):
+                cached = self.translation_cache.get(cache_key)
+            if cached is not None:
+                self._cache_hit(cache_key)
+                return cached
+            metrics.increment('cache_lookups_total', result='miss')
+            
+            result = await self._translate_uncached(image)
+            self._store(cache_key, result)
+            return result
+            
+        except Exception as e:
+            raise Exception(f"Translation failed: {str(e)}")
+            
+    async def _translate_uncached(self, image: Image.Image, instructions: str = "") -> str:
+        """
+        Route, resize, encode and send an image
+        
+        Args:
+            image: PIL Image containing text to translate
+            instructions: Added to the translation prompt
+        """
+        start_time = time.time()
+        snapshot = self.settings.snapshot
+        
+        # Latin text needs no Chinese instructions, and none at all in the target language
+        script = None
+        if snapshot.script_detection:
+            with metrics.span('script'):
+                script = detect_script(image).script
+            metrics.increment('script_detections_total', script=script or 'none')
+            if script == 'latin' and snapshot.skip_target_language and not instructions:
+                # OCR reads a copy in an executor thread while the loop goes on
+                untranslated = await self._untranslated(image.copy(), snapshot.target_language)
+                if untranslated is not None:
+                    return untranslated
+                    
+        # Simple captures may go to a cheaper model
+        complexity = None
+        if snapshot.routing_enabled or snapshot.tile_aware_resize:
+            with metrics.span('complexity'):
+                complexity = estimate_complexity(image)
+        llm_name = self.route_model(image, complexity)
+        llm_config = snapshot.llm_config[llm_name]
+            
+        # Optimize image for API, at the size with the fewest image tokens
+        max_size = llm_config['max_image_size']
+        resize_to = self._send_size(image, llm_config, complexity)
+        optimized_image_data = self.screen_capture.optimize_image_for_llm(image, max_size, resize_to=resize_to)
+        
+        # Translate using appropriate API
+        token = capture_script.set(script)
+        try:
+            result = await self._request_translation(llm_name, optimized_image_data, instructions)
+        finally:
+            capture_script.reset(token)
+            
+        processing_time = time.time() - start_time
+        kind = self.transport.record_latency(processing_time)
+        print(f"Translation completed in {processing_time:.2f}s ({'first request' if kind == 'first' else 'steady state'})")
+        return result
+        
+    async def _untranslated(self, image: Image.Image, target_language: str) -> Optional[str]:
+        """
+        Get the text of a capture OCR reads as the target language
+        
+        Returns:
+            Result in the translation format, None if the capture needs translating
+        """
+        loop = asyncio.get_running_loop()
+        with metrics.span('ocr'):
+            text = await loop.run_in_executor(None, ocr_text, image)
+        if not text or not text.strip():
+            return None
+            
+        self.language_checks += 1
+        language = classify_language(text)
+        if language != target_language:
+            return None
+        self.skipped_translations += 1
+        metrics.increment('translations_skipped_total', language=language)
+        print(f"Capture already in {LANGUAGE_NAMES[language]}, not translated")
+        return (f"**Erkannte Sprache:** {LANGUAGE_NAMES[language]}\n**Übersetzung:**\n"
+                f"(Bereits in der Zielsprache, nicht übersetzt)\n\n{text.strip()}")
+                
+    def skip_summary(self) -> str:
+        """Describe how many read captures needed no translation"""
+        share = self.skipped_translations / self.language_checks if self.language_checks else 0.0
+        return (f"Language check: {self.skipped_translations}/{self.language_checks} captures "
+                f"already in the target language ({share:.0%}), not translated")
                 
-            # Optimize image for API
-            max_size = llm_config['max_image_size']
-            optimized_image_data = self.screen_capture.optimize_image_for_llm(image, max_size)
+    def _store(self, cache_key: str, result: str):
+        """Cache a translation if caching is enabled"""
+        if self.settings.snapshot.cache_translations:
+            self.translation_cache[cache_key] = result
+            self._cleanup_cache()
             
-            # Translate using appropriate API
-            if llm_name.startswith('gemini'):
-                result = await self._translate_with_gemini(optimized_image_data)
-            elif llm_name.startswith('gpt'):
-                result = await self._translate_with_openai(optimized_image_data, llm_name)
-            elif llm_name == 'ollama':
-                result = await self._translate_with_ollama(optimized_image_data, llm_name)
+    async def translate_segmented(self, image: Image.Image) -> str:
+        """
+        Translate a large capture block by block
+        
+        Text blocks are found by projection-profile segmentation, identical
+        blocks are translated once and the remaining blocks are translated
+        concurrently. When there are more small blocks than request slots,
+        they are packed onto labeled composites (see translate_packed).
+        Small captures are translated in a single request.
+        
+        Args:
+            image: PIL Image containing text to translate
+            
+        Returns:
+            Translation result as string, blocks in reading order
+        """
+        snapshot = self.settings.snapshot
+        if not snapshot.segment_large_captures or image.width * image.height < snapshot.segment_min_pixels:
+            return await self.translate_image(image)
+            
+        cached = self.cached_translation(image)
+        if cached is not None:
+            return cached
+            
+        blocks = find_text_blocks(image)
+        if len(blocks) < 2:
+            return await self.translate_image(image)
+            
+        # Deduplicate repeated blocks (toolbars, repeated labels)
+        block_hashes = []
+        unique_blocks = {}
+        for box in blocks:
+            crop = image.crop(box)
+            block_hash = self.screen_capture._get_image_hash(crop)
+            block_hashes.append(block_hash)
+            unique_blocks.setdefault(block_hash, crop)
+            
+        # Translate unique blocks with bounded parallelism, small ones packed together
+        semaphore = asyncio.Semaphore(snapshot.max_parallel_requests)
+        small = []
+        if snapshot.pack_small_blocks:
+            small = [block_hash for block_hash, crop in unique_blocks.items()
+                     if crop.width * crop.height <= snapshot.pack_max_block_pixels]
+            # While every block gets a request slot of its own, separate requests are faster
+            if len(small) < 2 or len(small) <= snapshot.max_parallel_requests:
+                small = []
+        separate = [block_hash for block_hash in unique_blocks if block_hash not in small]
+        
+        async def translate_block(crop):
+            async with semaphore:
+                return await self.translate_image(crop)
+                
+        packed, results = await asyncio.gather(
+            self.translate_packed([unique_blocks[block_hash] for block_hash in small], semaphore),
+            asyncio.gather(*(translate_block(unique_blocks[block_hash]) for block_hash in separate)))
+        translations = dict(zip(small, packed))
+        translations.update(zip(separate, results))
+        
+        print(f"Translated {len(blocks)} blocks ({len(unique_blocks)} unique)")
+        result = join_translations([translations[block_hash] for block_hash in block_hashes])
+        
+        if snapshot.cache_translations:
+            self.translation_cache[self._cache_key(image)] = result
+            self._cleanup_cache()
+        return result
+        
+    async def translate_regions(self, images: Sequence[Image.Image]) -> List[str]:
+        """
+        Translate the captures of several regions concurrently
+        
+        Regions whose pixels have not changed are served from the cache.
+        
+        Args:
+            images: PIL Image of each region
+            
+        Returns:
+            Translation of each region, in the order given
+        """
+        semaphore = asyncio.Semaphore(self.settings.snapshot.max_parallel_requests)
+        
+        async def translate_region(image):
+            async with semaphore:
+                return await self.translate_segmented(image)
+                
+        return list(await asyncio.gather(*(translate_region(image) for image in images)))
+        
+    async def translate_packed(self, images: Sequence[Image.Image],
+                               semaphore: Optional[asyncio.Semaphore] = None) -> List[str]:
+        """
+        Translate small captures together, labeled on composite images
+        
+        Captures not in the cache are packed onto as few canvases as fit the
+        canvas limits, one request per canvas. When a response cannot be
+        split by its labels, the captures of that canvas are translated one
+        by one instead.
+        
+        Args:
+            images: PIL Images containing text to translate
+            semaphore: Bounds the requests in flight, by default max_parallel_requests
+            
+        Returns:
+            Translation of each image, in the order given
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.settings.snapshot.max_parallel_requests)
+            
+        translations: List[Optional[str]] = [None] * len(images)
+        keys = [self._cache_key(image) for image in images]
+        misses = []
+        for index, cache_key in enumerate(keys):
+            cached = self.translation_cache.get(cache_key)
+            if cached is not None:
+                self._cache_hit(cache_key)
+                translations[index] = cached
             else:
-                raise ValueError(f"Unsupported LLM: {llm_name}")
+                metrics.increment('cache_lookups_total', result='miss')
+                misses.append(index)
                 
-            # Cache result
-            if self.settings.getboolean('translation', 'cache_translations', True):
-                self.translation_cache[image_hash] = result
-                self._cleanup_cache()
+        pending = [images[index] for index in misses]
+        
+        async def translate_one(image):
+            async with semaphore:
+                return await self._translate_uncached(image)
+                
+        async def translate_canvas(canvas):
+            cells = canvas['cells']
+            if len(cells) == 1:
+                return [await translate_one(pending[cells[0][0]])]
+                
+            composite = compose(pending, cells, canvas['size'], range(1, len(cells) + 1))
+            async with semaphore:
+                response = await self._translate_uncached(composite, pack_instructions(len(cells)))
+            parts = split_response(response, len(cells))
+            if parts is not None:
+                metrics.increment('packed_requests_total', result='ok')
+                return parts
                 
-            processing_time = time.time() - start_time
-            print(f"Translation completed in {processing_time:.2f}s")
+            metrics.increment('packed_requests_total', result='split_failed')
+            print(f"Packed response not split into {len(cells)} parts, translating separately")
+            return await asyncio.gather(*(translate_one(pending[index]) for index, _ in cells))
             
-            return result
+        canvases = pack_layout([image.size for image in pending])
+        results = await asyncio.gather(*(translate_canvas(canvas) for canvas in canvases))
+        for canvas, parts in zip(canvases, results):
+            for (index, _), part in zip(canvas['cells'], parts):
+                translations[misses[index]] = part
+                self._store(keys[misses[index]], part)
+                
+        if pending:
+            print(f"Packed {len(pending)} captures into {len(canvases)} requests")
+        return translations
+        
+    def cached_translation(self, image: Image.Image) -> Optional[str]:
+        """
+        Get the cached translation of an image without requesting one
+        
+        Args:
+            image: PIL Image
             
-        except Exception as e:
-            raise Exception(f"Translation failed: {str(e)}")
+        Returns:
+            Cached translation or None
+        """
+        cache_key = self._cache_key(image)
+        cached = self.translation_cache.get(cache_key)
+        if cached is not None:
+            self._cache_hit(cache_key)
+        return cached
+        
+    def _cache_hit(self, cache_key: str):
+        """Count a translation served from the cache"""
+        metrics.increment('cache_lookups_total', result='hit')
+        if self.cache_hit_callback is not None:
+            self.cache_hit_callback(cache_key)
+        
+    def route_model(self, image: Image.Image, complexity: Optional[Complexity] = None) -> str:
+        """
+        Pick the model for a capture by its complexity
+        
+        Simple captures (a label, a status line) go to the simple model, by
+        default the cheapest model with credentials configured (local Ollama
+        only if allowed); dense ones to the dense model, by default the
+        default LLM.
+        
+        Args:
+            image: PIL Image
+            complexity: Complexity of the image if already estimated
+            
+        Returns:
+            Name of the model in the LLM configuration
+        """
+        snapshot = self.settings.snapshot
+        if not snapshot.routing_enabled:
+            return snapshot.default_llm
+            
+        if complexity is None:
+            with metrics.span('complexity'):
+                complexity = estimate_complexity(image)
+        if is_simple(complexity, snapshot.routing_max_lines, snapshot.routing_max_edge_density,
+                     snapshot.routing_max_megapixels):
+            route = 'simple'
+            llm_name = self._simple_model()
+        else:
+            route = 'dense'
+            llm_name = snapshot.routing_dense_model
+        if llm_name not in snapshot.llm_config:
+            llm_name = snapshot.default_llm
+            
+        metrics.increment('routed_captures_total', route=route, model=llm_name)
+        print(f"{route.capitalize()} capture ({complexity.text_lines} lines, "
+              f"{complexity.edge_density:.0%} edges, {complexity.megapixels:.2f} MP) routed to {llm_name}")
+        return llm_name
+        
+    def _send_size(self, image: Image.Image, llm_config: Dict[str, Any],
+                   complexity: Optional[Complexity]) -> Optional[Tuple[int, int]]:
+        """
+        Get the size with the fewest image tokens for the model that keeps text legible
+        
+        Returns:
+            (width, height), None to send the capture as it is
+        """
+        snapshot = self.settings.snapshot
+        profile = llm_config.get('resolution')
+        if not snapshot.tile_aware_resize or not profile or complexity is None:
+            return None
+            
+        # Text lines may shrink to min_text_height, so HiDPI captures scale down most
+        min_scale = 1.0
+        if complexity.line_height:
+            min_scale = snapshot.min_text_height / complexity.line_height
+        size = token_minimizing_size(image.size, profile, min_scale)
+        
+        before = image_tokens(image.size, profile)
+        after = image_tokens(size, profile)
+        metrics.increment('image_tokens_estimated_total', before, stage='captured')
+        metrics.increment('image_tokens_estimated_total', after, stage='sent')
+        print(f"Image tokens: {before} -> {after} estimated "
+              f"({image.width}x{image.height} -> {size[0]}x{size[1]})")
+        return size
+        
+    def _simple_model(self) -> Optional[str]:
+        """Get the model for simple captures, None if none is available"""
+        snapshot = self.settings.snapshot
+        if snapshot.routing_simple_model:
+            return snapshot.routing_simple_model
+        return cheapest_model(snapshot.llm_config, lambda name: self._model_available(name) and
+                              (name != 'ollama' or snapshot.routing_allow_local))
+        
+    def _model_available(self, llm_name: str) -> bool:
+        """Check whether a model's credentials are configured"""
+        snapshot = self.settings.snapshot
+        if llm_name.startswith('gemini'):
+            return bool(snapshot.gemini_api_key) or not self.transport.requires_credentials
+        if llm_name.startswith('gpt'):
+            return bool(snapshot.openai_api_key) or not self.transport.requires_credentials
+        return llm_name == 'ollama' and snapshot.ollama_enabled
+        
+    def _cache_key(self, image: Image.Image) -> str:
+        """
+        Cache key of an image - results differ per model and target language
+        
+        With routing enabled the key names the routing instead of the
+        default LLM: the routed model follows from the pixels and the
+        routing settings, so an entry is only served under the same routing
+        that chose its model, without estimating complexity per lookup.
+        """
+        snapshot = self.settings.snapshot
+        with metrics.span('hash'):
+            image_hash = self.screen_capture._get_image_hash(image)
+        models = snapshot.default_llm
+        if snapshot.routing_enabled:
+            models = (f"route({self._simple_model()},{snapshot.routing_dense_model or snapshot.default_llm},"
+                      f"{snapshot.routing_max_lines},{snapshot.routing_max_edge_density},"
+                      f"{snapshot.routing_max_megapixels})")
+        return f"{models}:{snapshot.target_language}:{image_hash}"
+        
+    def endpoint_url(self) -> Optional[str]:
+        """Get the endpoint URL of the default LLM"""
+        snapshot = self.settings.snapshot
+        llm_config = snapshot.llm_config.get(snapshot.default_llm)
+        return llm_config['endpoint'] if llm_config else None
+        
+    async def prewarm(self):
+        """Resolve and connect to the default LLM's endpoint before the first capture"""
+        snapshot = self.settings.snapshot
+        if snapshot.default_llm == 'ollama' and snapshot.ollama_enabled and snapshot.ollama_preload:
+            await self.residency.preload(snapshot.ollama_base_url, snapshot.ollama_model)
+        if not snapshot.prewarm_connections:
+            return
+        url = self.endpoint_url()
+        if url and await self.transport.prewarm(url):
+            print(f"Prewarmed connection to {url}")
+        self.keep_warm()
+        
+    def keep_warm(self):
+        """Keep the endpoint connection warm until the app has been idle for a while"""
+        snapshot = self.settings.snapshot
+        self.transport.touch()
+        if snapshot.prewarm_connections:
+            self.transport.keep_warm(self.endpoint_url, snapshot.keep_warm_interval,
+                                     snapshot.prewarm_idle_minutes * 60)
+        if snapshot.default_llm == 'ollama' and snapshot.ollama_enabled:
+            self.residency.start_refresh(snapshot.ollama_base_url, snapshot.ollama_model)
+            
+    async def close(self):
+        """Stop settings notifications and background refreshes, and close pooled connections"""
+        self.settings.unsubscribe(self._on_settings_changed)
+        self.residency.stop()
+        await self.transport.close()
+        
+    async def _request_translation(self, llm_name: str, image_data: bytes, instructions: str = "") -> str:
+        """Send optimized image data to the API of the given LLM, holding a provider slot"""
+        async with self.provider_slots.slot():
+            return await self._send_translation(llm_name, image_data, instructions)
             
-    async def _translate_with_gemini(self, image_data: bytes) -> str:
-        """Translate using Google Gemini API"""
-        api_key = self.settings.get('api', 'gemini_api_key')
-        if not api_key:
+    async def _send_translation(self, llm_name: str, image_data: bytes, instructions: str = "") -> str:
+        """Dispatch a translation request to the provider of the given LLM"""
+        prompt = self._build_prompt(llm_name, capture_script.get())
+        if llm_name.startswith('gemini'):
+            return await self._translate_with_gemini(image_data, llm_name, prompt, instructions)
+        elif llm_name.startswith('gpt'):
+            return await self._translate_with_openai(image_data, llm_name, prompt, instructions)
+        elif llm_name == 'ollama':
+            return await self._translate_with_ollama(image_data, llm_name, prompt, instructions)
+        else:
+            raise ValueError(f"Unsupported LLM: {llm_name}")
+            
+    async def _translate_with_gemini(self, image_data: bytes, llm_name: str, prompt: Optional[str] = None,
+                                     instructions: str = "") -> str:
+        """Translate using Google Gemini API, the prompt as system instruction"""
+        api_key = self.settings.snapshot.gemini_api_key
+        if not api_key and self.transport.requires_credentials:
             raise ValueError("Gemini API key not configured")
             
         # Prepare request
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
+        api_model = self.settings.snapshot.llm_config[llm_name]['model_name']
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{api_model}:generateContent?key={api_key}"
         
         # Encode image
         image_b64 = base64.b64encode(image_data).decode('utf-8')
+        if prompt is None:
+            prompt = self._build_prompt(llm_name, capture_script.get())
         
-        # Build prompt
-        prompt = self.settings.translation_prompt
-        if self._contains_chinese_chars(image_data):
-            prompt += "\n" + self.settings.chinese_optimized_prompt
-            
+        # The static instructions come first so they form a cacheable prefix
+        parts = [{"inline_data": {"mime_type": "image/jpeg", "data": image_b64}}]
+        if instructions:
+            parts.append({"text": instructions})
         payload = {
-            "contents": [{
-                "parts": [
-                    {"text": prompt},
-                    {
-                        "inline_data": {
-                            "mime_type": "image/jpeg",
-                            "data": image_b64
-                        }
-                    }
-                ]
-            }],
+            "systemInstruction": {"parts": [{"text": prompt}]},
+            "contents": [{"role": "user", "parts": parts}],
             "generationConfig": {
                 "temperature": 0.1,
                 "topK": 1,
@@ -112,32 +531,30 @@ class Translator:
         }
         
         # Make request
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Gemini API error ({response.status}): {error_text}")
-                    
-                result = await response.json()
+        session = self.transport.session
+        async with session.post(url, json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"Gemini API error ({response.status}): {error_text}")
                 
-                if 'candidates' not in result or not result['candidates']:
-                    raise Exception("No translation result from Gemini")
-                    
-                return result['candidates'][0]['content']['parts'][0]['text']
+            result = await self._read_json(response)
+            
+            if 'candidates' not in result or not result['candidates']:
+                raise Exception("No translation result from Gemini")
+                
+            usage = result.get('usageMetadata', {})
+            self._count_tokens(llm_name, usage.get('promptTokenCount', 0), usage.get('candidatesTokenCount', 0),
+                               usage.get('cachedContentTokenCount', 0))
+            return result['candidates'][0]['content']['parts'][0]['text']
                 
-    async def _translate_with_openai(self, image_data: bytes, model_name: str) -> str:
-        """Translate using OpenAI API"""
-        api_key = self.settings.get('api', 'openai_api_key')
-        if not api_key:
+    async def _translate_with_openai(self, image_data: bytes, model_name: str, prompt: Optional[str] = None,
+                                     instructions: str = "") -> str:
+        """Translate using OpenAI API, the prompt as system message"""
+        api_key = self.settings.snapshot.openai_api_key
+        if not api_key and self.transport.requires_credentials:
             raise ValueError("OpenAI API key not configured")
             
-        # Map model name
-        model_mapping = {
-            'gpt-4.1-mini': 'gpt-4o-mini',
-            'gpt-4.1-nano': 'gpt-4o-mini'  # Using mini as nano doesn't exist yet
-        }
-        
-        api_model = model_mapping.get(model_name, 'gpt-4o-mini')
+        api_model = self.settings.snapshot.llm_config[model_name]['model_name']
         
         # Prepare request
         url = "https://api.openai.com/v1/chat/completions"
@@ -149,57 +566,109 @@ class Translator:
         
         # Encode image
         image_b64 = base64.b64encode(image_data).decode('utf-8')
+        if prompt is None:
+            prompt = self._build_prompt(model_name, capture_script.get())
         
-        # Build prompt
-        prompt = self.settings.translation_prompt
-        if self._contains_chinese_chars(image_data):
-            prompt += "\n" + self.settings.chinese_optimized_prompt
-            
+        # Same system message first in every request, so OpenAI's automatic
+        # prefix caching can reuse it
+        content = [{"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}}]
+        if instructions:
+            content.append({"type": "text", "text": instructions})
         payload = {
             "model": api_model,
             "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_b64}"
-                            }
-                        }
-                    ]
-                }
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": content}
             ],
             "max_tokens": 2048,
             "temperature": 0.1
         }
         
         # Make request
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"OpenAI API error ({response.status}): {error_text}")
-                    
-                result = await response.json()
+        session = self.transport.session
+        async with session.post(url, headers=headers, json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"OpenAI API error ({response.status}): {error_text}")
                 
-                if 'choices' not in result or not result['choices']:
-                    raise Exception("No translation result from OpenAI")
-                    
-                return result['choices'][0]['message']['content']
+            result = await self._read_json(response)
+            
+            if 'choices' not in result or not result['choices']:
+                raise Exception("No translation result from OpenAI")
+                
+            usage = result.get('usage', {})
+            cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
+            self._count_tokens(model_name, usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0), cached)
+            return result['choices'][0]['message']['content']
                 
-    def _contains_chinese_chars(self, image_data: bytes) -> bool:
+    async def _read_json(self, response: aiohttp.ClientResponse) -> Dict[str, Any]:
+        """Read and parse a JSON response body, timing transfer and parsing separately"""
+        with metrics.span('network.transfer'):
+            body = await response.read()
+        with metrics.span('parse'):
+            return json.loads(body)
+            
+    def _count_tokens(self, llm_name: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0):
+        """
+        Add reported token usage and its estimated cost to the counters
+        
+        Args:
+            llm_name: Model the tokens were billed for
+            input_tokens: Prompt tokens including cached ones
+            output_tokens: Generated tokens
+            cached_tokens: Prompt tokens served from the provider's prefix cache
         """
-        Heuristic to detect if image might contain Chinese characters
-        This is a simple implementation - in practice, you might want to use OCR
+        metrics.increment('tokens_total', input_tokens, direction='input')
+        metrics.increment('tokens_total', output_tokens, direction='output')
+        metrics.increment('tokens_total', cached_tokens, direction='cached')
+        print(f"Tokens: {input_tokens} in ({cached_tokens} cached), {output_tokens} out")
+        
+        llm_config = self.settings.snapshot.llm_config.get(llm_name, {})
+        rates = llm_config.get('cost_per_1m_tokens', {})
+        cost = ((input_tokens - cached_tokens) * rates.get('input', 0)
+                + cached_tokens * rates.get('cached_input', rates.get('input', 0))
+                + output_tokens * rates.get('output', 0)) / 1000000
+        metrics.increment('cost_usd_total', cost)
+        costs = request_costs.get()
+        if costs is not None:
+            costs.append(cost)
+        
+    def _build_prompt(self, llm_name: Optional[str] = None, script: Optional[str] = None) -> str:
+        """
+        Get the static translation instructions for a capture
+        
+        The full instructions are sent where the provider caches them as a
+        prompt prefix, the compact ones where every request pays for them
+        (the prefix is below the provider's minimum cacheable length).
+        
+        Args:
+            llm_name: Model the prompt is for, by default the default LLM
+            script: Detected script of the capture; only Latin text goes
+                without the Chinese instructions
         """
-        # For now, always assume it might contain Chinese for better prompt handling
-        return True
+        chinese = script != 'latin'
+        full = self.settings.translation_prompt
+        if chinese:
+            full += "\n" + self.settings.chinese_optimized_prompt
+            
+        snapshot = self.settings.snapshot
+        variant = snapshot.prompt_variant
+        if variant == 'auto':
+            llm_config = snapshot.llm_config.get(llm_name or snapshot.default_llm, {})
+            min_tokens = llm_config.get('prompt_cache_min_tokens')
+            cacheable = min_tokens is not None and len(full) / TEXT_CHARS_PER_TOKEN >= min_tokens
+            variant = 'full' if cacheable else 'compact'
+        if variant != 'compact':
+            return full
+            
+        prompt = self.settings.compact_translation_prompt
+        if chinese:
+            prompt += self.settings.compact_chinese_prompt
+        return prompt
         
     def _cleanup_cache(self):
         """Clean up translation cache if it gets too large"""
-        max_entries = self.settings.getint('translation', 'max_cache_entries', 100)
+        max_entries = self.settings.snapshot.max_cache_entries
         
         if len(self.translation_cache) > max_entries:
             # Remove oldest entries (simple FIFO)
@@ -207,7 +676,21 @@ class Translator:
             keys_to_remove = list(self.translation_cache.keys())[:entries_to_remove]
             
             for key in keys_to_remove:
-                del self.translation_cache[key]
+                self.translation_cache.pop(key, None)
+                
+    def _on_settings_changed(self, snapshot):
+        """Apply changed settings"""
+        if not snapshot.cache_translations:
+            self.clear_cache()
+        else:
+            self._cleanup_cache()
+        self._apply_keep_alive_limits(snapshot)
+        self.provider_slots.resize(snapshot.provider_slots)
+        
+    def _apply_keep_alive_limits(self, snapshot):
+        """Apply the configured Ollama keep_alive range"""
+        self.residency.min_keep_alive = snapshot.ollama_keep_alive_min * 60
+        self.residency.max_keep_alive = max(snapshot.ollama_keep_alive_min, snapshot.ollama_keep_alive_max) * 60
                 
     def clear_cache(self):
         """Clear translation cache"""
@@ -262,34 +745,38 @@ class Translator:
             
         return status
         
-    async def _translate_with_ollama(self, image_data: bytes, llm_name: str) -> str:
-        """Translate using Ollama local API"""
-        if not self.settings.getboolean('ollama', 'enabled', False):
+    async def _translate_with_ollama(self, image_data: bytes, llm_name: str, prompt: Optional[str] = None,
+                                     instructions: str = "") -> str:
+        """Translate using Ollama local API, the prompt as system prompt"""
+        snapshot = self.settings.snapshot
+        if not snapshot.ollama_enabled:
             raise ValueError("Ollama not enabled in configuration")
             
         # Get Ollama configuration
-        llm_config = self.settings.llm_config.get(llm_name)
+        llm_config = snapshot.llm_config.get(llm_name)
         if not llm_config:
             raise ValueError(f"Unknown Ollama model: {llm_name}")
             
-        base_url = self.settings.get('ollama', 'base_url', 'http://localhost:11434')
+        base_url = snapshot.ollama_base_url
         model_name = llm_config['model_name']
-        timeout_seconds = self.settings.getint('ollama', 'timeout', 30)
+        timeout_seconds = snapshot.ollama_timeout
         
         # Encode image to base64
         image_b64 = base64.b64encode(image_data).decode('utf-8')
+        if prompt is None:
+            prompt = self._build_prompt(llm_name, capture_script.get())
         
-        # Build prompt - Ollama vision models work differently
-        prompt = self.settings.translation_prompt
-        if self._contains_chinese_chars(image_data):
-            prompt += "\n" + self.settings.chinese_optimized_prompt
-            
-        # Ollama API payload
+        # Ollama API payload - keep the model loaded until the next expected capture.
+        # The prompt goes first as system prompt, so the runner reuses its
+        # evaluated prefix; an empty user prompt would only load the model.
+        self.residency.record_use()
         payload = {
             "model": model_name,
-            "prompt": prompt,
+            "system": prompt,
+            "prompt": instructions or OLLAMA_USER_PROMPT,
             "images": [image_b64],
             "stream": False,
+            "keep_alive": self.residency.keep_alive(),
             "options": {
                 "temperature": 0.1,
                 "top_p": 0.9,
@@ -299,28 +786,34 @@ class Translator:
         
         # Make request to Ollama
         timeout = aiohttp.ClientTimeout(total=timeout_seconds)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            try:
-                async with session.post(f"{base_url}/api/generate", json=payload) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(f"Ollama API error {response.status}: {error_text}")
-                        
-                    result = await response.json()
+        session = self.transport.session
+        try:
+            async with session.post(f"{base_url}/api/generate", json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Ollama API error {response.status}: {error_text}")
                     
-                    if 'response' not in result:
-                        raise Exception(f"Invalid Ollama response format: {result}")
-                        
-                    translation = result['response'].strip()
-                    if not translation:
-                        raise Exception("Empty translation received from Ollama")
-                        
-                    return translation
+                result = await self._read_json(response)
+                
+                if 'response' not in result:
+                    raise Exception(f"Invalid Ollama response format: {result}")
+                    
+                translation = result['response'].strip()
+                if not translation:
+                    raise Exception("Empty translation received from Ollama")
                     
-            except asyncio.TimeoutError:
-                raise Exception(f"Ollama request timed out after {timeout_seconds}s")
-            except aiohttp.ClientError as e:
-                raise Exception(f"Ollama connection error: {str(e)}")
+                # Model loading is reported apart from inference
+                timings = ollama_timings(result)
+                self.residency.last_timings = timings
+                self._count_tokens(llm_name, result.get('prompt_eval_count', 0), result.get('eval_count', 0))
+                print(f"Ollama: load {timings['load']:.2f}s, prompt {timings['prompt_eval']:.2f}s, "
+                      f"generation {timings['eval']:.2f}s")
+                return translation
+                
+        except asyncio.TimeoutError:
+            raise Exception(f"Ollama request timed out after {timeout_seconds}s")
+        except aiohttp.ClientError as e:
+            raise Exception(f"Ollama connection error: {str(e)}")
                 
     async def test_ollama_connection(self) -> Dict[str, Any]:
         """Test Ollama server connection"""
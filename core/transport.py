@@ -0,0 +1,169 @@
+"""
+Shared HTTP transport with connection prewarming
+"""
+
+import asyncio
+import time
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from core.metrics import metrics
+
+
+# Idle pooled connections are kept this long; servers typically close after 60-120s
+KEEPALIVE_TIMEOUT = 90
+
+# Cached DNS results are reused for this many seconds
+DNS_CACHE_TTL = 600
+
+# Timeout for prewarm requests, which only need the connection
+PREWARM_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+def endpoint_origin(url: str) -> str:
+    """Get scheme://host[:port] of a URL"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def metrics_trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks recording connect time, time to first byte and bytes uploaded"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.request_start = time.perf_counter()
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        metrics.record_span('network.connect', time.perf_counter() - context.connect_start)
+
+    async def on_request_chunk_sent(session, context, params):
+        metrics.increment('uploaded_bytes_total', len(params.chunk))
+
+    async def on_request_end(session, context, params):
+        # Fired once the response headers arrived; prewarm requests are not translations
+        if params.method != 'HEAD':
+            metrics.record_span('network.ttfb', time.perf_counter() - context.request_start)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class HttpTransport:
+    """
+    One aiohttp session shared by all translation requests
+
+    Reusing the session keeps TCP/TLS connections and DNS results between
+    captures. prewarm() opens a connection ahead of the first capture and
+    keep_warm() refreshes it while the app is in use, stopping after the
+    configured idle period.
+    """
+
+    # Whether requests reach real providers, which need API keys
+    requires_credentials = True
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._keep_warm_task: Optional[asyncio.Task] = None
+        self.last_activity = time.monotonic()
+
+        # Latency of the first request kept apart from the steady state
+        self.first_latency: Optional[float] = None
+        self.steady_latencies: List[float] = []
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, created on first use on the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                limit_per_host=8
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[metrics_trace_config()])
+        return self._session
+
+    def touch(self):
+        """Record user activity, keeping connections warm for another idle period"""
+        self.last_activity = time.monotonic()
+
+    def record_latency(self, seconds: float) -> str:
+        """
+        Record the latency of a translation request
+
+        Returns:
+            'first' or 'steady', depending on which figure it counted towards
+        """
+        if self.first_latency is None:
+            self.first_latency = seconds
+            return 'first'
+        self.steady_latencies.append(seconds)
+        del self.steady_latencies[:-100]
+        return 'steady'
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Get first-request and steady-state latency in seconds"""
+        steady = sorted(self.steady_latencies)
+        return {
+            'first': self.first_latency,
+            'steady_median': steady[len(steady) // 2] if steady else None,
+            'steady_count': len(steady)
+        }
+
+    async def prewarm(self, url: str) -> bool:
+        """
+        Resolve and connect to an endpoint so the next request skips DNS, TCP and TLS
+
+        Args:
+            url: Any URL on the endpoint's host
+
+        Returns:
+            True if a connection was established
+        """
+        origin = endpoint_origin(url)
+        try:
+            # Any response leaves a pooled connection behind
+            async with self.session.head(origin, timeout=PREWARM_TIMEOUT, allow_redirects=False):
+                pass
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Prewarming {origin} failed: {e}")
+            return False
+
+    def keep_warm(self, endpoint: Callable[[], Optional[str]], interval: float, idle_timeout: float):
+        """
+        Keep the connection to the current endpoint warm while the app is active
+
+        Args:
+            endpoint: Returns the URL of the current default LLM, None to skip
+            interval: Seconds between refresh requests
+            idle_timeout: Stop refreshing this many seconds after the last touch()
+        """
+        if self._keep_warm_task is not None and not self._keep_warm_task.done():
+            return
+        self._keep_warm_task = asyncio.ensure_future(self._keep_warm(endpoint, interval, idle_timeout))
+
+    async def _keep_warm(self, endpoint: Callable[[], Optional[str]], interval: float, idle_timeout: float):
+        """Refresh loop run by keep_warm()"""
+        while time.monotonic() - self.last_activity < idle_timeout:
+            url = endpoint()
+            if url:
+                await self.prewarm(url)
+            await asyncio.sleep(interval)
+        print("Connection keep-warm stopped after idle period")
+
+    async def close(self):
+        """Stop keep-warm and close pooled connections"""
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            self._keep_warm_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -4,64 +4,206 @@ VisoLingua - Live Translation Overlay Tool
 Main application entry point
 """
 
+import time
+
+STARTUP_TIME = time.perf_counter()
+
 import tkinter as tk
-import asyncio
 import threading
 import sys
 import os
 
+# Only what the capture overlay needs is imported up front. Network, imaging
+# and result window modules are loaded in the background once it is shown.
 from config.settings import Settings
 from ui.overlay import OverlayWindow
-from ui.result_window import ResultWindow
-from core.screenshot import ScreenCapture
-from core.translator import Translator
+
+# Time for the hidden overlay to leave the screen before saved regions are grabbed
+REGION_GRAB_DELAY_MS = 150
 
 
 class VisoLinguaApp:
-    def __init__(self):
+    def __init__(self, measure_startup=False, profile=False, cassette=None):
         self.settings = Settings()
         self.root = tk.Tk()
         self.root.withdraw()  # Hide main window initially
+        self.measure_startup = measure_startup
         
-        # Initialize components
-        self.screen_capture = ScreenCapture()
-        self.translator = Translator(self.settings)
+        # (mode, path, speed) to record provider exchanges or replay them offline
+        self.cassette = cassette
         
-        # Initialize windows
-        self.overlay = OverlayWindow(self.root, self.settings, self.on_screenshot, self.switch_to_result, self.quit)
-        self.result_window = ResultWindow(self.root, self.settings, self.switch_to_capture, self.quit, self.translator)
+        # Profiling wraps methods when enabled and leaves them untouched otherwise
+        self.profiler = None
+        if profile or self.settings.snapshot.profile:
+            self._start_profiler()
         
-        # Current mode: 'capture' or 'result'
-        self.current_mode = 'capture'
+        # Components created on first use (see the properties below)
+        self._screen_capture = None
+        self._translator = None
+        self._result_window = None
+        self._speculator = None
+        self._components_lock = threading.Lock()
         
-        # Setup event loop for async operations
-        self.loop = asyncio.new_event_loop()
+        # Setup event loop for async operations; asyncio is imported there
+        self.loop = None
+        self.scheduler = None
+        self.loop_ready = threading.Event()
         self.async_thread = threading.Thread(target=self._run_async_loop, daemon=True)
         self.async_thread.start()
         
+        # Initialize the capture window; the result window is built later
+        self.overlay = OverlayWindow(self.root, self.settings, self.on_screenshot, self.switch_to_result, self.quit,
+                                     self.on_translate_regions)
+        
+        # Reload config.ini on the Tk thread when it is edited outside the app
+        self.settings.start_watching(lambda reload: self.root.after(0, reload))
+        
+        # Current mode: 'capture' or 'result'
+        self.current_mode = 'capture'
+        
+        # Translated rows of the last captured area for scrolled captures
+        self.scroll_document = None
+        
+        # Cache key of the last capture for re-translation
+        self.last_capture = None
+        
+        # Overlay area that has not moved since the given time, and the
+        # running speculative translation of it
+        self._idle_bbox = None
+        self._idle_since = 0.0
+        self._speculation = None
+        
+    @property
+    def screen_capture(self):
+        """Screen capture, created on first use"""
+        with self._components_lock:
+            if self._screen_capture is None:
+                from core.screenshot import ScreenCapture
+                self._screen_capture = ScreenCapture()
+                if self.profiler is not None:
+                    self._screen_capture.grab = self.profiler.trace_allocations('capture', self._screen_capture.grab)
+            return self._screen_capture
+            
+    @property
+    def translator(self):
+        """Translator, created on first use"""
+        with self._components_lock:
+            if self._translator is None:
+                from core.translator import Translator
+                self._translator = Translator(self.settings, self._create_transport())
+                if self.profiler is not None:
+                    capture = self._translator.screen_capture
+                    capture.optimize_image_for_llm = self.profiler.trace_allocations('encode', capture.optimize_image_for_llm)
+            return self._translator
+            
+    @property
+    def result_window(self):
+        """Result window, created on first use - Tk thread only"""
+        if self._result_window is None:
+            from ui.result_window import ResultWindow
+            self.loop_ready.wait()
+            self._result_window = ResultWindow(self.root, self.settings, self.switch_to_capture, self.quit,
+                                               self.translator, self.on_retranslate, self.scheduler)
+        return self._result_window
+        
+    @property
+    def speculator(self):
+        """Speculative translation of the idle overlay area, created on first use"""
+        with self._components_lock:
+            if self._speculator is None:
+                from core.speculation import Speculator
+                self._speculator = Speculator(self._translator, self.settings.snapshot.speculation_budget_usd)
+            return self._speculator
+        
+    def _create_transport(self):
+        """Cassette transport when recording or replaying, else the default"""
+        if self.cassette is None:
+            return None
+        from core.cassette import CassetteTransport
+        
+        mode, path, speed = self.cassette
+        snapshot = self.settings.snapshot
+        print(f"{'Recording provider exchanges to' if mode == 'record' else 'Replaying provider exchanges from'} {path}")
+        return CassetteTransport(path, mode, time_scale=speed, repeat=True,
+                                 secrets=[snapshot.gemini_api_key, snapshot.openai_api_key])
+        
+    def _start_profiler(self):
+        """Sample the Tk and asyncio threads and trace allocations for this session"""
+        from core.profiling import SessionProfiler
+        
+        report_dir = os.path.join(os.path.dirname(os.path.abspath(self.settings.config_file)), 'profiles')
+        self.profiler = SessionProfiler(report_dir)
+        self.profiler.watch_thread('tk', always=True)
+        self._process_screenshot = self.profiler.wrap_coroutine('process_screenshot', self._process_screenshot)
+        self.profiler.start()
+        print(f"Profiling enabled, report will be written to {report_dir}")
+        
+    def _preload(self):
+        """Import the remaining modules in the background after startup"""
+        start = time.perf_counter()
+        try:
+            import ui.result_window
+            self.screen_capture
+            self.translator
+        except Exception as e:
+            print(f"Error preloading modules: {e}")
+            return
+        print(f"Preloaded translation modules in {(time.perf_counter() - start) * 1000:.0f} ms")
+        
+        # Connect to the LLM endpoint before the first capture
+        from core.scheduler import PREFETCH
+        self._submit(self.translator.prewarm(), PREFETCH)
+        
+        # Widgets must be created on the Tk thread
+        self.root.after(0, lambda: self.result_window)
+        
+    def _submit(self, coro, priority=None):
+        """Run a coroutine on the async loop, as an interactive task by default"""
+        from core.scheduler import INTERACTIVE
+        self.loop_ready.wait()
+        return self.scheduler.submit(coro, INTERACTIVE if priority is None else priority)
+        
     def _run_async_loop(self):
         """Run async event loop in separate thread"""
+        import asyncio
+        from core.scheduler import TaskScheduler
+        self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self.scheduler = TaskScheduler(self.loop, self.settings.snapshot.task_limits)
+        if self.profiler is not None:
+            self.profiler.watch_thread('asyncio')
+        self.loop_ready.set()
         self.loop.run_forever()
         
     def on_screenshot(self, bbox):
         """Handle screenshot capture from overlay"""
-        asyncio.run_coroutine_threadsafe(
-            self._process_screenshot(bbox), 
-            self.loop
-        )
+        self._submit(self._process_screenshot(bbox))
         
     async def _process_screenshot(self, bbox):
         """Process screenshot asynchronously"""
+        from core.metrics import metrics
+        
+        frame = None
         try:
-            # Capture screenshot
-            image = self.screen_capture.capture_area(bbox)
+            start = time.perf_counter()
+            self.translator.keep_warm()
+            
+            # Capture screenshot into a pooled buffer, this capture's own
+            # until the translation is done
+            with metrics.span('capture'):
+                frame = self.screen_capture.grab(bbox)
+                image = frame.to_pil(reuse_buffer=True)
             
             # Show loading in result window
-            self.root.after(0, self.result_window.show_loading)
+            self.root.after(0, lambda: self.result_window.show_loading())
+            
+            # Keep the capture for re-translation, compressed in the background
+            self.last_capture = (bbox, self.screen_capture.remember(bbox, frame))
             
-            # Translate
-            translation = await self.translator.translate_image(image)
+            # Translate only the newly revealed strip of a scrolled capture
+            translation = await self._translate_capture(bbox, image)
+            metrics.record_span('total', time.perf_counter() - start)
+            self._export_metrics()
             
             # Display result
             self.root.after(0, lambda: self.result_window.show_translation(translation))
@@ -69,15 +211,157 @@ class VisoLinguaApp:
             # Switch to result mode
             self.root.after(0, self.switch_to_result)
             
+        except Exception as e:
+            self.scroll_document = None
+            self.screen_capture.reset_scroll()
+            self.root.after(0, lambda: self.result_window.show_error(str(e)))
+            self.root.after(0, self.switch_to_result)
+        finally:
+            if frame is not None:
+                frame.release()
+            
+    def on_translate_regions(self):
+        """Translate all saved regions, once the overlay is out of the way"""
+        if not self.settings.snapshot.regions:
+            return
+        self.overlay.hide()
+        self.root.after(REGION_GRAB_DELAY_MS, lambda: self._submit(self._translate_regions()))
+        
+    async def _translate_regions(self):
+        """Capture the saved regions in one pass and show their translations"""
+        from core.metrics import metrics
+        from core.regions import format_region_results
+        
+        try:
+            start = time.perf_counter()
+            self.translator.keep_warm()
+            regions = self.settings.snapshot.regions
+            with metrics.span('capture'):
+                images = self.screen_capture.grab_regions([bbox for _, bbox in regions])
+            self.root.after(0, lambda: self.result_window.show_loading())
+            
+            translations = await self.translator.translate_regions(images)
+            metrics.record_span('total', time.perf_counter() - start)
+            self._export_metrics()
+            
+            result = format_region_results([(name, translation) for (name, _), translation in zip(regions, translations)])
+            self.root.after(0, lambda: self.result_window.show_translation(result))
+            self.root.after(0, self.switch_to_result)
+            
         except Exception as e:
             self.root.after(0, lambda: self.result_window.show_error(str(e)))
             self.root.after(0, self.switch_to_result)
             
+    def _speculation_tick(self):
+        """Translate the overlay area in the background once the overlay has been idle"""
+        snapshot = self.settings.snapshot
+        self.root.after(int(snapshot.speculation_interval_seconds * 1000), self._speculation_tick)
+        
+        if (not snapshot.speculation_enabled or not snapshot.cache_translations or self._translator is None
+                or self.current_mode != 'capture' or self.overlay.dragging or self.overlay.resizing):
+            self._idle_bbox = None
+            return
+            
+        bbox = self.overlay._get_capture_bbox()
+        now = time.monotonic()
+        if bbox != self._idle_bbox:
+            self._idle_bbox = bbox
+            self._idle_since = now
+            return
+        if now - self._idle_since < snapshot.speculation_idle_seconds:
+            return
+        if self._speculation is not None and not self._speculation.done():
+            return
+            
+        from core.scheduler import PREFETCH
+        self.speculator.budget = snapshot.speculation_budget_usd
+        self._speculation = self._submit(self._speculate(bbox), PREFETCH)
+        
+    async def _speculate(self, bbox):
+        """Capture the overlay area and translate it into the cache"""
+        try:
+            # A copy - the capture buffer is reused by clicks
+            image = self.screen_capture.grab(bbox).to_pil()
+            await self.speculator.speculate(bbox, image)
+        except Exception as e:
+            print(f"Speculative translation failed: {e}")
+            
+    def _export_metrics(self):
+        """Write the metrics file if one is configured"""
+        from core.metrics import metrics
+        
+        path = self.settings.snapshot.metrics_export_file
+        if path:
+            try:
+                metrics.export(path)
+            except OSError as e:
+                print(f"Error exporting metrics: {e}")
+                
+    def on_retranslate(self):
+        """Translate the last capture again with the current settings"""
+        self._submit(self._retranslate_last())
+        
+    async def _retranslate_last(self):
+        """Re-translate the last capture from the capture cache"""
+        try:
+            image = None
+            if self.last_capture:
+                bbox, capture_key = self.last_capture
+                image = self.screen_capture.recall(capture_key)
+            if image is None:
+                raise ValueError("No recent capture available - please capture again")
+                
+            self.root.after(0, lambda: self.result_window.show_loading())
+            translation = await self.translator.translate_segmented(image)
+            self.scroll_document = None
+            self.root.after(0, lambda: self.result_window.show_translation(translation))
+            
+        except Exception as e:
+            self.root.after(0, lambda: self.result_window.show_error(str(e)))
+            
+    async def _translate_capture(self, bbox, image):
+        """Translate a capture, reusing translated rows after a scroll"""
+        from core.scroll import ScrollDocument
+        
+        if not self.settings.snapshot.scroll_detection:
+            return await self.translator.translate_segmented(image)
+            
+        scroll = self.screen_capture.detect_scroll(bbox, image)
+        document = self.scroll_document
+        self.scroll_document = None
+        if document is None or document.bbox != bbox or scroll['offset'] is None:
+            document = ScrollDocument(bbox, scroll['signatures'])
+        else:
+            document.scroll(scroll['offset'], scroll['signatures'])
+            
+        # A frame translated before is served from the translation cache
+        rows = document.frame_rows()
+        if rows is None:
+            return await self.translator.translate_segmented(image)
+        cached = self.translator.cached_translation(image.crop((0, rows[0], image.width, rows[1])))
+        if cached is not None:
+            document.reset()
+            document.add(rows[0], rows[1], cached)
+            
+        # Crop before the first await, the capture buffer is reused
+        missing = document.missing_rows()
+        strips = [(top, bottom, image.crop((0, top, image.width, bottom))) for top, bottom in missing]
+        if document.segments and strips:
+            revealed = sum(bottom - top for top, bottom, _ in strips)
+            print(f"Scroll of {scroll['offset']}px detected, translating {revealed} of {image.height} rows")
+            
+        for top, bottom, strip in strips:
+            document.add(top, bottom, await self.translator.translate_segmented(strip))
+            
+        self.scroll_document = document
+        return document.translation()
+            
     def switch_to_capture(self):
         """Switch to capture mode"""
         print("Switching to capture mode...")
         self.current_mode = 'capture'
-        self.result_window.hide()
+        if self._result_window is not None:
+            self._result_window.hide()
         self.overlay.show()
         
     def switch_to_result(self):
@@ -107,23 +391,57 @@ class VisoLinguaApp:
         # Show initial overlay
         self.overlay.show()
         
+        if self.measure_startup:
+            self.root.after_idle(self._report_startup)
+        else:
+            threading.Thread(target=self._preload, daemon=True).start()
+            self._speculation_tick()
+        
         # Start main loop
         try:
             self.root.mainloop()
         except KeyboardInterrupt:
             self.quit()
             
+    def _report_startup(self):
+        """Print the time to the first visible overlay and exit"""
+        self.overlay.window.update()
+        print(f"Overlay visible after {(time.perf_counter() - STARTUP_TIME) * 1000:.0f} ms")
+        self.quit()
+        
     def quit(self):
         """Clean shutdown"""
         print("Shutting down VisoLingua...")
         try:
-            # Stop async loop
-            if hasattr(self, 'loop') and self.loop.is_running():
+            self.settings.stop_watching()
+            self.settings.flush()
+            
+            if self._speculator is not None and self._speculator.speculations:
+                print(self._speculator.summary())
+                
+            if self._translator is not None and self._translator.language_checks:
+                print(self._translator.skip_summary())
+                
+            if self.profiler is not None:
+                self.profiler.stop()
+                try:
+                    print(f"Profile written to {self.profiler.write_report()}")
+                except OSError as e:
+                    print(f"Error writing profile: {e}")
+                self.profiler = None
+            
+            # Close pooled connections, then stop async loop
+            if self._translator is not None and self.loop is not None:
+                try:
+                    self._submit(self._translator.close()).result(timeout=2)
+                except Exception as e:
+                    print(f"Error closing connections: {e}")
+            if self.loop is not None and self.loop.is_running():
                 self.loop.call_soon_threadsafe(self.loop.stop)
                 
             # Close windows
-            if hasattr(self, 'result_window'):
-                self.result_window.destroy()
+            if self._result_window is not None:
+                self._result_window.destroy()
             if hasattr(self, 'overlay'):
                 self.overlay.destroy()
                 
@@ -137,15 +455,53 @@ class VisoLinguaApp:
             sys.exit(0)
 
 
+def _option(name):
+    """Get the value following a command line option, None if absent"""
+    if name in sys.argv:
+        index = sys.argv.index(name) + 1
+        if index < len(sys.argv):
+            return sys.argv[index]
+        print(f"Missing value for {name}")
+        sys.exit(1)
+    return None
+
+
+def _speed_option(name, default):
+    """Get a positive factor following a command line option, default if absent"""
+    value = _option(name)
+    if value is None:
+        return default
+    try:
+        speed = float(value)
+    except ValueError:
+        speed = 0.0
+    if not 0 < speed < float('inf'):  # Also rejects nan
+        print(f"Invalid value for {name}: {value} (expected a finite number greater than 0)")
+        sys.exit(1)
+    return speed
+
+
 def main():
     """Application entry point"""
     if len(sys.argv) > 1 and sys.argv[1] == '--help':
         print("VisoLingua - Live Translation Overlay Tool")
-        print("Usage: python main.py")
+        print("Usage: python main.py [--measure-startup] [--profile] [--record FILE | --replay FILE [--replay-speed N]]")
+        print("  --measure-startup  Print the time to the first visible overlay and exit")
+        print("  --profile          Profile captures and write a report on exit")
+        print("  --record FILE      Record provider exchanges to a cassette, API keys redacted")
+        print("  --replay FILE      Answer translations from a cassette without network access")
+        print("  --replay-speed N   Replay delay factor > 0: 1 = recorded timing (default), 0.1 = ten times faster")
         return
         
+    cassette = None
+    if _option('--record'):
+        cassette = ('record', _option('--record'), 1.0)
+    elif _option('--replay'):
+        cassette = ('replay', _option('--replay'), _speed_option('--replay-speed', 1.0))
+        
     try:
-        app = VisoLinguaApp()
+        app = VisoLinguaApp(measure_startup='--measure-startup' in sys.argv, profile='--profile' in sys.argv,
+                            cassette=cassette)
         app.run()
     except Exception as e:
         print(f"Error starting VisoLingua: {e}")
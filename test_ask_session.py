@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test Ask AI sessions against a local stand-in server
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+DOCUMENT = "**Erkannte Sprache:** Chinesisch\n**Übersetzung:**\nDer Akku ist leer."
+
+
+def _settings(tmp, values):
+    """Settings in a temporary config file with the given (section, key) values"""
+    from config.settings import Settings
+
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    for (section, key), value in values.items():
+        settings.set(section, key, value)
+    return settings
+
+
+async def _run_server(handler, test):
+    """Serve handler on a free local port and run test(base_url)"""
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_post('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await test(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def test_ollama_follow_up_sends_context():
+    """Follow-up turns send the returned context instead of the document"""
+    from aiohttp import web
+    from core.ask_session import AskSession
+
+    requests = []
+
+    async def handler(request):
+        payload = await request.json()
+        requests.append(payload)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        # NDJSON split across writes, including mid-line
+        lines = [
+            {"response": "Ant", "done": False},
+            {"response": "wort", "done": False},
+            {"response": "", "done": True, "context": [len(requests), 2, 3], "prompt_eval_count": 42}
+        ]
+        data = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        await response.write(data[:10])
+        await response.write(data[10:])
+        return response
+
+    async def test(base_url):
+        settings = _settings(tmp, {
+            ('api', 'default_llm'): 'ollama',
+            ('ollama', 'enabled'): 'true',
+            ('ollama', 'base_url'): base_url
+        })
+        session = AskSession(settings, DOCUMENT)
+        chunks = []
+        try:
+            first = await session.ask("Was ist leer?", chunks.append)
+            second = await session.ask("Und warum?")
+        finally:
+            await session.close()
+            settings.flush()
+        return first, second, chunks, session.turns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second, chunks, turns = asyncio.run(_run_server(handler, test))
+
+    assert first == second == "Antwort"
+    assert chunks == ["Ant", "wort"]
+    assert DOCUMENT in requests[0]['prompt'] and 'context' not in requests[0]
+    assert DOCUMENT not in requests[1]['prompt'] and requests[1]['context'] == [1, 2, 3]
+    assert turns[0]['input_tokens'] == 42
+
+
+def test_openai_history_and_rollback():
+    """Follow-ups resend the message history; failed turns are rolled back"""
+    from aiohttp import web
+    import core.ask_session as ask_session
+
+    requests = []
+
+    async def handler(request):
+        payload = await request.json()
+        requests.append(payload)
+        if len(requests) == 2:
+            return web.Response(status=500, text="overloaded")
+        response = web.StreamResponse()
+        await response.prepare(request)
+        events = [
+            {"choices": [{"delta": {"content": "Ja"}}]},
+            {"choices": [{"delta": {"content": "."}}]},
+            {"choices": [], "usage": {"prompt_tokens": 1200, "prompt_tokens_details": {"cached_tokens": 1024}}}
+        ]
+        for event in events:
+            await response.write(f"data: {json.dumps(event)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def test(base_url):
+        original_url = ask_session.OPENAI_URL
+        ask_session.OPENAI_URL = f"{base_url}/v1/chat/completions"
+        settings = _settings(tmp, {
+            ('api', 'default_llm'): 'gpt-4.1-mini',
+            ('api', 'openai_api_key'): 'test-key'
+        })
+        session = ask_session.AskSession(settings, DOCUMENT)
+        failed = False
+        try:
+            await session.ask("Erste Frage?")
+            try:
+                await session.ask("Zweite Frage?")
+            except Exception:
+                failed = True
+            await session.ask("Dritte Frage?")
+        finally:
+            ask_session.OPENAI_URL = original_url
+            await session.close()
+            settings.flush()
+        return failed, session.turns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        failed, turns = asyncio.run(_run_server(handler, test))
+
+    assert failed
+    # The document is only in the system message, the failed question is gone
+    roles = [message['role'] for message in requests[2]['messages']]
+    assert roles == ['system', 'user', 'assistant', 'user']
+    assert DOCUMENT in requests[2]['messages'][0]['content']
+    assert [message['content'] for message in requests[2]['messages'][1:]] == ["Erste Frage?", "Ja.", "Dritte Frage?"]
+    assert turns[-1]['cached_tokens'] == 1024
+    # The same model the translation uses
+    assert {request['model'] for request in requests} == {'gpt-4.1-mini'}
+
+
+def _ollama_values(base_url):
+    return {('api', 'default_llm'): 'ollama', ('ollama', 'enabled'): 'true', ('ollama', 'base_url'): base_url}
+
+
+def test_shared_transport_records_and_replays():
+    """Questions go through the given transport, so cassettes cover them too"""
+    from aiohttp import web
+    from core.ask_session import AskSession
+    from core.cassette import CassetteTransport
+
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(json.dumps({"response": "Leer.", "done": False}).encode() + b"\n")
+        await response.write(json.dumps({"response": "", "done": True, "context": [1]}).encode() + b"\n")
+        return response
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ask.json')
+
+        async def record(base_url):
+            settings = _settings(tmp, _ollama_values(base_url))
+            transport = CassetteTransport(path, 'record')
+            session = AskSession(settings, DOCUMENT, transport)
+            chunks = []
+            answer = await session.ask("Was ist leer?", chunks.append)
+            await session.close()
+            assert not transport.session.closed  # Owned by the caller
+            await transport.close()
+            settings.flush()
+            return answer, chunks, base_url
+
+        answer, chunks, base_url = asyncio.run(_run_server(handler, record))
+        assert answer == "Leer." and chunks == ["Leer."]
+
+        async def replay():
+            settings = _settings(tmp, _ollama_values(base_url))
+            transport = CassetteTransport(path, 'replay', time_scale=0)
+            session = AskSession(settings, DOCUMENT, transport)
+            try:
+                return await session.ask("Was ist leer?")
+            finally:
+                await session.close()
+                settings.flush()
+
+        # The recording server is gone
+        assert asyncio.run(replay()) == "Leer."
+
+
+if __name__ == "__main__":
+    test_ollama_follow_up_sends_context()
+    test_openai_history_and_rollback()
+    test_shared_transport_records_and_replays()
+    print("All Ask AI session tests passed")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test recording and replaying provider exchanges
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+SECRET = "sk-test-0123456789"
+
+
+def test_redact_url():
+    """Credential query parameters are replaced, others kept"""
+    from core.cassette import redact_url
+
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/x:generateContent?key={SECRET}&alt=json"
+    assert redact_url(url).endswith("?key=REDACTED&alt=json")
+    assert redact_url("http://localhost:11434/api/generate") == "http://localhost:11434/api/generate"
+
+
+async def _serve(test):
+    """Slow stand-in provider echoing the credentials it received"""
+    from aiohttp import web
+
+    async def generate(request):
+        await request.json()
+        await asyncio.sleep(0.2)
+        return web.json_response({"response": "Übersetzung", "done": True, "eval_count": 7})
+
+    async def echo(request):
+        return web.json_response({"auth": request.headers.get('Authorization'), "key": request.query.get('key')})
+
+    app = web.Application()
+    app.router.add_post('/api/generate', generate)
+    app.router.add_post('/echo', echo)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await test(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def _ollama_settings(tmp, base_url):
+    from config.settings import Settings
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    settings.set('api', 'default_llm', 'ollama')
+    settings.set('ollama', 'enabled', 'true')
+    settings.set('ollama', 'base_url', base_url)
+    return settings
+
+
+def test_record_and_replay():
+    """Recorded exchanges replay offline with the original timing or at full speed"""
+    from core.cassette import CassetteTransport
+    from core.translator import Translator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cassettes', 'ollama.json')
+        holder = {}
+
+        async def record(base_url):
+            holder['base_url'] = base_url
+            transport = CassetteTransport(path, 'record', secrets=[SECRET])
+            translator = Translator(_ollama_settings(tmp, base_url), transport)
+            result = await translator._translate_with_ollama(b"png", 'ollama')
+            async with transport.session.post(f"{base_url}/echo?key={SECRET}", json={},
+                                              headers={'Authorization': f"Bearer {SECRET}"}) as response:
+                await response.read()
+            await translator.close()
+            return result
+
+        recorded = asyncio.run(_serve(record))
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        assert SECRET not in content and "REDACTED" in content
+
+        # The stand-in server is gone, replay must not touch the network
+        async def replay(speed, repeat=False):
+            transport = CassetteTransport(path, 'replay', time_scale=speed, repeat=repeat)
+            translator = Translator(_ollama_settings(tmp, holder['base_url']), transport)
+            start = time.perf_counter()
+            result = await translator._translate_with_ollama(b"other image", 'ollama')
+            elapsed = time.perf_counter() - start
+            try:
+                await translator._translate_with_ollama(b"png", 'ollama')
+                exhausted = False
+            except Exception as e:
+                exhausted = "No recorded exchange" in str(e)
+            await translator.close()
+            return result, elapsed, exhausted
+
+        timed_result, timed_elapsed, exhausted = asyncio.run(replay(1.0))
+        fast_result, fast_elapsed, _ = asyncio.run(replay(0, repeat=True))
+
+    assert recorded == timed_result == fast_result == "Übersetzung"
+    assert timed_elapsed >= 0.18
+    assert fast_elapsed < 0.1
+    assert exhausted
+
+
+def test_replay_speed_option():
+    """Replay speeds must be finite and positive; invalid ones stop startup with a message"""
+    import main
+
+    argv = sys.argv
+    try:
+        sys.argv = ['main.py', '--replay', 'session.json', '--replay-speed', '0.25']
+        assert main._speed_option('--replay-speed', 1.0) == 0.25
+        sys.argv = ['main.py', '--replay', 'session.json']
+        assert main._speed_option('--replay-speed', 1.0) == 1.0
+        for value in ('fast', '0', '-1', 'nan', 'inf'):
+            sys.argv = ['main.py', '--replay', 'session.json', '--replay-speed', value]
+            try:
+                main._speed_option('--replay-speed', 1.0)
+            except SystemExit as e:
+                assert e.code == 1
+            else:
+                raise AssertionError(f"{value} accepted")
+    finally:
+        sys.argv = argv
+
+
+if __name__ == "__main__":
+    test_redact_url()
+    test_record_and_replay()
+    test_replay_speed_option()
+    print("✅ Cassette tests passed")
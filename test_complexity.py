@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test complexity estimation and model routing
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+
+def _text(lines, width):
+    image = Image.new('RGB', (width, 18 * lines + 12), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    for row in range(lines):
+        draw.text((8, 6 + row * 18), f"Line {row} of some text", fill=(20, 20, 20))
+    return image
+
+
+def test_estimate_complexity():
+    """Text lines are counted and a label is simple, a page is not"""
+    from core.complexity import estimate_complexity, is_simple
+
+    label = estimate_complexity(_text(1, 160))
+    page = estimate_complexity(_text(40, 1200))
+    assert label.text_lines == 1
+    assert page.text_lines == 40
+    assert page.megapixels > label.megapixels
+
+    assert is_simple(label, max_lines=3, max_edge_density=0.25, max_megapixels=0.5)
+    assert not is_simple(page, max_lines=3, max_edge_density=0.25, max_megapixels=0.5)
+    # A blank capture has no edges and no lines
+    blank = estimate_complexity(Image.new('RGB', (300, 100), (255, 255, 255)))
+    assert blank.text_lines == 0 and blank.edge_density == 0
+
+
+def test_route_model():
+    """Simple captures go to the cheapest model with credentials, dense ones to the default"""
+    from config.settings import Settings
+    from core.translator import Translator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        settings.set('api', 'default_llm', 'gpt-4.1-mini')
+        settings.set('api', 'openai_api_key', 'sk-test')
+        translator = Translator(settings)
+        label, page = _text(1, 160), _text(40, 1200)
+
+        assert translator.route_model(label) == 'gpt-4.1-mini'
+
+        settings.set('routing', 'enabled', 'true')
+        assert translator.route_model(label) == 'gpt-4.1-nano'
+        assert translator.route_model(page) == 'gpt-4.1-mini'
+
+        settings.set('api', 'gemini_api_key', 'test')
+        assert translator.route_model(label) == 'gemini-2.5-flash'
+
+        # Free local Ollama is only picked when allowed, it may be cold
+        settings.set('ollama', 'enabled', 'true')
+        assert translator.route_model(label) == 'gemini-2.5-flash'
+        settings.set('routing', 'allow_local_simple_model', 'true')
+        assert translator.route_model(label) == 'ollama'
+        settings.set('ollama', 'enabled', 'false')
+
+        settings.set('routing', 'simple_model', 'gpt-4.1-nano')
+        settings.set('routing', 'dense_model', 'gemini-2.5-flash')
+        assert translator.route_model(label) == 'gpt-4.1-nano'
+        assert translator.route_model(page) == 'gemini-2.5-flash'
+        settings.flush()
+
+
+def test_cache_key_names_routing():
+    """Results of routed translations are not served under another routing"""
+    from config.settings import Settings
+    from core.translator import Translator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        settings.set('api', 'default_llm', 'gpt-4.1-mini')
+        settings.set('api', 'openai_api_key', 'sk-test')
+        translator = Translator(settings)
+        label = _text(1, 160)
+
+        unrouted = translator._cache_key(label)
+        settings.set('routing', 'enabled', 'true')
+        routed = translator._cache_key(label)
+        assert routed != unrouted and 'gpt-4.1-nano' in routed
+        settings.set('routing', 'simple_model', 'gpt-4.1-mini')
+        assert translator._cache_key(label) not in (routed, unrouted)
+        settings.set('routing', 'enabled', 'false')
+        assert translator._cache_key(label) == unrouted
+        settings.flush()
+
+
+if __name__ == "__main__":
+    test_estimate_complexity()
+    test_route_model()
+    test_cache_key_names_routing()
+    print("✅ Complexity tests passed")
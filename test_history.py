@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the persistent translation history
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+HEADER = "**Erkannte Sprache:** Chinesisch\n**Übersetzung:**\n"
+
+
+def test_add_page_and_get():
+    """Entries are paged newest first and persist across instances"""
+    from core.history import HistoryStore
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.db')
+        store = HistoryStore(path)
+        for i in range(5):
+            store.add(HEADER + f"Eintrag {i}", 'Chinesisch')
+
+        # Unwritten entries are served from memory
+        assert store.page(0, 2)[0]['preview'] == "Eintrag 4"
+        store.close()
+
+        store = HistoryStore(path)
+        first, second = store.page(0, 2), store.page(2, 2)
+        assert [entry['preview'] for entry in first + second] == [f"Eintrag {i}" for i in (4, 3, 2, 1)]
+        assert store.get(first[0]['id'])['full_text'] == HEADER + "Eintrag 4"
+        assert store.count() == 5
+        store.close()
+
+
+def test_search():
+    """Full-text search matches word prefixes and tolerates FTS syntax"""
+    from core.history import HistoryStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'history.db'))
+        for i in range(2000):
+            store.add(HEADER + f"Zeile {i} über Datenschutz" if i % 100 == 0 else HEADER + f"Zeile {i}")
+        store.add(HEADER + "Powerbank Plattform")
+        store.flush()
+
+        assert len(store.search("Datensch")) == 20
+        assert store.search("powerbank")[0]['preview'] == "Powerbank Plattform"
+        assert store.search('"unbalanced AND (') == []
+        store.close()
+
+
+def test_prunes_oldest_entries():
+    """Only max_entries entries are kept"""
+    from core.history import HistoryStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'history.db'), max_entries=3)
+        for i in range(6):
+            store.add(f"Text {i}")
+        store.flush()
+
+        assert [entry['preview'] for entry in store.page(0, 10)] == ["Text 5", "Text 4", "Text 3"]
+        assert store.search("Text") and len(store.search("Text")) == 3
+        store.close()
+
+
+def test_page_while_entries_are_written():
+    """Pages stay full when pending entries are already committed"""
+    from core.history import HistoryStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'history.db'))
+        for i in range(6):
+            store.add(f"Text {i}")
+        store.flush()
+
+        # Committed by the writer but not yet removed from pending
+        store._pending = [dict(row) for row in store.page(0, 2)]
+
+        first, second = store.page(0, 3), store.page(3, 3)
+        assert [entry['preview'] for entry in first + second] == [f"Text {i}" for i in range(5, -1, -1)]
+        store.close()
+
+
+def test_detected_language():
+    """The language named in the translation header is parsed for history entries"""
+    from utils.helpers import detected_language
+    assert detected_language(HEADER + "Text") == "Chinesisch"
+    assert detected_language("Text ohne Kopfzeile") is None
+
+
+if __name__ == "__main__":
+    test_add_page_and_get()
+    test_search()
+    test_prunes_oldest_entries()
+    test_page_while_entries_are_written()
+    test_detected_language()
+    print("✅ History tests passed")
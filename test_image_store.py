@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the compressed capture cache
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image
+
+
+def _noise(size, seed):
+    """Create a poorly compressible test image"""
+    import random
+    rng = random.Random(seed)
+    return Image.frombytes('RGB', size, bytes(rng.getrandbits(8) for _ in range(size[0] * size[1] * 3)))
+
+
+def test_roundtrip_is_lossless():
+    """Stored images decode to identical pixels"""
+    from core.image_store import CompressedImageStore
+    store = CompressedImageStore()
+    img = _noise((64, 48), 1)
+
+    store.put('a', img)
+    assert store.get('a').tobytes() == img.tobytes()
+    assert store.get('missing') is None
+    assert store.stats()['hits'] == 1
+    assert store.stats()['misses'] == 1
+
+
+def test_evicts_least_recently_used_within_budget():
+    """The byte budget is enforced by evicting the least recently used entry"""
+    from core.image_store import CompressedImageStore
+    store = CompressedImageStore(max_bytes=int(3.5 * 64 * 64 * 3))
+    for key in 'abc':
+        store.put(key, _noise((64, 64), ord(key)))
+
+    store.get('a')  # 'b' is now the least recently used
+    store.put('d', _noise((64, 64), 4))
+
+    assert 'b' not in store
+    assert 'a' in store and 'd' in store
+    assert store.stats()['bytes'] <= store.max_bytes
+    assert store.stats()['evictions'] == 1
+
+
+def test_remember_and_recall():
+    """Captures kept for re-translation survive reuse of the frame buffer"""
+    from core.frame import CaptureFrame
+    from core.screenshot import ScreenCapture
+    capture = ScreenCapture()
+    img = _noise((120, 80), 5)
+    frame = CaptureFrame(bytearray(img.tobytes('raw', 'BGRX')), img.size, pool=capture.buffer_pool)
+    frame.to_pil(reuse_buffer=True)
+
+    key = capture.remember((0, 0, 120, 80), frame)
+    frame.to_pil().paste('black', (0, 0, 120, 80))
+    frame.release()
+    assert capture.recall(key).tobytes() == img.tobytes()
+
+
+def test_pooled_buffers_are_exclusive():
+    """Concurrent same-size frames decode into separate buffers, released ones are reused"""
+    from core.frame import CaptureFrame, FrameBufferPool
+    pool = FrameBufferPool()
+    first_img, second_img = _noise((40, 30), 6), _noise((40, 30), 7)
+    first = CaptureFrame(bytearray(first_img.tobytes('raw', 'BGRX')), first_img.size, pool=pool)
+    second = CaptureFrame(bytearray(second_img.tobytes('raw', 'BGRX')), second_img.size, pool=pool)
+
+    first_pil = first.to_pil(reuse_buffer=True)
+    second_pil = second.to_pil(reuse_buffer=True)
+    assert first_pil is not second_pil
+    assert first_pil.tobytes() == first_img.tobytes()
+
+    first.release()
+    third = CaptureFrame(bytearray(second_img.tobytes('raw', 'BGRX')), second_img.size, pool=pool)
+    assert third.to_pil(reuse_buffer=True) is first_pil
+    assert second_pil.tobytes() == second_img.tobytes()
+
+
+def test_digest_matches_across_capture_paths():
+    """Raw and decoded frames of the same pixels hash alike"""
+    from core.frame import CaptureFrame
+    img = _noise((50, 20), 8)
+    raw = CaptureFrame(bytearray(img.tobytes('raw', 'BGRX')), img.size)
+    assert raw.digest() == CaptureFrame.from_image(img).digest()
+    assert raw.digest() != CaptureFrame.from_image(_noise((50, 20), 9)).digest()
+
+
+if __name__ == "__main__":
+    test_roundtrip_is_lossless()
+    test_evicts_least_recently_used_within_budget()
+    test_remember_and_recall()
+    test_pooled_buffers_are_exclusive()
+    test_digest_matches_across_capture_paths()
+    print("✅ Image store tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the metrics registry and its exports
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def test_spans_and_readout():
+    """Stage spans feed p50/p95 readouts"""
+    from core.metrics import MetricsRegistry
+    registry = MetricsRegistry()
+
+    assert registry.readout() == ""
+    for seconds in range(1, 101):
+        registry.record_span('total', seconds / 100)
+    with registry.span('render'):
+        pass
+
+    p50, p95 = registry.stage_percentiles('total')
+    assert p50 == 0.51 and p95 == 0.96
+    readout = registry.readout()
+    assert readout.startswith("p50/p95 total 0.51/0.96s") and "render" in readout
+
+
+def test_prometheus_and_json_export():
+    """Counters and histograms are exported in both formats"""
+    from core.metrics import MetricsRegistry
+    registry = MetricsRegistry()
+    registry.increment('cache_lookups_total', result='hit')
+    registry.increment('cache_lookups_total', result='hit')
+    registry.increment('tokens_total', 1200, direction='input')
+    registry.record_span('capture', 0.25)
+
+    text = registry.to_prometheus()
+    assert '# TYPE visolingua_cache_lookups_total counter' in text
+    assert 'visolingua_cache_lookups_total{result="hit"} 2' in text
+    assert 'visolingua_stage_seconds{stage="capture",quantile="0.5"} 0.25' in text
+    assert 'visolingua_stage_seconds_count{stage="capture"} 1' in text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'metrics.json')
+        registry.export(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        registry.export(os.path.join(tmp, 'visolingua.prom'))
+        # Temporary files are renamed into place
+        assert sorted(os.listdir(tmp)) == ['metrics.json', 'visolingua.prom']
+
+    tokens = [c for c in data['counters'] if c['name'] == 'tokens_total']
+    assert tokens == [{'name': 'tokens_total', 'labels': {'direction': 'input'}, 'value': 1200}]
+
+
+def test_transport_records_network_stages():
+    """Connect time, time to first byte and uploaded bytes come from the shared session"""
+    from aiohttp import web
+    from core.metrics import metrics
+    from core.transport import HttpTransport
+
+    async def handler(request):
+        await request.read()
+        return web.json_response({'ok': True})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post('/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        transport = HttpTransport()
+        try:
+            async with transport.session.post(f"http://127.0.0.1:{port}/", data=b"x" * 5000) as response:
+                await response.read()
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    metrics.reset()
+    asyncio.run(run())
+
+    assert metrics.stage_percentiles('network.connect')[0] is not None
+    assert metrics.stage_percentiles('network.ttfb')[0] is not None
+    assert metrics.counter('uploaded_bytes_total') >= 5000
+    metrics.reset()
+
+
+if __name__ == "__main__":
+    test_spans_and_readout()
+    test_prometheus_and_json_export()
+    test_transport_records_network_stages()
+    print("✅ Metrics tests passed")
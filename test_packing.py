@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test packing of small captures into labeled composite requests
+"""
+
+import sys
+import os
+import re
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+HEADER = "**Erkannte Sprache:** Englisch\n**Übersetzung:**\n"
+
+
+def _label(text, width):
+    image = Image.new('RGB', (width, 30), (240, 240, 240))
+    ImageDraw.Draw(image).text((6, 8), text, fill=(20, 20, 20))
+    return image
+
+
+def test_pack_layout():
+    """Cells stay within the canvas and never overlap"""
+    from core.packing import pack_layout, LABEL_HEIGHT
+
+    sizes = [(300, 40), (120, 30), (500, 90), (200, 60), (700, 30), (90, 25)]
+    canvases = pack_layout(sizes, max_width=1000, max_height=1000)
+    assert len(canvases) == 1
+    cells = canvases[0]['cells']
+    assert sorted(index for index, _ in cells) == list(range(len(sizes)))
+    for index, (left, top, right, bottom) in cells:
+        assert (right - left, bottom - top) == sizes[index]
+        assert right <= canvases[0]['size'][0] and bottom <= canvases[0]['size'][1]
+    # Boxes including their label band do not intersect
+    bands = [(left, top - LABEL_HEIGHT, right, bottom) for _, (left, top, right, bottom) in cells]
+    for i, a in enumerate(bands):
+        for b in bands[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+
+    # What does not fit goes on further canvases, oversized captures on their own
+    canvases = pack_layout([(400, 300)] * 5 + [(2000, 100)], max_width=900, max_height=720)
+    assert len(canvases) == 3
+    assert sum(len(canvas['cells']) for canvas in canvases) == 6
+    assert any(canvas['cells'] == [(5, canvas['cells'][0][1])] for canvas in canvases)
+
+
+def test_compose():
+    """Captures are pasted unchanged into their boxes"""
+    from core.packing import compose, pack_layout
+
+    images = [_label("Save", 80), _label("Cancel", 100)]
+    canvas = pack_layout([image.size for image in images])[0]
+    composite = compose(images, canvas['cells'], canvas['size'], [1, 2])
+    assert composite.size == canvas['size']
+    for index, box in canvas['cells']:
+        assert composite.crop(box).tobytes() == images[index].tobytes()
+
+
+def test_split_response():
+    """Responses split by their markers; a missing marker fails the split"""
+    from core.packing import split_response
+
+    response = HEADER + "[1]\nSpeichern\n\n**[2]**\nAbbrechen\n## [3]:\nÖffnen"
+    assert split_response(response, 3) == [HEADER + "Speichern", HEADER + "Abbrechen", HEADER + "Öffnen"]
+    # Out of order is fine, the label decides
+    assert split_response("[2] Zwei\n[1] Eins", 2) == ["Eins", "Zwei"]
+    assert split_response(HEADER + "[1]\nSpeichern\n[3]\nÖffnen", 3) is None
+    assert split_response(HEADER + "Speichern Abbrechen", 2) is None
+
+
+def test_translate_packed():
+    """Small captures share a request; unsplittable responses fall back to single requests"""
+    from config.settings import Settings
+    from core.translator import Translator
+
+    class LabelTranslator(Translator):
+        requests = []
+        split = True
+
+        async def _request_translation(self, llm_name, image_data, instructions=""):
+            self.requests.append(instructions)
+            match = re.search(r'bis \[(\d+)\]', instructions)
+            if not match:
+                return HEADER + "einzeln"
+            if not self.split:
+                return HEADER + "alles zusammen"
+            return HEADER + "\n".join(f"[{k}]\nTeil {k}" for k in range(1, int(match.group(1)) + 1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        translator = LabelTranslator(settings)
+        images = [_label(text, 120) for text in ("Save", "Cancel", "Open")]
+
+        results = asyncio.run(translator.translate_packed(images))
+        assert len(translator.requests) == 1
+        assert sorted(results) == [HEADER + f"Teil {k}" for k in (1, 2, 3)]
+
+        # Cached captures are not sent again
+        translator.requests.clear()
+        fresh = _label("Close", 120)
+        assert asyncio.run(translator.translate_packed(images + [fresh]))[:3] == results
+        assert translator.requests == [""]
+
+        translator.clear_cache()
+        translator.requests.clear()
+        translator.split = False
+        assert asyncio.run(translator.translate_packed(images)) == [HEADER + "einzeln"] * 3
+        assert len(translator.requests) == 4
+        settings.flush()
+
+
+if __name__ == "__main__":
+    test_pack_layout()
+    test_compose()
+    test_split_response()
+    test_translate_packed()
+    print("✅ Packing tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the session profiler
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def busy_capture(seconds):
+    """Stand-in for a slow pipeline step"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def allocate_buffer():
+    """Stand-in for capture, allocating one large buffer"""
+    return bytearray(4 * 1024 * 1024)
+
+
+def test_samples_only_inside_wrapped_coroutines():
+    """The asyncio thread is sampled while a wrapped capture runs"""
+    from core.profiling import SessionProfiler
+
+    async def process():
+        busy_capture(0.2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = SessionProfiler(tmp, interval=0.002)
+        profiler.watch_thread('asyncio')
+        profiler.start()
+        busy_capture(0.1)  # Not wrapped, not sampled
+        asyncio.run(profiler.wrap_coroutine('process_screenshot', process)())
+        profiler.stop()
+
+        functions = {site[2] for site in profiler.self_samples['asyncio']}
+        assert 'busy_capture' in functions
+        assert profiler.calls['process_screenshot'][0] >= 0.2
+        # Only the wrapped 0.2s can have been sampled
+        assert profiler.samples * 0.002 < 0.3
+
+        path = profiler.write_report()
+        with open(path, encoding='utf-8') as f:
+            report = f.read()
+        assert os.path.dirname(path) == tmp
+        assert "Top functions on the asyncio thread by self time" in report
+        assert "busy_capture" in report
+
+
+def test_allocation_sites_are_recorded():
+    """Wrapped steps report where their memory was allocated"""
+    from core.profiling import SessionProfiler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = SessionProfiler(tmp)
+        profiler.start()
+        buffer = profiler.trace_allocations('capture', allocate_buffer)()
+        profiler.stop()
+
+    assert len(buffer) == 4 * 1024 * 1024
+    site, size = profiler.allocations['capture'].most_common(1)[0]
+    assert site.endswith(f"test_profiling.py:{allocate_buffer.__code__.co_firstlineno + 2}")
+    assert size >= 4 * 1024 * 1024
+    assert profiler.allocation_peaks['capture'] >= 4 * 1024 * 1024
+    assert "Allocation sites during capture" in profiler.report()
+
+
+if __name__ == "__main__":
+    test_samples_only_inside_wrapped_coroutines()
+    test_allocation_sites_are_recorded()
+    print("✅ Profiling tests passed")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test prompt prefix layout, prompt variants and cached token reporting
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+class _Response:
+    status = 200
+    content_type = 'application/json'
+
+    def __init__(self, body):
+        self._body = json.dumps(body).encode('utf-8')
+
+    async def read(self):
+        return self._body
+
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class _Session:
+    """Records request payloads and answers with the given body"""
+
+    closed = False
+
+    def __init__(self, body):
+        self.body = body
+        self.payloads = []
+
+    def post(self, url, json=None, **kwargs):
+        self.payloads.append(json)
+        return _Response(self.body)
+
+    async def close(self):
+        self.closed = True
+
+
+def _translator(tmp, default_llm, body):
+    from config.settings import Settings
+    from core.transport import HttpTransport
+    from core.translator import Translator
+
+    class RecordingTransport(HttpTransport):
+        requires_credentials = False
+
+        def __init__(self):
+            super().__init__()
+            self.recorded = _Session(body)
+
+        @property
+        def session(self):
+            return self.recorded
+
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    settings.set('api', 'default_llm', default_llm)
+    settings.set('ollama', 'enabled', 'true')
+    return settings, Translator(settings, RecordingTransport())
+
+
+def test_prompt_variant():
+    """Short prompts a provider cannot cache are sent compact; local models keep the full prompt"""
+    with tempfile.TemporaryDirectory() as tmp:
+        settings, translator = _translator(tmp, 'gpt-4.1-mini', {})
+        compact = translator._build_prompt('gpt-4.1-mini')
+        full = translator._build_prompt('ollama')
+        assert compact.startswith(settings.compact_translation_prompt)
+        assert full.startswith(settings.translation_prompt)
+        assert len(compact) < len(full) * 0.6
+        # Both ask for the header the result window and join_translations parse
+        for prompt in (compact, full):
+            assert "**Erkannte Sprache:** [Sprache]\n**Übersetzung:**" in prompt
+
+        settings.set('translation', 'prompt_variant', 'full')
+        assert translator._build_prompt('gpt-4.1-mini') == full
+        settings.set('translation', 'prompt_variant', 'compact')
+        assert translator._build_prompt('ollama') == compact
+        settings.flush()
+
+
+def test_openai_prefix_and_cached_tokens():
+    """The system message leads every request; cached prompt tokens are counted and billed at the cached rate"""
+    from core.metrics import metrics
+
+    body = {'choices': [{'message': {'content': "Übersetzt"}}],
+            'usage': {'prompt_tokens': 2000, 'completion_tokens': 100,
+                      'prompt_tokens_details': {'cached_tokens': 1024}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        settings, translator = _translator(tmp, 'gpt-4.1-mini', body)
+        cached_before = metrics.counter('tokens_total', direction='cached')
+        cost_before = metrics.counter('cost_usd_total')
+
+        asyncio.run(translator._send_translation('gpt-4.1-mini', b"first image"))
+        asyncio.run(translator._send_translation('gpt-4.1-mini', b"second image", "[1] bis [2]"))
+        first, second = translator.transport.recorded.payloads
+        assert first['messages'][0] == second['messages'][0]
+        assert first['messages'][0]['role'] == 'system'
+        assert [part['type'] for part in first['messages'][1]['content']] == ['image_url']
+        assert second['messages'][1]['content'][1] == {'type': 'text', 'text': "[1] bis [2]"}
+
+        assert metrics.counter('tokens_total', direction='cached') - cached_before == 2048
+        rates = settings.snapshot.llm_config['gpt-4.1-mini']['cost_per_1m_tokens']
+        expected = (976 * rates['input'] + 1024 * rates['cached_input'] + 100 * rates['output']) / 1000000
+        assert abs((metrics.counter('cost_usd_total') - cost_before) / 2 - expected) < 1e-12
+        settings.flush()
+
+
+def test_gemini_and_ollama_layout():
+    """Gemini gets a system instruction, Ollama a system prompt and a non-empty user prompt"""
+    from core.metrics import metrics
+
+    with tempfile.TemporaryDirectory() as tmp:
+        body = {'candidates': [{'content': {'parts': [{'text': "Übersetzt"}]}}],
+                'usageMetadata': {'promptTokenCount': 1400, 'candidatesTokenCount': 50,
+                                  'cachedContentTokenCount': 1100}}
+        settings, translator = _translator(tmp, 'gemini-2.5-flash', body)
+        cached_before = metrics.counter('tokens_total', direction='cached')
+        asyncio.run(translator._send_translation('gemini-2.5-flash', b"image"))
+        payload = translator.transport.recorded.payloads[0]
+        assert payload['systemInstruction']['parts'][0]['text'] == translator._build_prompt('gemini-2.5-flash')
+        assert list(payload['contents'][0]['parts'][0]) == ['inline_data']
+        assert metrics.counter('tokens_total', direction='cached') - cached_before == 1100
+        settings.flush()
+
+        settings, translator = _translator(tmp, 'ollama', {'response': "Übersetzt", 'prompt_eval_count': 30})
+        asyncio.run(translator._send_translation('ollama', b"image"))
+        payload = translator.transport.recorded.payloads[0]
+        assert payload['system'] == settings.translation_prompt + "\n" + settings.chinese_optimized_prompt
+        assert payload['prompt']
+        settings.flush()
+
+
+if __name__ == "__main__":
+    test_prompt_variant()
+    test_openai_prefix_and_cached_tokens()
+    test_gemini_and_ollama_layout()
+    print("✅ Prompt cache tests passed")
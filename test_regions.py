@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test saved capture regions, their grouped grabs and concurrent translation
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+
+def _screen():
+    """A 1920x1080 screen with some text in a dialog, a status bar and a far corner"""
+    screen = Image.new('RGB', (1920, 1080), (230, 230, 230))
+    draw = ImageDraw.Draw(screen)
+    draw.text((620, 320), "Unsaved changes", fill=(0, 0, 0))
+    draw.text((10, 1050), "Connected - 3 items", fill=(0, 0, 0))
+    draw.text((1700, 20), "12:30", fill=(0, 0, 0))
+    return screen
+
+
+def test_saved_regions():
+    """Regions round-trip through config.ini; malformed ones are skipped"""
+    from config.settings import Settings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.ini')
+        settings = Settings(path)
+        assert settings.snapshot.regions == ()
+
+        settings.save_region('dialog', (600, 300, 1320, 780))
+        settings.save_region('status', (0, 1040, 1920, 1080))
+        settings.set('regions', 'broken', '10, 20, 5')
+        settings.set('regions', 'empty', '10, 20, 10, 40')
+        settings.flush()
+        assert Settings(path).snapshot.regions == (('dialog', (600, 300, 1320, 780)),
+                                                   ('status', (0, 1040, 1920, 1080)))
+
+        settings.remove_region('dialog')
+        settings.remove_region('missing')
+        settings.flush()
+        assert [name for name, _ in Settings(path).snapshot.regions] == ['status']
+
+
+def test_grab_groups():
+    """Nearby regions share a grab, distant ones get their own"""
+    from core.regions import grab_groups
+
+    dialog, button, clock = (600, 300, 1320, 780), (700, 800, 900, 840), (1700, 10, 1900, 40)
+    groups = grab_groups([dialog, button, clock])
+    assert sorted(members for _, members in groups) == [[0, 1], [2]]
+    assert (600, 300, 1320, 840) in [union for union, _ in groups]
+
+    # A status bar across the screen and a clock in the opposite corner
+    assert len(grab_groups([(0, 1040, 1920, 1080), (1700, 10, 1900, 40)])) == 2
+    assert grab_groups([]) == []
+
+
+def test_grab_regions():
+    """Each region gets exactly its own pixels, with one grab per group"""
+    from core.frame import CaptureFrame
+    from core.screenshot import ScreenCapture
+
+    screen = _screen()
+    grabs = []
+
+    class FakeCapture(ScreenCapture):
+        def grab(self, bbox):
+            grabs.append(bbox)
+            return CaptureFrame.from_image(screen.crop(bbox))
+
+    bboxes = [(600, 300, 1320, 780), (700, 800, 900, 840), (0, 1040, 1920, 1080)]
+    images = FakeCapture().grab_regions(bboxes)
+    assert len(grabs) == 2
+    for bbox, image in zip(bboxes, images):
+        assert image.tobytes() == screen.crop(bbox).tobytes()
+
+
+def test_translate_regions():
+    """Regions are translated in order, unchanged ones from the cache"""
+    from config.settings import Settings
+    from core.translator import Translator
+
+    class CountingTranslator(Translator):
+        requests = 0
+        in_flight = 0
+        peak = 0
+
+        async def _request_translation(self, llm_name, image_data, instructions=""):
+            CountingTranslator.requests += 1
+            CountingTranslator.in_flight += 1
+            CountingTranslator.peak = max(CountingTranslator.peak, CountingTranslator.in_flight)
+            await asyncio.sleep(0.01)
+            CountingTranslator.in_flight -= 1
+            return f"**Erkannte Sprache:** Englisch\n**Übersetzung:**\n{len(image_data)}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        settings.set('translation', 'max_parallel_requests', '2')
+        translator = CountingTranslator(settings)
+        screen = _screen()
+        images = [screen.crop(bbox) for bbox in ((600, 300, 900, 400), (0, 1040, 400, 1080),
+                                                 (1650, 0, 1920, 60), (100, 100, 300, 200))]
+
+        first = asyncio.run(translator.translate_regions(images))
+        assert CountingTranslator.requests == 4 and CountingTranslator.peak == 2
+        assert len(set(first)) == 4
+
+        # The status bar changed, everything else comes from the cache
+        changed = images[1].copy()
+        ImageDraw.Draw(changed).text((10, 10), "Disconnected", fill=(0, 0, 0))
+        second = asyncio.run(translator.translate_regions([images[0], changed, images[2], images[3]]))
+        assert CountingTranslator.requests == 5
+        assert second[0] == first[0] and second[2:] == first[2:]
+        settings.flush()
+
+
+def test_format_region_results():
+    """Each region's translation is shown under its name"""
+    from core.regions import format_region_results
+
+    text = format_region_results([('dialog', "Ungespeichert\n"), ('status', "Verbunden")])
+    assert text == "=== dialog ===\nUngespeichert\n\n=== status ===\nVerbunden"
+
+
+if __name__ == "__main__":
+    test_saved_regions()
+    test_grab_groups()
+    test_grab_regions()
+    test_translate_regions()
+    test_format_region_results()
+    print("✅ Region tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test Ollama model residency against a local stand-in server
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+async def _serve_ollama(test, loaded):
+    """Serve /api/generate and /api/ps like Ollama, recording generate payloads"""
+    from aiohttp import web
+
+    payloads = []
+
+    async def generate(request):
+        payload = await request.json()
+        payloads.append(payload)
+        first_load = payload['model'] not in loaded
+        loaded.add(payload['model'])
+        result = {
+            "model": payload['model'],
+            "response": "Übersetzung" if payload.get('prompt') else "",
+            "done": True,
+            "load_duration": 4000000000 if first_load else 20000000,
+            "prompt_eval_duration": 300000000,
+            "eval_duration": 900000000,
+            "total_duration": 5300000000
+        }
+        return web.json_response(result)
+
+    async def ps(request):
+        return web.json_response({"models": [{"name": name, "model": name} for name in loaded]})
+
+    app = web.Application()
+    app.router.add_post('/api/generate', generate)
+    app.router.add_get('/api/ps', ps)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        await test(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+    return payloads
+
+
+def test_keep_alive_follows_usage():
+    """keep_alive covers twice the longest recent gap, within the limits"""
+    from core.residency import OllamaResidency
+    from core.transport import HttpTransport
+    residency = OllamaResidency(HttpTransport(), min_keep_alive=300, max_keep_alive=3600)
+
+    assert residency.keep_alive() == 300
+    for now in (0, 60, 120):
+        residency.record_use(now)
+    assert residency.keep_alive() == 300
+
+    residency.record_use(120 + 600)
+    assert residency.keep_alive() == 1200
+    assert residency.should_be_resident(720 + 1000)
+    assert not residency.should_be_resident(720 + 1300)
+
+    residency.record_use(720 + 3000)
+    assert residency.keep_alive() == 3600
+
+
+def test_preload_and_timings():
+    """Startup preload loads the model, translations report load apart from inference"""
+    from config.settings import Settings
+    from core.translator import Translator
+
+    loaded = set()
+
+    async def test(base_url):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(os.path.join(tmp, 'config.ini'))
+            settings.set('api', 'default_llm', 'ollama')
+            settings.set('ollama', 'enabled', 'true')
+            settings.set('ollama', 'base_url', base_url)
+            settings.set('network', 'prewarm_connections', 'false')
+            translator = Translator(settings)
+            await translator.prewarm()
+            translation = await translator._translate_with_ollama(b"png", 'ollama')
+            await translator.close()
+            settings.flush()
+        assert translation == "Übersetzung"
+        assert translator.residency.last_timings['load'] < 0.1
+        assert translator.residency.last_timings['eval'] == 0.9
+
+    payloads = asyncio.run(_serve_ollama(test, loaded))
+    assert 'prompt' not in payloads[0] and payloads[0]['keep_alive'] == 300
+    assert payloads[1]['images'] and payloads[1]['keep_alive'] == 300
+
+
+def test_refresh_reloads_evicted_model():
+    """The background check reloads the model if Ollama unloaded it early"""
+    from core.residency import OllamaResidency
+    from core.transport import HttpTransport
+
+    loaded = set()
+
+    async def test(base_url):
+        residency = OllamaResidency(HttpTransport(), min_keep_alive=1, max_keep_alive=1)
+        residency.record_use()
+        residency.start_refresh(base_url, 'llava:7b', interval=0.3)
+        await asyncio.sleep(1.4)
+        assert residency._refresh_task.done()
+        residency.stop()
+        await residency.transport.close()
+
+    payloads = asyncio.run(_serve_ollama(test, loaded))
+    # Reloaded once, then the refresh stopped when keep_alive ran out
+    assert len(payloads) == 1 and 'llava:7b' in loaded
+
+
+if __name__ == "__main__":
+    test_keep_alive_follows_usage()
+    test_preload_and_timings()
+    test_refresh_reloads_evicted_model()
+    print("✅ Residency tests passed")
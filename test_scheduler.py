@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test priority scheduling and provider slots
+"""
+
+import sys
+import os
+import asyncio
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def test_background_work_leaves_slots_for_captures():
+    """However much background work queues up, a capture gets a slot at once"""
+    from core.scheduler import ProviderSlots, INTERACTIVE, ASK, PREFETCH, BULK
+
+    async def run():
+        slots = ProviderSlots(4)
+        held = []
+        for priority in (BULK, PREFETCH, PREFETCH, ASK, ASK, BULK, PREFETCH):
+            task = asyncio.ensure_future(slots.acquire(priority))
+            await asyncio.sleep(0)
+            if task.done():
+                held.append(task.result())
+            else:
+                task.cancel()
+
+        # ask may use 3 slots, prefetch 2, bulk 1 - together never all 4
+        assert held == [BULK, PREFETCH, ASK]
+        await asyncio.wait_for(slots.acquire(INTERACTIVE), timeout=0.1)
+        assert sum(slots.in_use) == 4
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_by_priority():
+    """A freed slot goes to the most urgent waiter, not the oldest"""
+    from core.scheduler import ProviderSlots, INTERACTIVE, ASK, BULK
+
+    async def run():
+        slots = ProviderSlots(2)
+        await slots.acquire(INTERACTIVE)
+        await slots.acquire(INTERACTIVE)
+
+        order = []
+
+        async def wait(priority, name):
+            await slots.acquire(priority)
+            order.append(name)
+
+        waiters = [asyncio.ensure_future(wait(BULK, 'bulk')), asyncio.ensure_future(wait(ASK, 'ask')),
+                   asyncio.ensure_future(wait(INTERACTIVE, 'click'))]
+        await asyncio.sleep(0)
+
+        slots.release(INTERACTIVE)
+        await asyncio.sleep(0)
+        assert order == ['click']
+
+        # ask may only take a slot while fewer than 1 are in use
+        slots.release(INTERACTIVE)
+        slots.release(INTERACTIVE)
+        await asyncio.sleep(0)
+        assert order == ['click', 'ask']
+        slots.release(ASK)
+        await asyncio.gather(*waiters)
+        assert order == ['click', 'ask', 'bulk']
+
+    asyncio.run(run())
+
+
+def test_task_limits_and_priority_context():
+    """Tasks of a class run up to its limit and see their class"""
+    from core.scheduler import TaskScheduler, ProviderSlots, current_priority, BULK, INTERACTIVE
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    scheduler = TaskScheduler(loop, limits=(4, 2, 2, 1))
+    slots = ProviderSlots(4)
+
+    running = []
+    peak = []
+
+    async def job():
+        running.append(1)
+        peak.append(len(running))
+        # The provider slot is taken for the submitting class
+        async with slots.slot():
+            seen = [priority for priority, count in enumerate(slots.in_use) if count]
+        await asyncio.sleep(0.02)
+        running.pop()
+        return current_priority.get(), seen
+
+    try:
+        bulk = [scheduler.submit(job(), BULK) for _ in range(3)]
+        click = scheduler.submit(job(), INTERACTIVE)
+        results = [future.result(timeout=2) for future in bulk]
+        assert click.result(timeout=2)[0] == INTERACTIVE
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+
+    assert all(result == (BULK, [BULK]) for result in results)
+    # Three bulk jobs one at a time, the click alongside them
+    assert max(peak) == 2
+
+
+if __name__ == "__main__":
+    test_background_work_leaves_slots_for_captures()
+    test_waiters_are_served_by_priority()
+    test_task_limits_and_priority_context()
+    print("✅ Scheduler tests passed")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test local script and language detection, and the prompts and skipped translations it decides
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+GERMAN_TEXT = ("Die Übersetzung wird in einem eigenen Fenster angezeigt. Sie kann mit der Maus "
+               "kopiert werden, und das Fenster bleibt auf Wunsch im Vordergrund.")
+ENGLISH_TEXT = ("The translation is shown in a separate window. It can be copied with the mouse, "
+                "and the window stays on top if you want it to.")
+
+
+def _screenshot(name, bbox=None):
+    with Image.open(os.path.join(HERE, name)) as image:
+        image = image.convert('RGB')
+    return image.crop(bbox) if bbox else image
+
+
+def test_detect_script():
+    """Chinese UI text reads as CJK, German and English text as Latin"""
+    from core.script import detect_script
+
+    for bbox in ((160, 570, 1210, 650), (160, 8, 1200, 45), (160, 165, 1200, 245)):
+        estimate = detect_script(_screenshot('screen_scan.png', bbox))
+        assert estimate.script == 'cjk', (bbox, estimate)
+
+    german = _screenshot('screen_translate.png', (12, 110, 1150, 300))
+    browser = _screenshot('screen_scan.png', (210, 290, 850, 325))
+    for image in (german, browser):
+        estimate = detect_script(image)
+        assert estimate.script == 'latin' and estimate.columns > 0, estimate
+
+    assert detect_script(_screenshot('screen_scan.png')).script == 'cjk'
+    assert detect_script(_screenshot('screen_translate.png')).script == 'latin'
+    assert detect_script(Image.new('RGB', (300, 100), (255, 255, 255))).script is None
+
+
+def test_classify_language():
+    """Languages of the same script are told apart by their frequent words"""
+    from core.script import classify_language
+
+    assert classify_language(GERMAN_TEXT) == 'de'
+    assert classify_language(ENGLISH_TEXT) == 'en'
+    assert classify_language("Le fichier est enregistré dans le dossier de la session et il sera "
+                             "supprimé avec elle.") == 'fr'
+    # Too few words to tell
+    assert classify_language("Datei speichern") is None
+    assert classify_language("") is None
+
+
+def _translator(tmp, ocr):
+    import core.translator
+    from config.settings import Settings
+    from core.translator import Translator
+
+    class RecordingTranslator(Translator):
+        def __init__(self, settings):
+            super().__init__(settings)
+            self.prompts = []
+
+        async def _send_translation(self, llm_name, image_data, instructions=""):
+            self.prompts.append(self._build_prompt(llm_name, core.translator.capture_script.get()))
+            return "**Erkannte Sprache:** Englisch\n**Übersetzung:**\nÜbersetzt"
+
+    core.translator.ocr_text = ocr
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    settings.set('api', 'default_llm', 'gpt-4.1-mini')
+    settings.set('translation', 'prompt_variant', 'full')
+    settings.set('translation', 'target_language', 'de')
+    return settings, RecordingTranslator(settings)
+
+
+def test_prompt_by_script():
+    """Only captures not detected as Latin get the Chinese instructions"""
+    import core.translator
+
+    original = core.translator.ocr_text
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings, translator = _translator(tmp, lambda image: ENGLISH_TEXT)
+            latin = _screenshot('screen_scan.png', (210, 290, 850, 325))
+            chinese = _screenshot('screen_scan.png', (160, 570, 1210, 650))
+            asyncio.run(translator.translate_image(latin))
+            asyncio.run(translator.translate_image(chinese))
+            assert translator.prompts == [settings.translation_prompt,
+                                          settings.translation_prompt + "\n" + settings.chinese_optimized_prompt]
+
+            settings.set('translation', 'script_detection', 'false')
+            translator.clear_cache()
+            asyncio.run(translator.translate_image(latin))
+            assert translator.prompts[-1] == translator.prompts[1]
+            settings.flush()
+    finally:
+        core.translator.ocr_text = original
+
+
+def test_skip_target_language():
+    """Latin captures OCR reads as the target language are returned untranslated and counted"""
+    import core.translator
+    from core.metrics import metrics
+
+    original = core.translator.ocr_text
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            read = []
+            settings, translator = _translator(tmp, lambda image: read.append(image) or GERMAN_TEXT)
+            german = _screenshot('screen_translate.png', (12, 110, 1150, 300))
+
+            # Opt-in: by default no capture waits for OCR
+            asyncio.run(translator.translate_image(german))
+            assert read == [] and len(translator.prompts) == 1
+
+            settings.set('translation', 'skip_target_language', 'true')
+            translator.clear_cache()
+            translator.prompts.clear()
+            skipped_before = metrics.counter('translations_skipped_total', language='de')
+            result = asyncio.run(translator.translate_image(german))
+            # OCR reads its own copy, not a buffer the next capture may reuse
+            assert len(read) == 1 and read[0] is not german and read[0].tobytes() == german.tobytes()
+            assert result.startswith("**Erkannte Sprache:** Deutsch\n**Übersetzung:**\n")
+            assert result.endswith(GERMAN_TEXT)
+            assert translator.prompts == []
+            assert metrics.counter('translations_skipped_total', language='de') - skipped_before == 1
+
+            # English text, and German text when not translating to German, still go out
+            core.translator.ocr_text = lambda image: ENGLISH_TEXT
+            asyncio.run(translator.translate_image(_screenshot('screen_scan.png', (210, 290, 850, 325))))
+            settings.set('translation', 'target_language', 'en')
+            core.translator.ocr_text = lambda image: GERMAN_TEXT
+            asyncio.run(translator.translate_image(_screenshot('screen_visolingua_rust.png', (130, 1180, 1060, 1280))))
+            assert len(translator.prompts) == 2
+            assert (translator.language_checks, translator.skipped_translations) == (3, 1)
+            assert "1/3" in translator.skip_summary()
+
+            # Without OCR nothing is skipped
+            core.translator.ocr_text = lambda image: None
+            settings.set('translation', 'target_language', 'de')
+            translator.clear_cache()
+            asyncio.run(translator.translate_image(_screenshot('screen_translate.png', (12, 110, 1150, 300))))
+            assert len(translator.prompts) == 3 and translator.language_checks == 3
+            settings.flush()
+    finally:
+        core.translator.ocr_text = original
+
+
+if __name__ == "__main__":
+    test_detect_script()
+    test_classify_language()
+    test_prompt_by_script()
+    test_skip_target_language()
+    print("✅ Script detection tests passed")
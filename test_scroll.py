@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test scroll detection between consecutive captures
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+
+def _make_page(width=300, height=1200):
+    """Create a synthetic document page with distinct text-like lines"""
+    page = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(page)
+    for line, y in enumerate(range(10, height - 20, 24)):
+        # Vary line length and dash pattern so every line is unique
+        for x in range(10, 40 + (line * 37) % (width - 60), 7 + line % 5):
+            draw.rectangle((x, y, x + 3 + line % 3, y + 12), fill='black')
+    return page
+
+
+def test_detects_scroll_down():
+    """Scrolling down reveals a strip at the bottom"""
+    from core.screenshot import ScreenCapture
+    page = _make_page()
+    bbox = (0, 0, 300, 400)
+    capture = ScreenCapture()
+
+    assert capture.detect_scroll(bbox, page.crop((0, 0, 300, 400)))['offset'] is None
+    scroll = capture.detect_scroll(bbox, page.crop((0, 120, 300, 520)))
+
+    assert scroll['offset'] == 120
+    assert len(scroll['signatures']) == 400
+
+
+def test_detects_scroll_up():
+    """Scrolling up reveals a strip at the top"""
+    from core.screenshot import ScreenCapture
+    page = _make_page()
+    bbox = (0, 0, 300, 400)
+    capture = ScreenCapture()
+
+    capture.detect_scroll(bbox, page.crop((0, 300, 300, 700)))
+    scroll = capture.detect_scroll(bbox, page.crop((0, 200, 300, 600)))
+
+    assert scroll['offset'] == -100
+
+
+def test_unrelated_frames():
+    """Different content or a moved overlay is not treated as a scroll"""
+    from core.screenshot import ScreenCapture
+    page = _make_page()
+    capture = ScreenCapture()
+
+    capture.detect_scroll((0, 0, 300, 400), page.crop((0, 0, 300, 400)))
+    assert capture.detect_scroll((0, 0, 300, 400), page.crop((0, 700, 300, 1100)))['offset'] is None
+    assert capture.detect_scroll((10, 0, 310, 400), page.crop((0, 720, 300, 1120)))['offset'] is None
+
+
+def _translate_rows(document, page_top):
+    """Stand-in translator: one output line per page text line in each missing range"""
+    for top, bottom in document.missing_rows():
+        lines = [f"Zeile {(y - 10) // 24}" for y in range(page_top + top, page_top + bottom)
+                 if (y - 10) % 24 == 0 and y + 12 < page_top + bottom]
+        document.add(top, bottom, HEADER + "\n".join(lines))
+
+
+HEADER = "**Erkannte Sprache:** Chinesisch\n**Übersetzung:**\n"
+
+
+def test_scroll_document_translates_rows_once():
+    """Scrolled rows are translated once, without cut or duplicated lines"""
+    from core.scroll import ScrollDocument, row_signatures
+    page = _make_page()
+
+    def frame(top):
+        return row_signatures(page.crop((0, top, 300, top + 400)))
+
+    # Start mid-line so both frame edges cut a text line
+    document = ScrollDocument((0, 0, 300, 400), frame(17))
+    _translate_rows(document, 17)
+    first = document.translation()
+    assert first.startswith(HEADER)
+
+    # Scroll down: only the revealed rows are missing, starting on a line boundary
+    document.scroll(120, frame(137))
+    missing = document.missing_rows()
+    assert len(missing) == 1 and missing[0][0] >= 400 - 120 - 24
+    _translate_rows(document, 137)
+    lines = document.translation()[len(HEADER):].split("\n")
+    assert len(lines) == len(set(lines))
+
+    # Scroll back up: everything is covered, nothing is prepended twice
+    document.scroll(-120, frame(17))
+    assert document.missing_rows() == []
+    back = document.translation()[len(HEADER):].split("\n")
+    assert len(back) == len(set(back))
+
+
+def test_scroll_document_bounded_to_viewport():
+    """Segments scrolled out of view are not part of the result"""
+    from core.scroll import ScrollDocument, row_signatures
+    page = _make_page()
+
+    document = ScrollDocument((0, 0, 300, 400), row_signatures(page.crop((0, 0, 300, 400))))
+    _translate_rows(document, 0)
+    document.scroll(500, row_signatures(page.crop((0, 500, 300, 900))))
+    _translate_rows(document, 500)
+
+    assert "Zeile 0\n" not in document.translation()
+    assert "Zeile 25" in document.translation()
+
+
+if __name__ == "__main__":
+    test_detects_scroll_down()
+    test_detects_scroll_up()
+    test_unrelated_frames()
+    test_scroll_document_translates_rows_once()
+    test_scroll_document_bounded_to_viewport()
+    print("✅ Scroll detection tests passed")
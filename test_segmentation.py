@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test text block segmentation of large captures
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+
+def _make_paragraphs():
+    """Create a light page with two paragraphs and a repeated label column"""
+    page = Image.new('RGB', (800, 600), (240, 240, 240))
+    draw = ImageDraw.Draw(page)
+    for top in (40, 300):
+        for y in range(top, top + 120, 20):
+            draw.rectangle((40, y, 500, y + 10), fill=(30, 30, 30))
+    for y in (60, 360):
+        draw.rectangle((650, y, 750, y + 12), fill=(30, 30, 30))
+    return page
+
+
+def test_finds_blocks_in_reading_order():
+    """Paragraphs and the side column are separate blocks, top to bottom"""
+    from core.segmentation import find_text_blocks
+    blocks = find_text_blocks(_make_paragraphs())
+
+    assert len(blocks) == 4
+    assert [box[1] < 250 for box in blocks] == [True, True, False, False]
+    assert blocks[0][0] < blocks[1][0]
+
+
+def test_blank_capture_has_no_blocks():
+    """A uniform capture yields no blocks"""
+    from core.segmentation import find_text_blocks
+    assert find_text_blocks(Image.new('RGB', (400, 300), 'white')) == []
+
+
+def test_join_translations():
+    """Joined block translations keep one language header"""
+    from utils.helpers import join_translations
+    header = "**Erkannte Sprache:** Englisch\n**Übersetzung:**\n"
+
+    joined = join_translations([header + "Eins", header + "Zwei\n"])
+    assert joined == header + "Eins\n\nZwei"
+
+
+if __name__ == "__main__":
+    test_finds_blocks_in_reading_order()
+    test_blank_capture_has_no_blocks()
+    test_join_translations()
+    print("✅ Segmentation tests passed")
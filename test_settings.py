@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test the settings snapshot, change notifications and hot reload
+"""
+
+import sys
+import os
+import time
+import tempfile
+import dataclasses
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def test_snapshot_rebuilt_on_change():
+    """The snapshot is immutable, cached and replaced when a value changes"""
+    from config.settings import Settings
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        snapshot = settings.snapshot
+        assert settings.llm_config is settings.llm_config
+
+        try:
+            snapshot.font_size = 20
+            assert False, "snapshot must be frozen"
+        except dataclasses.FrozenInstanceError:
+            pass
+
+        notified = []
+        settings.subscribe(notified.append)
+        settings.set('translation', 'target_language', 'en')
+        settings.set('translation', 'target_language', 'en')  # Unchanged, no notification
+
+        assert len(notified) == 1
+        assert notified[0] is settings.snapshot and settings.snapshot.target_language == 'en'
+        assert snapshot.target_language == 'de'
+
+        settings.set('ollama', 'enabled', 'true')
+        assert 'ollama' in settings.llm_config
+
+
+def test_reload_when_file_changes():
+    """External edits are picked up by the watcher, our own saves are not"""
+    from config.settings import Settings
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.ini')
+        settings = Settings(path)
+        reloads = []
+        settings.start_watching(lambda reload: (reloads.append(1), reload()), interval=0.02)
+        try:
+            settings.set('ui', 'font_size', '12')
+            settings.save()
+            settings.flush()
+            time.sleep(0.1)
+            assert reloads == []
+
+            with open(path) as f:
+                text = f.read()
+            with open(path, 'w') as f:
+                f.write(text.replace('font_size = 12', 'font_size = 16'))
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+            deadline = time.time() + 2
+            while settings.snapshot.font_size != 16 and time.time() < deadline:
+                time.sleep(0.02)
+            assert settings.snapshot.font_size == 16
+            assert reloads == [1]
+        finally:
+            settings.stop_watching()
+
+
+def test_saves_are_coalesced():
+    """A burst of saves results in one atomic write, flushed on demand"""
+    from config.settings import Settings
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.ini')
+        settings = Settings(path, save_delay=0.05)
+        writes = []
+        original_write = settings._write_config
+        settings._write_config = lambda: (writes.append(1), original_write())
+
+        for _ in range(20):
+            settings.scale_font(1)
+        assert writes == []
+        time.sleep(0.3)
+        assert len(writes) == 1
+        assert Settings(path).snapshot.font_size == 24
+
+        settings.scale_font(-1)
+        settings.flush()
+        assert len(writes) == 2
+        assert Settings(path).snapshot.font_size == 23
+        assert os.listdir(tmp) == ['config.ini']
+
+
+def test_closed_translator_stops_listening():
+    """A closed translator no longer receives settings changes"""
+    import asyncio
+    from config.settings import Settings
+    from core.translator import Translator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(os.path.join(tmp, 'config.ini'))
+        subscribers = len(settings._subscribers)
+        translator = Translator(settings)
+        assert len(settings._subscribers) == subscribers + 1
+
+        asyncio.run(translator.close())
+        assert len(settings._subscribers) == subscribers
+        settings.flush()
+
+
+if __name__ == "__main__":
+    test_snapshot_rebuilt_on_change()
+    test_reload_when_file_changes()
+    test_saves_are_coalesced()
+    test_closed_translator_stops_listening()
+    print("✅ Settings tests passed")
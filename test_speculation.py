@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test speculative translation of the idle overlay area
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image, ImageDraw
+
+BBOX = (100, 100, 500, 300)
+
+
+def _screen(seed):
+    """Text-like lines that differ per seed"""
+    image = Image.new('RGB', (BBOX[2] - BBOX[0], BBOX[3] - BBOX[1]), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for line, y in enumerate(range(10, image.height - 20, 24)):
+        width = 60 + (seed * 37 + line * 53) % 300
+        draw.rectangle((10, y, 10 + width, y + 12), fill=(20, 20, 20))
+    return image
+
+
+def _gemini_cassette(tmp):
+    """Replayable Gemini answer reporting 1000 input and 100 output tokens"""
+    from core.cassette import CASSETTE_VERSION, redact_url
+    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key="
+    body = {
+        "candidates": [{"content": {"parts": [{"text": "**Übersetzung:**\nDer Akku ist leer."}]}}],
+        "usageMetadata": {"promptTokenCount": 1000, "candidatesTokenCount": 100}
+    }
+    path = os.path.join(tmp, 'gemini.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CASSETTE_VERSION, 'exchanges': [{
+            'method': 'POST', 'url': redact_url(url), 'request_bytes': 0, 'status': 200,
+            'content_type': 'application/json', 'body': json.dumps(body), 'ttfb': 0, 'transfer': 0
+        }]}, f)
+    return path
+
+
+def _translator(tmp, scroll_detection=True):
+    from config.settings import Settings
+    from core.cassette import CassetteTransport
+    from core.translator import Translator
+
+    settings = Settings(os.path.join(tmp, 'config.ini'))
+    settings.set('api', 'default_llm', 'gemini-2.5-flash')
+    settings.set('translation', 'scroll_detection', str(scroll_detection).lower())
+    transport = CassetteTransport(_gemini_cassette(tmp), 'replay', time_scale=0, repeat=True)
+    return Translator(settings, transport)
+
+
+def test_click_is_served_from_speculation():
+    """A click on the speculated area hits the cache and counts as a hit"""
+    from core.speculation import Speculator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        translator = _translator(tmp)
+        speculator = Speculator(translator, budget=1.0)
+
+        async def run():
+            image = _screen(1)
+            assert await speculator.speculate(BBOX, image) == 'translated'
+            assert await speculator.speculate(BBOX, image) == 'cached'
+
+            # What the click path looks up: the rows with complete lines
+            click = speculator.cache_image(BBOX, image.copy())
+            assert translator.cached_translation(click) is not None
+
+            await speculator.speculate(BBOX, _screen(2))
+            await translator.close()
+
+        asyncio.run(run())
+        translator.settings.flush()
+
+    # 1000 input tokens at $0.10 and 100 output tokens at $0.40 per million
+    assert abs(speculator.spent - 2 * 0.00014) < 1e-9
+    assert speculator.hits == 1 and speculator.hit_rate == 0.5
+    assert abs(speculator.wasted - 0.00014) < 1e-9
+
+
+def test_full_capture_without_scroll_detection():
+    """Without scroll detection the whole capture is speculated, as a click translates it"""
+    from core.speculation import Speculator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        translator = _translator(tmp, scroll_detection=False)
+        speculator = Speculator(translator, budget=1.0)
+
+        async def run():
+            image = _screen(3)
+            await speculator.speculate(BBOX, image)
+            await translator.translate_segmented(image.copy())
+            await translator.close()
+
+        asyncio.run(run())
+        translator.settings.flush()
+
+    assert speculator.stats()['hits'] == 1 and speculator.wasted == 0
+
+
+def test_budget_stops_speculation():
+    """No speculative request is sent once the spend reaches the budget"""
+    from core.speculation import Speculator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        translator = _translator(tmp)
+        speculator = Speculator(translator, budget=0.0002)
+
+        async def run():
+            results = [await speculator.speculate(BBOX, _screen(seed)) for seed in range(4)]
+            await translator.close()
+            return results
+
+        results = asyncio.run(run())
+        translator.settings.flush()
+
+    assert results == ['translated', 'translated', 'budget', 'budget']
+    assert speculator.speculations == 2
+
+
+if __name__ == "__main__":
+    test_click_is_served_from_speculation()
+    test_full_capture_without_scroll_detection()
+    test_budget_stops_speculation()
+    print("✅ Speculation tests passed")
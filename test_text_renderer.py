@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test chunked rendering of long results without a display
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+class FakeText:
+    """Stand-in for tk.Text recording edits and scheduled callbacks"""
+
+    def __init__(self):
+        self.text = ""
+        self.inserts = []
+        self.jobs = []
+
+    def config(self, **kwargs):
+        pass
+
+    def insert(self, index, chunk):
+        assert index == "end"
+        self.text += chunk
+        self.inserts.append(chunk)
+
+    def delete(self, index, end):
+        assert index.startswith("1.0+") and end == "end"
+        self.text = self.text[:int(index[4:-1])]
+
+    def after(self, delay, callback):
+        self.jobs.append(callback)
+        return len(self.jobs)
+
+    def after_cancel(self, job):
+        self.jobs[job - 1] = None
+
+    def run_pending(self):
+        while any(self.jobs):
+            jobs, self.jobs = self.jobs, []
+            for job in jobs:
+                if job:
+                    job()
+
+
+def test_common_prefix_length():
+    """Prefix length is found for appends, edits and unrelated text"""
+    from ui.text_renderer import common_prefix_length
+
+    assert common_prefix_length("abc", "abcdef") == 3
+    assert common_prefix_length("abcdef", "abc") == 3
+    assert common_prefix_length("abcxef", "abcdef") == 3
+    assert common_prefix_length("xyz", "abc") == 0
+    assert common_prefix_length("", "abc") == 0
+    long_text = "a" * 10000
+    assert common_prefix_length(long_text + "b", long_text + "c") == 10000
+
+
+def test_render_in_chunks():
+    """Long text is inserted over several scheduled steps"""
+    from ui.text_renderer import ChunkedTextRenderer
+    widget = FakeText()
+    progress = []
+    renderer = ChunkedTextRenderer(widget, chunk_size=100, frame_budget_ms=0, on_progress=lambda done, total: progress.append(done))
+
+    renderer.render("x" * 1000)
+    assert renderer.busy
+    widget.run_pending()
+
+    assert widget.text == "x" * 1000
+    assert len(widget.inserts) == 10
+    assert progress[-1] == 1000 and not renderer.busy
+
+
+def test_render_replaces_only_changed_tail():
+    """Appended text inserts just the tail, edits delete from the first difference"""
+    from ui.text_renderer import ChunkedTextRenderer
+    widget = FakeText()
+    renderer = ChunkedTextRenderer(widget)
+
+    renderer.render("Übersetzung")
+    renderer.render("Übersetzung\nAntwort")
+    assert widget.inserts[-1] == "\nAntwort"
+
+    renderer.render("Übersetzung\nFrage")
+    assert widget.text == "Übersetzung\nFrage"
+    assert widget.inserts[-1] == "Frage"
+
+    renderer.clear()
+    assert widget.text == "" and renderer.displayed == ""
+
+
+def test_new_render_cancels_pending_chunks():
+    """Starting a new render drops the rest of the previous one"""
+    from ui.text_renderer import ChunkedTextRenderer
+    widget = FakeText()
+    renderer = ChunkedTextRenderer(widget, chunk_size=10, frame_budget_ms=0)
+
+    renderer.render("a" * 100)
+    renderer.render("b" * 15)
+    widget.run_pending()
+
+    assert widget.text == "b" * 15
+
+
+if __name__ == "__main__":
+    test_common_prefix_length()
+    test_render_in_chunks()
+    test_render_replaces_only_changed_tail()
+    test_new_render_cancels_pending_chunks()
+    print("✅ Text renderer tests passed")
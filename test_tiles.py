@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test image token estimates and tile-aware sizing
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+GEMINI = {'mode': 'tiles', 'tile': 768, 'tile_tokens': 258, 'small_size': 384}
+OPENAI_TILES = {'mode': 'tiles', 'tile': 512, 'tile_tokens': 170, 'base_tokens': 85, 'max_long': 2048, 'max_short': 768}
+GPT_MINI = {'mode': 'patches', 'patch': 32, 'max_patches': 1536, 'multiplier': 1.62}
+LLAVA = {'mode': 'native', 'max_pixels': 672 * 672, 'tokens': 2880}
+
+
+def test_image_tokens():
+    """Token estimates follow the providers' published rules"""
+    from core.tiles import image_tokens, provider_size
+
+    assert image_tokens((300, 200), GEMINI) == 258
+    assert image_tokens((1000, 500), GEMINI) == 2 * 258
+
+    # 2048x4096 is scaled to 1024x2048, then to 768x1536: 2x3 tiles
+    assert provider_size((2048, 4096), OPENAI_TILES) == (768, 1536)
+    assert image_tokens((2048, 4096), OPENAI_TILES) == 85 + 170 * 6
+
+    assert image_tokens((1024, 1024), GPT_MINI) == int(1024 * 1.62)
+    # Over the patch limit the provider scales down to at most 1536 patches
+    width, height = provider_size((1800, 2400), GPT_MINI)
+    assert -(-width // 32) * -(-height // 32) <= 1536
+    assert image_tokens((1800, 2400), GPT_MINI) <= int(1536 * 1.62)
+
+    assert image_tokens((3840, 2160), LLAVA) == 2880
+    width, height = provider_size((3840, 2160), LLAVA)
+    assert width * height <= 672 * 672
+
+
+def test_token_minimizing_size():
+    """The chosen size saves tiles where the text allows and never enlarges"""
+    from core.tiles import image_tokens, token_minimizing_size
+
+    # Just over one Gemini tile: shrinking 5% saves a tile
+    size = token_minimizing_size((800, 600), GEMINI, min_scale=0.5)
+    assert size[0] <= 768 and image_tokens(size, GEMINI) == 258
+    # Not when the text may not shrink
+    assert token_minimizing_size((800, 600), GEMINI, min_scale=1.0) == (800, 600)
+
+    # Patches are billed by area: text sets the limit, rounded up to whole patches
+    size = token_minimizing_size((2000, 1000), GPT_MINI, min_scale=0.6)
+    assert size == (1216, 608)
+    assert image_tokens(size, GPT_MINI) == image_tokens((1200, 600), GPT_MINI)
+
+    # Equally cheap sizes keep the largest
+    assert token_minimizing_size((300, 200), GEMINI, min_scale=0.1) == (300, 200)
+    # Sizes beyond what the model uses are sent at the model's size
+    width, height = token_minimizing_size((3840, 2160), LLAVA)
+    assert width * height <= 672 * 672
+
+
+def test_hidpi_line_height():
+    """Text rendered at 200% measures twice the line height, so it may shrink twice as much"""
+    from PIL import Image, ImageDraw
+    from core.complexity import estimate_complexity
+
+    image = Image.new('RGB', (400, 200), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for row in range(8):
+        draw.text((10, 10 + row * 22), "Battery low, connect the charger", fill=(0, 0, 0))
+    hidpi = image.resize((800, 400), Image.Resampling.LANCZOS)
+
+    normal = estimate_complexity(image).line_height
+    double = estimate_complexity(hidpi).line_height
+    assert normal and 1.7 <= double / normal <= 2.3
+
+
+if __name__ == "__main__":
+    test_image_tokens()
+    test_token_minimizing_size()
+    test_hidpi_line_height()
+    print("✅ Tile tests passed")
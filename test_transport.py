@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the shared HTTP transport and connection prewarming
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+async def _serve(test):
+    """Serve a stand-in endpoint counting requests and connections"""
+    from aiohttp import web
+
+    stats = {'connections': set(), 'heads': 0, 'posts': 0}
+
+    async def handle(request):
+        stats['connections'].add(request.transport.get_extra_info('peername'))
+        if request.method == 'HEAD':
+            stats['heads'] += 1
+            # Real endpoints send a length with their 404, which keeps the connection reusable
+            return web.Response(status=404, text="Not Found")
+        stats['posts'] += 1
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        await test(f"http://127.0.0.1:{port}/api/generate")
+    finally:
+        await runner.cleanup()
+    return stats
+
+
+def test_prewarmed_connection_is_reused():
+    """The first request after prewarm() uses the pooled connection"""
+    from core.transport import HttpTransport
+
+    async def test(url):
+        transport = HttpTransport()
+        assert await transport.prewarm(url)
+        async with transport.session.post(url, json={}) as response:
+            assert (await response.json())['ok']
+        await transport.close()
+
+    stats = asyncio.run(_serve(test))
+    assert stats['heads'] == 1 and stats['posts'] == 1
+    assert len(stats['connections']) == 1
+
+
+def test_keep_warm_stops_when_idle():
+    """Refresh requests stop once the app has been idle for idle_timeout"""
+    from core.transport import HttpTransport
+
+    async def test(url):
+        transport = HttpTransport()
+        transport.keep_warm(lambda: url, interval=0.02, idle_timeout=0.1)
+        await asyncio.sleep(0.3)
+        assert transport._keep_warm_task.done()
+        await transport.close()
+
+    stats = asyncio.run(_serve(test))
+    assert 2 <= stats['heads'] <= 7
+
+
+def test_first_latency_reported_separately():
+    """The first request does not skew the steady-state figure"""
+    from core.transport import HttpTransport
+    transport = HttpTransport()
+
+    assert transport.record_latency(2.5) == 'first'
+    for seconds in (0.8, 0.9, 1.0):
+        assert transport.record_latency(seconds) == 'steady'
+
+    stats = transport.latency_stats()
+    assert stats['first'] == 2.5
+    assert stats['steady_median'] == 0.9 and stats['steady_count'] == 3
+
+
+if __name__ == "__main__":
+    test_prewarmed_connection_is_reused()
+    test_keep_warm_stops_when_idle()
+    test_first_latency_reported_separately()
+    print("✅ Transport tests passed")
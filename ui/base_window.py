@@ -14,6 +14,12 @@ class BaseWindow:
         self.settings = settings
         self.fonts: Dict[str, tkFont.Font] = {}
         self.widgets_with_fonts: List[tk.Widget] = []
+        self.settings.subscribe(self._on_settings_changed)
+        
+    def _on_settings_changed(self, snapshot):
+        """Apply changed settings, e.g. after config.ini was edited"""
+        if self.fonts and self.fonts['default'].cget('size') != snapshot.font_size:
+            self._apply_font_size(snapshot.font_size)
         
     def setup_fonts(self):
         """Setup scalable fonts for the window"""
@@ -51,8 +57,11 @@ class BaseWindow:
     def scale_fonts(self, delta: int):
         """Scale all fonts by delta size"""
         new_size = self.settings.scale_font(delta)
+        self._apply_font_size(new_size)
+        return new_size
         
-        # Update all font objects
+    def _apply_font_size(self, new_size: int):
+        """Update all font objects to a new base size"""
         for font_name, font_obj in self.fonts.items():
             base_size = new_size
             if font_name == 'small':
@@ -61,8 +70,6 @@ class BaseWindow:
                 base_size = new_size + 2
                 
             font_obj.configure(size=base_size)
-            
-        return new_size
         
     def bind_font_scaling(self, widget: tk.Widget):
         """Bind mouse wheel font scaling to a widget"""
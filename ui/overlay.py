@@ -11,12 +11,14 @@ from .base_window import BaseWindow
 class OverlayWindow(BaseWindow):
     """Transparent overlay window for capturing screenshots"""
     
-    def __init__(self, parent, settings, on_screenshot_callback, toggle_callback=None, quit_callback=None):
+    def __init__(self, parent, settings, on_screenshot_callback, toggle_callback=None, quit_callback=None,
+                 regions_callback=None):
         super().__init__(settings)
         self.parent = parent
         self.on_screenshot = on_screenshot_callback
         self.toggle_callback = toggle_callback
         self.quit_callback = quit_callback
+        self.regions_callback = regions_callback  # Translates all saved regions
         
         # Create overlay window
         self.window = tk.Toplevel(parent)
@@ -28,13 +30,7 @@ class OverlayWindow(BaseWindow):
         # Windows DPI awareness
         self._setup_dpi_awareness()
         
-        # Make window more visible (0.05 is too transparent)
-        transparency = self.settings.getfloat('ui', 'overlay_transparency', 0.05)
-        # Ensure minimum visibility
-        if transparency < 0.3:
-            transparency = 0.7  # 30% transparent, 70% visible
-        self.window.attributes('-alpha', transparency)
-        self.window.attributes('-topmost', self.settings.getboolean('ui', 'always_on_top', True))
+        self._apply_window_attributes(self.settings.snapshot)
         # Don't remove decorations initially to make window visible
         # self.window.overrideredirect(True)
         
@@ -62,6 +58,23 @@ class OverlayWindow(BaseWindow):
         self.drag_start_x = 0
         self.drag_start_y = 0
         
+    def _apply_window_attributes(self, snapshot):
+        """Apply transparency and stacking settings"""
+        # Make window more visible (0.05 is too transparent)
+        transparency = snapshot.overlay_transparency
+        # Ensure minimum visibility
+        if transparency < 0.3:
+            transparency = 0.7  # 30% transparent, 70% visible
+        self.window.attributes('-alpha', transparency)
+        self.window.attributes('-topmost', snapshot.always_on_top)
+        
+    def _on_settings_changed(self, snapshot):
+        """Apply changed settings without a restart"""
+        super()._on_settings_changed(snapshot)
+        self._apply_window_attributes(snapshot)
+        self._restore_border_color(snapshot.overlay_border_color)
+        self.main_frame.configure(highlightthickness=snapshot.overlay_border_width)
+        
     def _setup_dpi_awareness(self):
         """Setup DPI awareness for Windows"""
         try:
@@ -102,8 +115,8 @@ class OverlayWindow(BaseWindow):
     def _setup_window(self):
         """Setup window appearance and layout"""
         # Create main frame with border
-        border_color = self.settings.get('ui', 'overlay_border_color', '#FF0000')
-        border_width = self.settings.getint('ui', 'overlay_border_width', 2)
+        border_color = self.settings.snapshot.overlay_border_color
+        border_width = self.settings.snapshot.overlay_border_width
         
         self.main_frame = tk.Frame(
             self.window,
@@ -159,6 +172,9 @@ class OverlayWindow(BaseWindow):
         self.title_bar.bind('<B1-Motion>', self._on_drag_motion)
         self.title_bar.bind('<ButtonRelease-1>', self._on_drag_end)
         
+        # Saved regions menu
+        self.title_bar.bind('<Button-3>', self._show_region_menu)
+        
         # Resize handle
         self.resize_handle.bind('<Button-1>', self._on_resize_start)
         self.resize_handle.bind('<B1-Motion>', self._on_resize_motion)
@@ -186,7 +202,7 @@ class OverlayWindow(BaseWindow):
         height = self.window.winfo_height()
         
         # Account for border and title bar
-        border_width = self.settings.getint('ui', 'overlay_border_width', 2)
+        border_width = self.settings.snapshot.overlay_border_width
         title_height = self.title_bar.winfo_reqheight()
         
         return (
@@ -196,9 +212,41 @@ class OverlayWindow(BaseWindow):
             y + height - border_width
         )
         
+    def _show_region_menu(self, event):
+        """Show the saved regions menu at the pointer"""
+        regions = self.settings.snapshot.regions
+        menu = tk.Menu(self.window, tearoff=0)
+        menu.add_command(label="Save area as region...", command=self._save_region)
+        menu.add_command(label=f"Translate regions ({len(regions)})", command=self.regions_callback,
+                         state=tk.NORMAL if regions and self.regions_callback else tk.DISABLED)
+        if regions:
+            remove_menu = tk.Menu(menu, tearoff=0)
+            for name, _ in regions:
+                remove_menu.add_command(label=name, command=lambda name=name: self.settings.remove_region(name))
+            menu.add_cascade(label="Remove region", menu=remove_menu)
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+            
+    def _save_region(self):
+        """Save the capture area under a name"""
+        from tkinter import simpledialog
+        
+        bbox = self._get_capture_bbox()
+        name = simpledialog.askstring("Save region", "Region name:", parent=self.window)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        if any(char in name for char in '=:[]'):
+            print(f"Region name must not contain = : [ ] - got {name!r}")
+            return
+        self.settings.save_region(name, bbox)
+        print(f"Saved region {name}: {bbox}")
+        
     def _flash_border(self):
         """Flash border for visual feedback"""
-        original_color = self.settings.get('ui', 'overlay_border_color', '#FF0000')
+        original_color = self.settings.snapshot.overlay_border_color
         flash_color = '#00FF00'
         
         # Flash to green
@@ -323,5 +371,6 @@ class OverlayWindow(BaseWindow):
             
     def destroy(self):
         """Destroy overlay window"""
+        self.settings.unsubscribe(self._on_settings_changed)
         if self.window:
             self.window.destroy()
\ No newline at end of file
@@ -4,20 +4,35 @@ Result window for displaying translations
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import time
 import pyperclip
 from typing import List, Dict
+from core.ask_session import AskSession
+from core.history import HistoryStore
+from core.metrics import metrics
+from core.scheduler import ASK
+from utils.helpers import detected_language
 from .base_window import BaseWindow
+from .text_renderer import ChunkedTextRenderer
 
 
 class ResultWindow(BaseWindow):
     """Window for displaying translation results"""
     
-    def __init__(self, parent, settings, toggle_callback=None, quit_callback=None, translator=None):
+    def __init__(self, parent, settings, toggle_callback=None, quit_callback=None, translator=None,
+                 retranslate_callback=None, scheduler=None):
         super().__init__(settings)
         self.parent = parent
         self.toggle_callback = toggle_callback
         self.quit_callback = quit_callback
         self.translator = translator
+        self.retranslate_callback = retranslate_callback
+        self.scheduler = scheduler  # Runs work on the application's asyncio loop
+        
+        # Ask AI conversation about the current result
+        self.ask_session = None
+        self.conversation_text = ""
+        self.conversation_before_question = ""
         
         # Create result window
         self.window = tk.Toplevel(parent)
@@ -28,9 +43,16 @@ class ResultWindow(BaseWindow):
         self.window.geometry("500x400")
         self.window.minsize(400, 300)
         
-        # Translation history
-        self.translation_history: List[Dict] = []
-        self.max_history = self.settings.getint('translation', 'max_cache_entries', 100)
+        # Translation history - persisted in SQLite, loaded page by page
+        self.history = HistoryStore(
+            self.settings.data_path('history.db'),
+            self.settings.snapshot.history_max_entries
+        )
+        self.history_page_size = 50
+        self.translation_history: List[Dict] = []  # Entries shown in the dropdown
+        self.history_has_more = True
+        self.history_stale = True
+        self._search_job = None
         
         # Setup UI
         self._setup_ui()
@@ -71,6 +93,11 @@ class ResultWindow(BaseWindow):
         )
         self.text_area.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
+        # Long results are inserted in time slices to keep the UI responsive
+        self.final_status = "Ready for translation"
+        self.renderer = ChunkedTextRenderer(self.text_area, on_progress=self._on_render_progress)
+        self._render_start = None  # Set while a translation is being rendered
+        
         # AI Question frame
         question_frame = ttk.Frame(main_frame)
         question_frame.pack(fill=tk.X, pady=(0, 10))
@@ -109,6 +136,15 @@ class ResultWindow(BaseWindow):
         )
         self.copy_button.pack(side=tk.LEFT, padx=(0, 5))
         
+        # Re-translate button (last capture with current model/language)
+        self.retranslate_button = ttk.Button(
+            button_frame,
+            text="Re-translate",
+            command=self._retranslate,
+            state=tk.DISABLED
+        )
+        self.retranslate_button.pack(side=tk.LEFT, padx=(0, 5))
+        
         # Clear button
         self.clear_button = ttk.Button(
             button_frame,
@@ -154,9 +190,17 @@ class ResultWindow(BaseWindow):
             state="readonly",
             width=50
         )
+        self.history_dropdown.configure(postcommand=self._load_history_dropdown)
         self.history_dropdown.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         self.history_dropdown.bind('<<ComboboxSelected>>', self._on_history_selected)
         
+        # History search
+        ttk.Label(history_frame, text="Search:").pack(side=tk.LEFT, padx=(5, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(history_frame, textvariable=self.search_var, width=20)
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_var.trace_add('write', lambda *args: self._schedule_history_search())
+        
         # Status frame
         status_frame = ttk.Frame(main_frame)
         status_frame.pack(fill=tk.X)
@@ -194,15 +238,16 @@ class ResultWindow(BaseWindow):
     def show_translation(self, translation: str, source_language: str = None, processing_time: float = None):
         """Display translation result"""
         self.current_translation = translation
+        self._reset_ask_session()
         
         # Update text area
-        self.text_area.config(state=tk.NORMAL)
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(1.0, translation)
-        self.text_area.config(state=tk.DISABLED)
+        self._render_start = time.perf_counter()
+        self.renderer.render(translation)
         
-        # Enable copy button
+        # Enable copy and re-translate buttons
         self.copy_button.config(state=tk.NORMAL)
+        if self.retranslate_callback:
+            self.retranslate_button.config(state=tk.NORMAL)
         
         # Update status
         status_text = "Translation complete"
@@ -210,7 +255,10 @@ class ResultWindow(BaseWindow):
             status_text += f" ({processing_time:.2f}s)"
         if source_language:
             status_text += f" - Source: {source_language}"
-        self.status_label.config(text=status_text)
+        readout = metrics.readout()
+        if readout:
+            status_text += f" | {readout}"
+        self._set_status(status_text)
         
         # Add to history
         self._add_to_history(translation, source_language)
@@ -218,20 +266,35 @@ class ResultWindow(BaseWindow):
         # Hide loading indicator
         self.loading_label.pack_forget()
         
+    def _set_status(self, text: str):
+        """Set status text, shown once rendering has finished"""
+        self.final_status = text
+        if not self.renderer.busy:
+            self.status_label.config(text=text)
+            
+    def _on_render_progress(self, done: int, total: int):
+        """Show rendering progress of long results in the status bar"""
+        if done < total:
+            self.status_label.config(text=f"Rendering result... {done * 100 // total}%")
+        else:
+            self.status_label.config(text=self.final_status)
+            if self._render_start is not None:
+                metrics.record_span('render', time.perf_counter() - self._render_start)
+                self._render_start = None
+            
     def show_loading(self):
         """Show loading indicator"""
         self.loading_label.pack(pady=10)
-        self.status_label.config(text="Processing translation...")
+        self._set_status("Processing translation...")
         
     def show_error(self, error_message: str):
         """Display error message"""
-        self.text_area.config(state=tk.NORMAL)
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(1.0, f"Error: {error_message}")
-        self.text_area.config(state=tk.DISABLED)
+        self.renderer.render(f"Error: {error_message}")
         
-        self.status_label.config(text="Translation failed")
+        self._set_status("Translation failed")
         self.copy_button.config(state=tk.DISABLED)
+        if self.retranslate_callback:
+            self.retranslate_button.config(state=tk.NORMAL)
         
         # Hide loading indicator
         self.loading_label.pack_forget()
@@ -241,60 +304,112 @@ class ResultWindow(BaseWindow):
         if self.current_translation:
             try:
                 pyperclip.copy(self.current_translation)
-                self.status_label.config(text="Translation copied to clipboard")
+                self._set_status("Translation copied to clipboard")
                 
                 # Reset status after 2 seconds
-                self.window.after(2000, lambda: self.status_label.config(text="Ready"))
+                self.window.after(2000, lambda: self._set_status("Ready"))
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to copy to clipboard: {e}")
                 
+    def _retranslate(self):
+        """Translate the last capture again after changing model or language"""
+        if self.retranslate_callback:
+            self.retranslate_callback()
+            
     def _clear_result(self):
         """Clear the result display"""
-        self.text_area.config(state=tk.NORMAL)
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.config(state=tk.DISABLED)
+        self.renderer.clear()
         
         self.current_translation = ""
+        self._reset_ask_session()
         self.copy_button.config(state=tk.DISABLED)
-        self.status_label.config(text="Cleared")
+        self._set_status("Cleared")
         
     def _add_to_history(self, translation: str, source_language: str = None):
         """Add translation to history"""
-        # Create history entry
-        preview = translation[:50] + "..." if len(translation) > 50 else translation
-        preview = preview.replace('\n', ' ')  # Single line for dropdown
-        
-        history_entry = {
-            'preview': preview,
-            'full_text': translation,
-            'source_language': source_language,
-            'timestamp': tk.datetime.now() if hasattr(tk, 'datetime') else None
-        }
-        
-        # Add to beginning of history
-        self.translation_history.insert(0, history_entry)
+        # The translation prompt returns the detected language but not the
+        # recognized source text, so only translations are searchable
+        if source_language is None:
+            source_language = detected_language(translation)
+            
+        # Written by the history store's background thread
+        self.history.add(translation, source_language)
+        self.history_stale = True
         
-        # Limit history size
-        if len(self.translation_history) > self.max_history:
-            self.translation_history = self.translation_history[:self.max_history]
+    def _load_history_dropdown(self):
+        """Load the first history page when the dropdown opens"""
+        if self.search_var.get().strip():
+            return
+        if self.history_stale:
+            self.translation_history = self.history.page(0, self.history_page_size)
+            self.history_has_more = len(self.translation_history) == self.history_page_size
+            self.history_stale = False
+            self._update_history_dropdown()
             
-        # Update dropdown
+    def _load_more_history(self):
+        """Append the next history page to the dropdown"""
+        entries = self.history.page(len(self.translation_history), self.history_page_size)
+        self.translation_history.extend(entries)
+        self.history_has_more = len(entries) == self.history_page_size
         self._update_history_dropdown()
         
     def _update_history_dropdown(self):
         """Update history dropdown with recent translations"""
         previews = [entry['preview'] for entry in self.translation_history]
+        if self.history_has_more:
+            previews.append("Load more...")
         self.history_dropdown['values'] = previews
         
+    def _schedule_history_search(self):
+        """Search history shortly after the user stops typing"""
+        if self._search_job is not None:
+            self.window.after_cancel(self._search_job)
+        self._search_job = self.window.after(200, self._search_history)
+        
+    def _search_history(self):
+        """Show history entries matching the search box in the dropdown"""
+        self._search_job = None
+        query = self.search_var.get().strip()
+        if not query:
+            self.history_stale = True
+            self._load_history_dropdown()
+            self._set_status("Ready")
+            return
+            
+        start = time.perf_counter()
+        self.translation_history = self.history.search(query, self.history_page_size)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.history_has_more = False
+        self._update_history_dropdown()
+        self.history_var.set("")
+        self._set_status(f"{len(self.translation_history)} history matches ({elapsed:.0f} ms)")
+        
     def _on_history_selected(self, event):
         """Handle history selection"""
         selection_index = self.history_dropdown.current()
+        if selection_index == len(self.translation_history) and self.history_has_more:
+            self.history_var.set("")
+            self._load_more_history()
+            return
+            
         if 0 <= selection_index < len(self.translation_history):
             entry = self.translation_history[selection_index]
-            self.show_translation(
-                entry['full_text'],
-                entry.get('source_language')
-            )
+            if 'full_text' not in entry:
+                entry = self.history.get(entry['id'])
+                if entry is None:
+                    return
+            self._show_history_entry(entry)
+            
+    def _show_history_entry(self, entry: Dict):
+        """Display a history entry without adding it to history again"""
+        self.current_translation = entry['full_text']
+        self._reset_ask_session()
+        self.renderer.render(entry['full_text'])
+        self.copy_button.config(state=tk.NORMAL)
+        status_text = "History entry"
+        if entry.get('source_language'):
+            status_text += f" - Source: {entry['source_language']}"
+        self._set_status(status_text)
             
     def _open_settings(self):
         """Open settings dialog"""
@@ -386,16 +501,10 @@ class ResultWindow(BaseWindow):
         
         # Refresh models button
         def refresh_models():
+            self._test_ollama_connection(show_models)
+            
+        def show_models(result):
             try:
-                import asyncio
-                from core.translator import Translator
-                
-                translator = Translator(self.settings)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(translator.test_ollama_connection())
-                loop.close()
-                
                 if result['success']:
                     models = result.get('available_models', [])
                     model_combo['values'] = models
@@ -444,16 +553,10 @@ class ResultWindow(BaseWindow):
         
         # Test Ollama connection button
         def test_ollama():
-            import asyncio
-            from core.translator import Translator
+            self._test_ollama_connection(show_test_result)
             
-            translator = Translator(self.settings)
+        def show_test_result(result):
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(translator.test_ollama_connection())
-                loop.close()
-                
                 if result['success']:
                     tk.messagebox.showinfo("Ollama Test", 
                         f"Connection successful!\n"
@@ -511,6 +614,11 @@ class ResultWindow(BaseWindow):
         ttk.Button(button_frame, text="A-", command=decrease_font).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="A+", command=increase_font).pack(side=tk.LEFT, padx=5)
         
+        # Profiling toggle, applies from the next start
+        profile_var = tk.BooleanVar(value=self.settings.getboolean('debug', 'profile', False))
+        profile_check = ttk.Checkbutton(ui_frame, text="Profile captures (report on exit, after restart)", variable=profile_var)
+        profile_check.pack(pady=5)
+        
         # Instructions
         instructions = tk.Text(ui_frame, height=4, wrap=tk.WORD)
         instructions.pack(pady=20, padx=20, fill='x')
@@ -555,6 +663,7 @@ class ResultWindow(BaseWindow):
             except (ValueError, NameError):
                 # font_scale might not be defined if UI tab wasn't created yet
                 pass
+            self.settings.set('debug', 'profile', str(profile_var.get()).lower())
                 
             self.settings.save()
             settings_window.destroy()
@@ -586,7 +695,7 @@ class ResultWindow(BaseWindow):
             messagebox.showwarning("No Result", "Please translate some text first before asking questions.")
             return
             
-        if not self.translator:
+        if not self.translator or self.scheduler is None:
             messagebox.showerror("Error", "AI translator not available.")
             return
             
@@ -594,184 +703,84 @@ class ResultWindow(BaseWindow):
         self.ask_button.config(state=tk.DISABLED, text="Processing...")
         self.question_entry.config(state=tk.DISABLED)
         
-        # Run AI question asynchronously
-        import asyncio
-        import threading
+        # Follow-up questions reuse the session so the result is not resent
+        if self.ask_session is None:
+            self.ask_session = AskSession(self.settings, self.current_translation, self.translator.transport,
+                                          self.translator.provider_slots)
+            self.conversation_text = self.current_translation
+        session = self.ask_session
         
-        def run_question():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                # Create prompt combining the translation and the question
-                combined_prompt = f"""Based on this translation result:
-"{self.current_translation}"
-
-User question: {question}
-
-Please provide a helpful response to the user's question about the translation."""
-                
-                # Use the existing translator to ask the question
-                result = loop.run_until_complete(self._ask_ai_text_question(combined_prompt))
-                loop.close()
-                
-                # Display the result in the main text area
-                self.parent.after(0, lambda: self._display_ai_response(result))
-                
-            except Exception as e:
-                self.parent.after(0, lambda: self._display_ai_error(str(e)))
-                
-        threading.Thread(target=run_question, daemon=True).start()
-        
-    async def _ask_ai_text_question(self, prompt: str) -> str:
-        """Ask AI a text-based question"""
-        # Get current LLM configuration
-        llm_name = self.settings.get('api', 'default_llm', 'gemini-2.5-flash')
-        
-        if llm_name.startswith('gemini'):
-            return await self._ask_gemini_text(prompt)
-        elif llm_name.startswith('gpt'):
-            return await self._ask_openai_text(prompt, llm_name)
-        elif llm_name == 'ollama':
-            return await self._ask_ollama_text(prompt)
-        else:
-            raise ValueError(f"Unsupported LLM: {llm_name}")
-            
-    async def _ask_gemini_text(self, prompt: str) -> str:
-        """Ask Gemini a text-only question"""
-        import aiohttp
-        
-        api_key = self.settings.get('api', 'gemini_api_key')
-        if not api_key:
-            raise ValueError("Gemini API key not configured")
-            
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.3,
-                "topK": 1,
-                "topP": 1,
-                "maxOutputTokens": 1024,
-            }
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Gemini API error ({response.status}): {error_text}")
-                    
-                result = await response.json()
-                
-                if 'candidates' not in result or not result['candidates']:
-                    raise Exception("No response from Gemini")
-                    
-                return result['candidates'][0]['content']['parts'][0]['text']
-                
-    async def _ask_openai_text(self, prompt: str, model_name: str) -> str:
-        """Ask OpenAI a text-only question"""
-        import aiohttp
-        
-        api_key = self.settings.get('api', 'openai_api_key')
-        if not api_key:
-            raise ValueError("OpenAI API key not configured")
-            
-        # Map model name
-        model_mapping = {
-            'gpt-4.1-mini': 'gpt-4o-mini',
-            'gpt-4.1-nano': 'gpt-4o-mini'
-        }
-        
-        api_model = model_mapping.get(model_name, 'gpt-4o-mini')
-        
-        url = "https://api.openai.com/v1/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": api_model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 1024,
-            "temperature": 0.3
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"OpenAI API error ({response.status}): {error_text}")
-                    
-                result = await response.json()
-                
-                if 'choices' not in result or not result['choices']:
-                    raise Exception("No response from OpenAI")
-                    
-                return result['choices'][0]['message']['content']
-                
-    async def _ask_ollama_text(self, prompt: str) -> str:
-        """Ask Ollama a text-only question"""
-        import aiohttp
-        
-        if not self.settings.getboolean('ollama', 'enabled', False):
-            raise ValueError("Ollama not enabled in configuration")
-            
-        base_url = self.settings.get('ollama', 'base_url', 'http://localhost:11434')
-        model_name = self.settings.get('ollama', 'model', 'llava:7b')
-        timeout_seconds = self.settings.getint('ollama', 'timeout', 30)
-        
-        payload = {
-            "model": model_name,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "num_predict": 1000
-            }
-        }
-        
-        timeout = aiohttp.ClientTimeout(total=timeout_seconds)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(f"{base_url}/api/generate", json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Ollama API error {response.status}: {error_text}")
-                    
-                result = await response.json()
-                
-                if 'response' not in result:
-                    raise Exception(f"Invalid Ollama response format: {result}")
-                    
-                return result['response'].strip()
-                
-    def _display_ai_response(self, response: str):
-        """Display AI response in the result text area"""
-        # Add separator and the AI response
+        self.conversation_before_question = self.conversation_text
         separator = "\n" + "="*50 + "\nAI Response:\n" + "="*50 + "\n"
-        combined_text = self.current_translation + separator + response
-        
-        # Update text area
-        self.text_area.config(state=tk.NORMAL)
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(1.0, combined_text)
-        self.text_area.config(state=tk.DISABLED)
+        self.conversation_text += separator + f"Question: {question}\n\n"
+        self.renderer.render(self.conversation_text)
         
+        def on_chunk(text):
+            self.parent.after(0, lambda: self._append_ai_chunk(session, text))
+            
+        # Ranked below captures on the application's shared event loop
+        future = self.scheduler.submit(session.ask(question, on_chunk), ASK)
+        future.add_done_callback(lambda f: self.parent.after(0, lambda: self._on_ai_answer(session, f)))
+        
+    def _append_ai_chunk(self, session: AskSession, text: str):
+        """Show a streamed piece of an AI answer"""
+        if session is not self.ask_session:
+            return  # A new translation replaced the session
+        self.conversation_text += text
+        self.renderer.render(self.conversation_text)
+        
+    def _on_ai_answer(self, session: AskSession, future):
+        """Handle a finished AI question"""
+        if session is not self.ask_session:
+            return
+        try:
+            future.result()
+        except Exception as e:
+            self.conversation_text = self.conversation_before_question
+            self.renderer.render(self.conversation_text)
+            self._display_ai_error(str(e))
+        else:
+            self._display_ai_response(session.turns[-1])
+            
+    def _test_ollama_connection(self, on_result):
+        """Test the Ollama server with the app's translator, passing the result to on_result on the Tk thread"""
+        if not self.translator or self.scheduler is None:
+            messagebox.showerror("Error", "AI translator not available.")
+            return
+            
+        def deliver(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            on_result(result)
+            
+        future = self.scheduler.submit(self.translator.test_ollama_connection(), ASK)
+        future.add_done_callback(lambda f: self.parent.after(0, lambda: deliver(f)))
+        
+    def _reset_ask_session(self):
+        """End the Ask AI conversation about the previous result"""
+        if self.ask_session is not None:
+            self.scheduler.submit(self.ask_session.close(), ASK)
+            self.ask_session = None
+            self.question_entry.config(state=tk.NORMAL)
+            self.ask_button.config(state=tk.NORMAL, text="Ask AI")
+            
+    def _display_ai_response(self, turn: Dict):
+        """Finish an AI answer streamed into the result text area"""
         # Clear question input and re-enable controls
-        self.question_entry.delete("1.0", tk.END)
         self.question_entry.config(state=tk.NORMAL)
+        self.question_entry.delete("1.0", tk.END)
         self.ask_button.config(state=tk.NORMAL, text="Ask AI")
         
-        # Update status
-        self.status_label.config(text="AI question answered")
+        # Update status with the input tokens of this follow-up
+        status_text = "AI question answered"
+        if turn.get('input_tokens') is not None:
+            status_text += f" ({turn['input_tokens']} input tokens"
+            if turn.get('cached_tokens'):
+                status_text += f", {turn['cached_tokens']} cached"
+            status_text += ")"
+        self._set_status(status_text)
         
     def _display_ai_error(self, error_message: str):
         """Display AI error message"""
@@ -796,6 +805,8 @@ Please provide a helpful response to the user's question about the translation."
         
     def destroy(self):
         """Destroy result window"""
+        self.settings.unsubscribe(self._on_settings_changed)
+        self.history.close()
         if self.window:
             self.window.destroy()
             
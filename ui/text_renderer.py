@@ -0,0 +1,104 @@
+"""
+Time-sliced rendering of long text into Tk text widgets
+"""
+
+import time
+import tkinter as tk
+from typing import Callable, Optional
+
+
+def common_prefix_length(old: str, new: str) -> int:
+    """Get the length of the common prefix of two strings"""
+    limit = min(len(old), len(new))
+    if new.startswith(old[:limit]):
+        return limit
+
+    # Binary search the first differing position
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class ChunkedTextRenderer:
+    """
+    Renders text into a Text widget in chunks scheduled with after()
+
+    Only the part that differs from what is already displayed is replaced,
+    so appending (e.g. an AI answer below a translation) inserts just the
+    tail. Each slice stops after the frame budget so the UI stays
+    responsive for results near MAX_TRANSLATION_LENGTH.
+    """
+
+    def __init__(self, text_widget: tk.Text, chunk_size: int = 1000, frame_budget_ms: float = 8.0,
+                 on_progress: Optional[Callable[[int, int], None]] = None):
+        self.text_widget = text_widget
+        self.chunk_size = chunk_size
+        self.frame_budget = frame_budget_ms / 1000
+        self.on_progress = on_progress
+
+        self.displayed = ""   # Text currently in the widget
+        self._pending = ""    # Text still to insert
+        self._target = ""     # Full text being rendered
+        self._job = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a render is still in progress"""
+        return self._job is not None
+
+    def render(self, text: str):
+        """
+        Display text, replacing only the changed tail
+
+        Args:
+            text: Full text to display
+        """
+        self.cancel()
+
+        keep = common_prefix_length(self.displayed, text)
+        self._target = text
+        self._pending = text[keep:]
+
+        if keep < len(self.displayed):
+            self.text_widget.config(state=tk.NORMAL)
+            self.text_widget.delete(f"1.0+{keep}c", tk.END)
+            self.text_widget.config(state=tk.DISABLED)
+            self.displayed = self.displayed[:keep]
+
+        self._step()
+
+    def clear(self):
+        """Remove all text"""
+        self.render("")
+
+    def cancel(self):
+        """Stop a render in progress, leaving the inserted part displayed"""
+        if self._job is not None:
+            self.text_widget.after_cancel(self._job)
+            self._job = None
+
+    def _step(self):
+        """Insert chunks until the frame budget is used up"""
+        self._job = None
+        deadline = time.perf_counter() + self.frame_budget
+
+        self.text_widget.config(state=tk.NORMAL)
+        while self._pending:
+            chunk = self._pending[:self.chunk_size]
+            self._pending = self._pending[self.chunk_size:]
+            self.text_widget.insert(tk.END, chunk)
+            self.displayed += chunk
+            if time.perf_counter() >= deadline:
+                break
+        self.text_widget.config(state=tk.DISABLED)
+
+        if self.on_progress:
+            self.on_progress(len(self.displayed), len(self._target))
+
+        if self._pending:
+            self._job = self.text_widget.after(1, self._step)
@@ -152,6 +152,7 @@ LOG_API_CALLS = False
 
 # Performance Settings
 SCREENSHOT_CACHE_SIZE = 50
+SCREENSHOT_CACHE_BYTES = 64 * 1024 * 1024  # compressed
 TRANSLATION_CACHE_SIZE = 100
 IMAGE_OPTIMIZATION_THREADS = 2
 API_REQUEST_TIMEOUT = 30
@@ -3,16 +3,18 @@ Utility helper functions
 """
 
 import os
+import re
 import sys
 import json
 import time
 import hashlib
 import platform
 from typing import Any, Dict, List, Tuple, Optional, Union
-from PIL import Image, ImageTk
 import tkinter as tk
 from datetime import datetime
 
+# PIL is imported inside the image helpers so the overlay can start without it
+
 from utils.constants import *
 
 
@@ -123,8 +125,10 @@ def clamp_bbox_to_screen(bbox: Tuple[int, int, int, int]) -> Tuple[int, int, int
     return (left, top, right, bottom)
 
 
-def resize_image_proportional(image: Image.Image, max_size: Tuple[int, int]) -> Image.Image:
+def resize_image_proportional(image: 'Image.Image', max_size: Tuple[int, int]) -> 'Image.Image':
     """Resize image while maintaining aspect ratio"""
+    from PIL import Image
+    
     max_width, max_height = max_size
     width, height = image.size
     
@@ -233,6 +237,35 @@ def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+# Header produced by Settings.translation_prompt
+TRANSLATION_HEADER_PATTERN = re.compile(r'\A\s*\*\*Erkannte Sprache:\*\*([^\n]*)\n\s*\*\*Übersetzung:\*\*[ \t]*\n?')
+
+
+def split_translation_header(translation: str) -> Tuple[str, str]:
+    """Split a translation into its language header and body"""
+    match = TRANSLATION_HEADER_PATTERN.match(translation)
+    if not match:
+        return "", translation
+    return translation[:match.end()], translation[match.end():]
+
+
+def detected_language(translation: str) -> Optional[str]:
+    """Get the source language named in a translation's header, if any"""
+    match = TRANSLATION_HEADER_PATTERN.match(translation)
+    if not match or not match.group(1).strip():
+        return None
+    return match.group(1).strip()
+
+
+def join_translations(translations: List[str]) -> str:
+    """Join partial translations under the first language header"""
+    if not translations:
+        return ""
+    header = split_translation_header(translations[0])[0]
+    bodies = [split_translation_header(text)[1].strip() for text in translations]
+    return header + "\n\n".join(body for body in bodies if body)
+
+
 def hash_string(text: str) -> str:
     """Generate hash of string"""
     return hashlib.md5(text.encode('utf-8')).hexdigest()
@@ -270,6 +303,7 @@ def parse_hotkey(hotkey: str) -> str:
 def is_valid_image(image_path: str) -> bool:
     """Check if file is a valid image"""
     try:
+        from PIL import Image
         with Image.open(image_path) as img:
             img.verify()
         return True
@@ -277,7 +311,7 @@ def is_valid_image(image_path: str) -> bool:
         return False
 
 
-def get_image_info(image: Image.Image) -> Dict[str, Any]:
+def get_image_info(image: 'Image.Image') -> Dict[str, Any]:
     """Get information about an image"""
     return {
         'size': image.size,
@@ -289,8 +323,10 @@ def get_image_info(image: Image.Image) -> Dict[str, Any]:
     }
 
 
-def create_error_image(width: int = 200, height: int = 100, text: str = "Error") -> Image.Image:
+def create_error_image(width: int = 200, height: int = 100, text: str = "Error") -> 'Image.Image':
     """Create a simple error image"""
+    from PIL import Image
+    
     img = Image.new('RGB', (width, height), color='red')
     # In a full implementation, you'd add text rendering here
     return img